@@ -0,0 +1,45 @@
+DEFAULT_OUTPUT_FORMAT = "mp3"
+
+# output_format -> ElevenLabs output_format, response media type, file extension.
+# ulaw_8000 and pcm_16000 are headerless mono streams (8-bit mu-law, 16-bit
+# little-endian PCM), ready for telephony without a local decode/resample.
+TTS_OUTPUT_FORMATS = {
+    "mp3": {
+        "elevenlabs": "mp3_44100_128",
+        "media_type": "audio/mpeg",
+        "extension": ".mp3",
+    },
+    "ulaw_8000": {
+        "elevenlabs": "ulaw_8000",
+        "media_type": "audio/basic",
+        "extension": ".ulaw",
+    },
+    "pcm_16000": {
+        "elevenlabs": "pcm_16000",
+        "media_type": "audio/L16; rate=16000; channels=1",
+        "extension": ".pcm",
+    },
+    "opus": {
+        "elevenlabs": "opus_48000_64",
+        "media_type": "audio/ogg;codecs=opus",
+        "extension": ".opus",
+    },
+}
+
+
+def get_output_format(output_format):
+    """
+    Args:
+        output_format (str): One of TTS_OUTPUT_FORMATS, or None for mp3.
+    Returns:
+        dict: {"elevenlabs", "media_type", "extension"} for output_format.
+    Raises:
+        ValueError: If output_format is not supported.
+    """
+    spec = TTS_OUTPUT_FORMATS.get(output_format or DEFAULT_OUTPUT_FORMAT)
+    if spec is None:
+        raise ValueError(
+            f"Unsupported output_format '{output_format}', expected one of "
+            f"{', '.join(TTS_OUTPUT_FORMATS)}"
+        )
+    return spec
@@ -0,0 +1,200 @@
+import hashlib
+import io
+import os
+import time
+import numpy as np
+from pydub import AudioSegment
+from audio_preprocess import TARGET_FRAME_RATE, preprocess_reference_audio
+
+# pydub stores samples as signed little-endian integers of sample_width bytes
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def segment_to_array(audio):
+    """
+    Returns the samples of a decoded AudioSegment as a NumPy array.
+    Args:
+        audio (AudioSegment): Decoded audio.
+    Returns:
+        tuple: (samples, audio) where samples has shape (frames, channels) and
+        audio is the segment the samples were read from (24-bit input is
+        widened to 32-bit first).
+    """
+    if audio.sample_width not in _SAMPLE_DTYPES:
+        audio = audio.set_sample_width(4)
+    samples = np.frombuffer(audio.raw_data, dtype=_SAMPLE_DTYPES[audio.sample_width])
+    return samples.reshape(-1, audio.channels), audio
+
+
+def array_to_segment(samples, template):
+    """
+    Wraps a sample array in an AudioSegment with template's rate, width and channels.
+    """
+    samples = np.ascontiguousarray(samples, dtype=_SAMPLE_DTYPES[template.sample_width])
+    return template._spawn(samples.tobytes())
+
+
+def loop_to_length(samples, target_frames, crossfade_frames=0):
+    """
+    Repeats samples until they are target_frames long, blending each loop seam
+    with a linear crossfade of crossfade_frames so the joins do not click.
+    Input longer than target_frames is trimmed.
+    Args:
+        samples (np.ndarray): Audio of shape (frames, channels).
+        target_frames (int): Length of the result in frames.
+        crossfade_frames (int): Overlap between consecutive loops.
+    Returns:
+        np.ndarray: Audio of shape (target_frames, channels), same dtype as samples.
+    """
+    num_frames = len(samples)
+    if num_frames == 0:
+        raise ValueError("Cannot loop empty audio")
+    if num_frames >= target_frames:
+        return samples[:target_frames]
+
+    # Overlapping loops shorten the period, keep at least 3/4 of every loop intact
+    crossfade_frames = min(crossfade_frames, num_frames // 4)
+    period = num_frames - crossfade_frames
+
+    # Every loop after the first starts by fading in over the previous loop's tail
+    loop = samples[:period].copy()
+    if crossfade_frames:
+        fade_in = np.linspace(0, 1, crossfade_frames, endpoint=False, dtype=np.float32)
+        fade_in = fade_in[:, None]
+        blended = samples[:crossfade_frames] * fade_in + samples[period:] * (
+            1 - fade_in
+        )
+        info = np.iinfo(samples.dtype)
+        loop[:crossfade_frames] = np.clip(np.rint(blended), info.min, info.max)
+
+    looped = np.empty((target_frames,) + samples.shape[1:], dtype=samples.dtype)
+    looped[:period] = samples[:period]
+    filled = min(period + period, target_frames)
+    looped[period:filled] = loop[: filled - period]
+    # Double the periodic region with each copy instead of writing loop by loop
+    while filled < target_frames:
+        count = min(filled - period, target_frames - filled)
+        looped[filled : filled + count] = looped[period : period + count]
+        filled += count
+    return looped
+
+
+def loop_segment(audio, target_duration_ms, crossfade_ms=0):
+    """
+    Loops decoded audio to exactly target_duration_ms, crossfading the seams.
+    Args:
+        audio (AudioSegment): Decoded input audio.
+        target_duration_ms (int): Length of the result in milliseconds.
+        crossfade_ms (int): Crossfade length at each loop seam.
+    Returns:
+        AudioSegment: The looped audio.
+    """
+    samples, audio = segment_to_array(audio)
+    frame_rate = audio.frame_rate
+    looped = loop_to_length(
+        samples,
+        int(target_duration_ms * frame_rate // 1000),
+        int(crossfade_ms * frame_rate // 1000),
+    )
+    return array_to_segment(looped, audio)
+
+
+def decode_audio(audio_source, filename=None):
+    """
+    Decodes a path or in-memory audio upload, using filename's extension as format hint.
+    """
+    if isinstance(audio_source, (bytes, bytearray, memoryview)):
+        audio_format = os.path.splitext(filename or "")[1].lstrip(".") or None
+        return AudioSegment.from_file(io.BytesIO(audio_source), format=audio_format)
+    return AudioSegment.from_file(audio_source)
+
+
+def fingerprint_pcm(audio):
+    """
+    Hashes decoded audio after normalizing it to 16 kHz mono 16-bit PCM, so the
+    same recording matches regardless of file name, tags or container.
+    Args:
+        audio (AudioSegment): Decoded audio.
+    Returns:
+        str: Fingerprint of the form "pcm:<hex>".
+    """
+    normalized = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+    return f"pcm:{hashlib.sha256(normalized.raw_data).hexdigest()}"
+
+
+def loop_to_mp3(audio, target_duration_ms, crossfade_ms=0):
+    """
+    Loops decoded audio to target_duration_ms and encodes it as mp3 in memory.
+    Returns:
+        io.BytesIO: The mp3 data, positioned at the start.
+    """
+    buffer = io.BytesIO()
+    loop_segment(audio, target_duration_ms, crossfade_ms).export(buffer, format="mp3")
+    buffer.seek(0)
+    return buffer
+
+
+def preprocess_segment(audio, **options):
+    """
+    AudioSegment wrapper around audio_preprocess.preprocess_reference_audio.
+    """
+    samples, audio = segment_to_array(audio)
+    processed = preprocess_reference_audio(
+        samples, audio.frame_rate, audio.sample_width, **options
+    )
+    frame_rate = options.get("target_frame_rate", TARGET_FRAME_RATE)
+    return AudioSegment(
+        data=processed.tobytes(), sample_width=2, frame_rate=frame_rate, channels=1
+    )
+
+
+def prepare_clone_sample(
+    audio_source,
+    filename,
+    target_duration_sec,
+    crossfade_ms=0,
+    known_fingerprints=frozenset(),
+    pcm_cache=None,
+    preprocess=None,
+):
+    """
+    Decodes reference audio, fingerprints its PCM and, unless the fingerprint
+    is already known, loops it into an mp3 clone sample. Self-contained so it
+    can run in an audio worker process.
+    Args:
+        audio_source: Path to the reference audio, or its bytes.
+        filename (str): Name of the reference audio, used as a format hint.
+        target_duration_sec (int): Length of the clone sample in seconds.
+        crossfade_ms (int): Crossfade at each loop seam.
+        known_fingerprints (frozenset): PCM fingerprints that need no sample.
+        pcm_cache (PCMCache): Optional decoded-audio cache to read/fill.
+        preprocess (dict): If set, keyword arguments for
+            preprocess_reference_audio, applied before looping.
+    Returns:
+        dict: {"pcm_fingerprint", "clone_sample" (mp3 bytes or None),
+        "stage_seconds" ({"decode": s, "preprocess": s, "extrapolate": s})}
+    """
+    stage_seconds = {}
+    start = time.perf_counter()
+    if pcm_cache is not None:
+        audio = pcm_cache.decode(audio_source, filename)
+    else:
+        audio = decode_audio(audio_source, filename)
+    stage_seconds["decode"] = time.perf_counter() - start
+    pcm_fingerprint = fingerprint_pcm(audio)
+    clone_sample = None
+    if pcm_fingerprint not in known_fingerprints:
+        if preprocess is not None:
+            start = time.perf_counter()
+            audio = preprocess_segment(audio, **preprocess)
+            stage_seconds["preprocess"] = time.perf_counter() - start
+        start = time.perf_counter()
+        clone_sample = loop_to_mp3(
+            audio, target_duration_sec * 1000, crossfade_ms
+        ).getvalue()
+        stage_seconds["extrapolate"] = time.perf_counter() - start
+    return {
+        "pcm_fingerprint": pcm_fingerprint,
+        "clone_sample": clone_sample,
+        "stage_seconds": stage_seconds,
+    }
@@ -0,0 +1,144 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from configs import Configs
+from rate_governor import ConcurrencyLimit
+
+
+class AudioPoolBusyError(Exception):
+    """
+    Raised when an audio task is submitted while max_pending tasks are in flight.
+    """
+
+
+class AudioTaskTimeoutError(Exception):
+    """
+    Raised when an audio task does not finish within the pool's task timeout.
+    """
+
+
+class AudioProcessPool:
+    """
+    Runs CPU-bound audio transforms (decode, loop, encode) in worker processes
+    so they neither block the event loop nor contend for the GIL.
+    At most max_pending tasks are queued or running; further submissions fail
+    fast with AudioPoolBusyError. max_workers=0 runs tasks in a thread instead.
+    Tasks are handed to the executor only when a worker is free, so the task
+    timeout measures running time, not time spent queued.
+    Usage: result = await pool.run(fn, *args)
+    """
+
+    def __init__(self, max_workers=None, max_pending=16, task_timeout_sec=60):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.task_timeout_sec = task_timeout_sec
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        if max_workers == 0:
+            # Size of the event loop's default thread pool
+            workers = min(32, (os.cpu_count() or 1) + 4)
+        else:
+            workers = max_workers or os.cpu_count() or 1
+        self._workers = ConcurrencyLimit(workers)
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    async def run(self, fn, *args):
+        """
+        Runs fn(*args) in a worker process. fn and its arguments must be picklable.
+        Raises:
+            AudioPoolBusyError: max_pending tasks are already in flight.
+            AudioTaskTimeoutError: fn ran for longer than task_timeout_sec.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise AudioPoolBusyError(
+                    f"Audio pool is busy ({self._pending} tasks pending)"
+                )
+            self._pending += 1
+        try:
+            # Queued here rather than in the executor, so the timeout below
+            # starts when a worker picks the task up
+            await self._workers.acquire_async()
+        except BaseException:
+            self._release()
+            raise
+        try:
+            future = self._submit(fn, *args)
+        except BaseException:
+            self._workers.release()
+            self._release()
+            raise
+        # A timed-out task that is already running keeps its slots until it
+        # actually finishes, so runaway work still counts against max_pending
+        future.add_done_callback(lambda _: self._finish())
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), self.task_timeout_sec
+            )
+        except asyncio.TimeoutError:
+            raise AudioTaskTimeoutError(
+                f"Audio task {getattr(fn, '__name__', fn)} timed out after "
+                f"{self.task_timeout_sec}s"
+            ) from None
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        if self.max_workers == 0:
+            return asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs threads can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            executor = self._executor
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            return self._submit(fn, *args)
+
+    def _finish(self):
+        self._workers.release()
+        self._release()
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_audio_pool():
+    """
+    Returns the process-wide audio pool sized by AUDIO_POOL_WORKERS (default:
+    one worker per CPU), AUDIO_POOL_MAX_PENDING and AUDIO_TASK_TIMEOUT_SEC.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = AudioProcessPool(
+                max_workers=Configs.AUDIO_POOL_WORKERS,
+                max_pending=Configs.AUDIO_POOL_MAX_PENDING,
+                task_timeout_sec=Configs.AUDIO_TASK_TIMEOUT_SEC,
+            )
+        return _default_pool
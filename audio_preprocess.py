@@ -0,0 +1,130 @@
+import numpy as np
+
+# Levels are measured on short frames; a frame is silent when it is this far
+# below the loudest frame of the recording
+FRAME_MS = 20
+SILENCE_BELOW_PEAK_DB = 40.0
+TARGET_FRAME_RATE = 44100
+
+
+def to_mono_float(samples, sample_width):
+    """
+    Converts integer samples of shape (frames, channels) to mono float32 in [-1, 1].
+    """
+    scale = float(1 << (8 * sample_width - 1))
+    return samples.mean(axis=1, dtype=np.float32) / np.float32(scale)
+
+
+def frame_levels_db(signal, frame_len):
+    """
+    Returns:
+        np.ndarray: RMS level in dBFS of each frame_len-sample frame of signal
+        (the last partial frame is zero-padded).
+    """
+    num_frames = -(-len(signal) // frame_len)
+    padded = np.zeros(num_frames * frame_len, dtype=np.float32)
+    padded[: len(signal)] = signal
+    frames = padded.reshape(num_frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def remove_silence(
+    signal,
+    frame_rate,
+    max_pause_ms=500,
+    keep_pause_ms=250,
+    edge_padding_ms=100,
+    silence_below_peak_db=SILENCE_BELOW_PEAK_DB,
+):
+    """
+    Trims leading/trailing silence down to edge_padding_ms and shortens every
+    internal pause longer than max_pause_ms to keep_pause_ms.
+    Returns:
+        np.ndarray: The remaining samples; signal unchanged if it is all silence.
+    """
+    frame_len = max(1, frame_rate * FRAME_MS // 1000)
+    levels = frame_levels_db(signal, frame_len)
+    voiced = levels > levels.max() - silence_below_peak_db
+    voiced_idx = np.flatnonzero(voiced)
+    if len(voiced_idx) == 0:
+        return signal
+
+    keep = np.zeros(len(levels), dtype=bool)
+    edge = edge_padding_ms // FRAME_MS
+    keep[max(0, voiced_idx[0] - edge) : voiced_idx[-1] + 1 + edge] = True
+
+    # Silent runs between the first and last voiced frame: start/end per run
+    inner = ~voiced[voiced_idx[0] : voiced_idx[-1] + 1]
+    edges = np.diff(np.concatenate(([0], inner.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1) + voiced_idx[0]
+    run_ends = np.flatnonzero(edges == -1) + voiced_idx[0]
+    long_runs = (run_ends - run_starts) * FRAME_MS > max_pause_ms
+    keep_frames = keep_pause_ms // FRAME_MS
+    for start, end in zip(run_starts[long_runs], run_ends[long_runs]):
+        # Keep half of the shortened pause on each side of the cut
+        keep[start + keep_frames // 2 : end - (keep_frames - keep_frames // 2)] = False
+
+    sample_keep = np.repeat(keep, frame_len)[: len(signal)]
+    return signal[sample_keep]
+
+
+def normalize_loudness(signal, frame_rate, target_dbfs=-20.0, peak_dbfs=-1.0):
+    """
+    Scales signal so its voiced frames average target_dbfs RMS, without
+    letting any sample exceed peak_dbfs.
+    """
+    frame_len = max(1, frame_rate * FRAME_MS // 1000)
+    levels = frame_levels_db(signal, frame_len)
+    voiced = levels > levels.max() - SILENCE_BELOW_PEAK_DB
+    power = np.mean(np.power(10.0, levels[voiced] / 10))
+    gain_db = target_dbfs - 10 * np.log10(max(power, 1e-20))
+    peak = float(np.max(np.abs(signal))) if len(signal) else 0.0
+    if peak > 0:
+        gain_db = min(gain_db, peak_dbfs - 20 * np.log10(peak))
+    return signal * np.float32(10 ** (gain_db / 20))
+
+
+def resample(signal, from_rate, to_rate):
+    """
+    Band-limited resampling of a mono signal via the FFT.
+    """
+    if from_rate == to_rate or len(signal) == 0:
+        return signal
+    num_out = int(round(len(signal) * to_rate / from_rate))
+    spectrum = np.fft.rfft(signal)
+    # irfft zero-pads (upsampling) or truncates (downsampling) the spectrum
+    resampled = np.fft.irfft(spectrum, n=num_out) * (num_out / len(signal))
+    return resampled.astype(np.float32)
+
+
+def preprocess_reference_audio(
+    samples,
+    frame_rate,
+    sample_width,
+    target_frame_rate=TARGET_FRAME_RATE,
+    max_pause_ms=500,
+    keep_pause_ms=250,
+    target_dbfs=-20.0,
+):
+    """
+    Prepares a reference sample for cloning: mono, silence trimmed, long
+    pauses shortened, loudness normalized and resampled to target_frame_rate.
+    Args:
+        samples (np.ndarray): Integer samples of shape (frames, channels).
+        frame_rate (int): Sample rate of samples.
+        sample_width (int): Bytes per sample.
+        target_frame_rate (int): Sample rate of the result.
+        max_pause_ms (int): Internal pauses longer than this are shortened.
+        keep_pause_ms (int): Length shortened pauses are cut down to.
+        target_dbfs (float): RMS loudness of the voiced parts.
+    Returns:
+        np.ndarray: Mono int16 samples of shape (frames, 1) at target_frame_rate.
+    """
+    signal = to_mono_float(samples, sample_width)
+    if len(signal):
+        signal = remove_silence(signal, frame_rate, max_pause_ms, keep_pause_ms)
+        signal = normalize_loudness(signal, frame_rate, target_dbfs)
+        signal = resample(signal, frame_rate, target_frame_rate)
+    pcm = np.clip(np.rint(signal * 32767), -32768, 32767).astype(np.int16)
+    return pcm[:, None]
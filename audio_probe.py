@@ -0,0 +1,158 @@
+import io
+import os
+import struct
+
+# MPEG audio version bits -> name; 1 is reserved
+_MPEG_VERSIONS = {0: "2.5", 2: "2", 3: "1"}
+_MPEG_SAMPLE_RATES = {
+    "1": (44100, 48000, 32000),
+    "2": (22050, 24000, 16000),
+    "2.5": (11025, 12000, 8000),
+}
+# Layer III bitrates in kbps by bitrate index
+_MP3_BITRATES = {
+    "1": (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    "2": (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_WAV_CODECS = {1: "pcm", 3: "pcm_float", 6: "alaw", 7: "mulaw", 0xFFFE: "pcm"}
+_HEADER_READ_BYTES = 64 * 1024
+
+
+def probe_audio(source):
+    """
+    Reads duration, codec, sample rate and channels from WAV or MP3 headers
+    without decoding the audio.
+    Args:
+        source: Path to an audio file, or its bytes.
+    Returns:
+        dict: {"codec", "sample_rate", "channels", "duration_sec"}, or None if
+        the container is not recognized or its headers are incomplete.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _probe_stream(io.BytesIO(source), len(source))
+    with open(source, "rb") as f:
+        return _probe_stream(f, os.path.getsize(source))
+
+
+def _probe_stream(f, total_size):
+    head = f.read(12)
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return _probe_wav(f, total_size)
+    audio_start = 0
+    if head[:3] == b"ID3" and len(head) >= 10:
+        # ID3v2 tags can be large (cover art), skip them without reading
+        f.seek(0)
+        tag = f.read(10)
+        size = 0
+        for byte in tag[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        audio_start = 10 + size + (10 if tag[5] & 0x10 else 0)
+    f.seek(audio_start)
+    return _probe_mp3(f.read(_HEADER_READ_BYTES), audio_start, total_size)
+
+
+def _probe_wav(f, total_size):
+    fmt = None
+    offset = 12
+    f.seek(offset)
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            return None
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+        offset += 8
+        if chunk_id == b"fmt ":
+            fmt = f.read(16)
+            if len(fmt) < 16:
+                return None
+        elif chunk_id == b"data":
+            break
+        # Chunks are padded to an even size
+        offset += chunk_size + (chunk_size & 1)
+        f.seek(offset)
+    if fmt is None:
+        return None
+    audio_format, channels, sample_rate, byte_rate = struct.unpack("<HHII", fmt[:12])
+    if not byte_rate:
+        return None
+    # Streamed WAVs leave the data size unset, fall back to the file size
+    data_size = min(chunk_size, total_size - offset)
+    return {
+        "codec": _WAV_CODECS.get(audio_format, f"wav_{audio_format}"),
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "duration_sec": data_size / byte_rate,
+    }
+
+
+def _parse_mp3_frame_header(header):
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = _MPEG_VERSIONS.get((header[1] >> 3) & 0x03)
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    # Only Layer III; free-format and invalid indexes are not supported
+    if version is None or layer != 1:
+        return None
+    if bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES["1" if version == "1" else "2"][bitrate_index] * 1000
+    sample_rate = _MPEG_SAMPLE_RATES[version][sample_rate_index]
+    samples_per_frame = 1152 if version == "1" else 576
+    padding = (header[2] >> 1) & 0x01
+    return {
+        "version": version,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "channels": 1 if header[3] >> 6 == 3 else 2,
+        "samples_per_frame": samples_per_frame,
+        "frame_length": samples_per_frame // 8 * bitrate // sample_rate + padding,
+    }
+
+
+def _probe_mp3(data, audio_start, total_size):
+    # Find the first frame header that is followed by another valid header,
+    # so stray 0xFF bytes in leading junk are not mistaken for audio
+    frame = None
+    position = data.find(b"\xff")
+    while position != -1 and position + 4 <= len(data):
+        frame = _parse_mp3_frame_header(data[position : position + 4])
+        if frame:
+            next_position = position + frame["frame_length"]
+            if next_position + 4 > len(data) or _parse_mp3_frame_header(
+                data[next_position : next_position + 4]
+            ):
+                break
+        frame = None
+        position = data.find(b"\xff", position + 1)
+    if frame is None:
+        return None
+
+    # Xing/Info (LAME) and VBRI headers carry the exact frame count
+    frame_count = None
+    if frame["version"] == "1":
+        side_info = 17 if frame["channels"] == 1 else 32
+    else:
+        side_info = 9 if frame["channels"] == 1 else 17
+    xing = position + 4 + side_info
+    if data[xing : xing + 4] in (b"Xing", b"Info") and len(data) >= xing + 12:
+        (flags,) = struct.unpack(">I", data[xing + 4 : xing + 8])
+        if flags & 0x01:
+            (frame_count,) = struct.unpack(">I", data[xing + 8 : xing + 12])
+    vbri = position + 4 + 32
+    if data[vbri : vbri + 4] == b"VBRI" and len(data) >= vbri + 18:
+        (frame_count,) = struct.unpack(">I", data[vbri + 14 : vbri + 18])
+
+    if frame_count:
+        duration_sec = frame_count * frame["samples_per_frame"] / frame["sample_rate"]
+    else:
+        # No VBR header: assume constant bitrate over the rest of the file
+        audio_bytes = total_size - audio_start - position
+        duration_sec = audio_bytes * 8 / frame["bitrate"]
+    return {
+        "codec": "mp3",
+        "sample_rate": frame["sample_rate"],
+        "channels": frame["channels"],
+        "duration_sec": duration_sec,
+    }
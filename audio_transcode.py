@@ -0,0 +1,154 @@
+import asyncio
+import time
+from pydub import AudioSegment
+from metrics import STAGE_DURATION, STAGE_ERRORS, record_bytes
+
+# G.711 mu-law at 8 kHz is one byte per sample: 160 bytes per 20 ms frame
+ULAW_SAMPLE_RATE = 8000
+ULAW_FRAME_MS = 20
+ULAW_SILENCE = b"\xff"
+# Only the end of ffmpeg's stderr is kept for error messages
+STDERR_TAIL_BYTES = 8192
+
+# ffmpeg demuxer arguments for each TTS output format it may have to decode
+_INPUT_ARGS = {
+    "mp3": ["-f", "mp3"],
+    "pcm_16000": ["-f", "s16le", "-ar", "16000", "-ac", "1"],
+    "opus": ["-f", "ogg"],
+}
+
+
+def ulaw_frame_bytes(frame_ms=ULAW_FRAME_MS):
+    return ULAW_SAMPLE_RATE * frame_ms // 1000
+
+
+async def reframe(chunks, frame_bytes):
+    """
+    Regroups an async byte stream into frame_bytes-sized frames; the last
+    frame is padded with mu-law silence.
+    """
+    pending = bytearray()
+    async for chunk in chunks:
+        pending += chunk
+        if len(pending) < frame_bytes:
+            continue
+        whole = len(pending) - len(pending) % frame_bytes
+        for offset in range(0, whole, frame_bytes):
+            yield bytes(pending[offset : offset + frame_bytes])
+        del pending[:whole]
+    if pending:
+        yield bytes(pending) + ULAW_SILENCE * (frame_bytes - len(pending))
+
+
+async def transcode_to_ulaw_frames(
+    chunks, input_format="mp3", frame_ms=ULAW_FRAME_MS, read_size=4096
+):
+    """
+    Transcodes TTS audio to 8 kHz mu-law while it is still arriving, so the
+    first frames can go out on a call leg before synthesis has finished.
+    An ffmpeg child process decodes incrementally; the pipes and read_size
+    bound how much audio is buffered, and upstream chunks are only pulled as
+    fast as ffmpeg consumes them.
+    Args:
+        chunks (AsyncIterator[bytes]): Encoded audio, e.g. from
+            elevenlabs_text_to_speech_stream_async.
+        input_format (str): Format of chunks, see audio_formats.TTS_OUTPUT_FORMATS.
+            ulaw_8000 input is only regrouped into frames.
+        frame_ms (int): Frame length in milliseconds.
+        read_size (int): Bytes read from ffmpeg per step.
+    Returns:
+        AsyncIterator[bytes]: mu-law frames of frame_ms each.
+    Raises:
+        ValueError: If input_format cannot be transcoded.
+        RuntimeError: If ffmpeg fails to decode the audio.
+    """
+    frame_bytes = ulaw_frame_bytes(frame_ms)
+    if input_format == "ulaw_8000":
+        async for frame in reframe(chunks, frame_bytes):
+            yield frame
+        return
+    if input_format not in _INPUT_ARGS:
+        raise ValueError(f"Cannot transcode '{input_format}' to mu-law")
+
+    process = await asyncio.create_subprocess_exec(
+        AudioSegment.converter,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        *_INPUT_ARGS[input_format],
+        "-i",
+        "pipe:0",
+        "-ac",
+        "1",
+        "-ar",
+        str(ULAW_SAMPLE_RATE),
+        "-f",
+        "mulaw",
+        # Emit output as soon as it is decoded instead of in large blocks
+        "-flush_packets",
+        "1",
+        "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=read_size * 4,
+    )
+
+    async def feed():
+        received = 0
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                process.stdin.write(chunk)
+                # Waits while ffmpeg is behind, so input is never buffered unboundedly
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg exited early; its exit status reports the error
+            pass
+        finally:
+            record_bytes("ulaw_transcode", "received", received)
+            if not process.stdin.is_closing():
+                process.stdin.close()
+
+    async def drain_stderr():
+        # Read while stdout is streaming: a damaged input can log far more
+        # than the pipe buffer holds, which would stall ffmpeg otherwise
+        tail = bytearray()
+        while data := await process.stderr.read(read_size):
+            tail += data
+            del tail[:-STDERR_TAIL_BYTES]
+        return bytes(tail)
+
+    async def ffmpeg_output():
+        while data := await process.stdout.read(read_size):
+            yield data
+
+    feeder = asyncio.create_task(feed())
+    errors = asyncio.create_task(drain_stderr())
+    start = time.perf_counter()
+    sent = 0
+    try:
+        async for frame in reframe(ffmpeg_output(), frame_bytes):
+            if not sent:
+                STAGE_DURATION.observe(
+                    time.perf_counter() - start, stage="ulaw_first_frame"
+                )
+            sent += len(frame)
+            yield frame
+        await feeder
+        stderr = await errors
+        if await process.wait() != 0:
+            STAGE_ERRORS.inc(stage="ulaw_transcode")
+            raise RuntimeError(
+                f"ffmpeg failed to transcode {input_format}: "
+                f"{stderr.decode(errors='replace').strip()}"
+            )
+    finally:
+        record_bytes("ulaw_transcode", "sent", sent)
+        if not feeder.done():
+            feeder.cancel()
+        if not errors.done():
+            errors.cancel()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
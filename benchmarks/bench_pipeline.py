@@ -0,0 +1,281 @@
+"""
+Benchmark suite for the audio pipeline.
+
+Times extrapolate_audio, the preprocess + loop + mp3 encode path
+(prepare_clone_sample) and the full clone pipeline
+(generate_elevenlabs_cloned_voice_from_retellai_async through
+run_cloning_batch_async) at several concurrency levels over the bundled
+reference samples. ElevenLabs is replaced by a local fake server with a fixed
+latency. Caches and the voice registry are disabled or isolated so every run
+takes the cold path.
+
+Each row reports the median over --repeat runs of wall time, CPU time of this
+process and its audio workers, and throughput (files/s and seconds of
+reference audio per second). peak_rss_mb is the high-water mark of this
+process or any worker so far, so it only grows from row to row.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipeline [--input-dir input/english input/spanish]
+        [--concurrency 1 2 4 8] [--repeat 3] [--latency-ms 50]
+        [--save benchmarks/baseline.json] [--compare benchmarks/baseline.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from audio_pcm import prepare_clone_sample
+from audio_pool import get_audio_pool
+from audio_probe import probe_audio
+from benchmarks.fake_elevenlabs import FakeElevenLabsServer
+from configs import Configs
+from elevenlabs_retell_voice_cloning import extrapolate_audio, run_cloning_batch_async
+from voice_registry import get_voice_registry
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".ogg", ".flac")
+METRICS = [
+    ("wall_sec", "{:.3f}"),
+    ("cpu_sec", "{:.3f}"),
+    ("peak_rss_mb", "{:.1f}"),
+    ("files_per_sec", "{:.2f}"),
+    ("audio_sec_per_sec", "{:.1f}"),
+]
+# Lower is better for these, higher for the throughput metrics
+LOWER_IS_BETTER = ("wall_sec", "cpu_sec", "peak_rss_mb")
+
+
+def _cpu_seconds(usage):
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_mb(usage):
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss / scale
+
+
+def _reap_audio_workers(timeout_sec=10):
+    """
+    Stops the audio pool and waits for its workers, so their CPU time shows
+    up in RUSAGE_CHILDREN. The pool starts again on the next task.
+    """
+    get_audio_pool().shutdown()
+    deadline = time.monotonic() + timeout_sec
+    for process in multiprocessing.active_children():
+        process.join(max(0, deadline - time.monotonic()))
+
+
+def measure(run, num_files, audio_sec):
+    """
+    Returns:
+        dict: wall/CPU time, peak RSS and throughput of one call to run().
+    """
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        run()
+    wall_sec = time.perf_counter() - start
+    _reap_audio_workers()
+    self_after = resource.getrusage(resource.RUSAGE_SELF)
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "wall_sec": wall_sec,
+        "cpu_sec": _cpu_seconds(self_after)
+        - _cpu_seconds(self_before)
+        + _cpu_seconds(children_after)
+        - _cpu_seconds(children_before),
+        "peak_rss_mb": max(_peak_rss_mb(self_after), _peak_rss_mb(children_after)),
+        "files_per_sec": num_files / wall_sec,
+        "audio_sec_per_sec": audio_sec / wall_sec,
+    }
+
+
+def bench(name, run, paths, audio_sec, repeat):
+    runs = [measure(run, len(paths), audio_sec) for _ in range(repeat)]
+    row = {"name": name, "files": len(paths), "repeat": repeat}
+    for metric, _ in METRICS:
+        row[metric] = statistics.median(r[metric] for r in runs)
+    print(f"  {name}: {row['wall_sec']:.3f}s wall, {row['cpu_sec']:.3f}s cpu")
+    return row
+
+
+def run_pipeline(paths, output_dir, concurrency, run_ids):
+    """
+    Runs the full clone pipeline once over paths with unique retell ids,
+    then forgets the cloned voices so the next run clones again.
+    """
+    run_id = next(run_ids)
+    params_list = [
+        {
+            "retell_id": f"bench-{run_id}-{index}",
+            "audio_path": path,
+            "language": os.path.basename(os.path.dirname(path)) or "english",
+        }
+        for index, path in enumerate(paths)
+    ]
+    results = asyncio.run(
+        run_cloning_batch_async(
+            params_list,
+            output_dir,
+            max_concurrency=concurrency,
+            persist_artifacts=False,
+        )
+    )
+    failed = [item for item in results if item["status"] != "done"]
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} pipeline runs failed, first error: {failed[0]['error']}"
+        )
+    registry = get_voice_registry()
+    for item in results:
+        registry.forget_voice(Configs.ELEVENLABS_API_KEY, item["result"]["voice_id"])
+
+
+def compare(rows, baseline):
+    """
+    Prints each metric next to its baseline value with the relative change.
+    """
+    baseline_rows = {row["name"]: row for row in baseline["results"]}
+    print("\n| benchmark | metric | baseline | current | change |")
+    print("|---|---|---|---|---|")
+    for row in rows:
+        base = baseline_rows.get(row["name"])
+        if base is None:
+            continue
+        for metric, fmt in METRICS:
+            if not base.get(metric):
+                continue
+            change = 100 * (row[metric] - base[metric]) / base[metric]
+            better = (change < 0) == (metric in LOWER_IS_BETTER)
+            marker = "" if abs(change) < 5 else (" (better)" if better else " (worse)")
+            print(
+                f"| {row['name']} | {metric} | {fmt.format(base[metric])} | "
+                f"{fmt.format(row[metric])} | {change:+.1f}%{marker} |"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--input-dir", nargs="+", default=["input/english", "input/spanish"]
+    )
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    parser.add_argument("--save", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    args = parser.parse_args()
+
+    paths = sorted(
+        path
+        for input_dir in args.input_dir
+        for path in glob.glob(os.path.join(input_dir, "*"))
+        if path.lower().endswith(AUDIO_EXTENSIONS)
+    )
+    if not paths:
+        print(f"No audio files found under {', '.join(args.input_dir)}")
+        return
+    probes = [probe_audio(path) for path in paths]
+    audio_sec = sum(probe["duration_sec"] for probe in probes if probe)
+
+    server = FakeElevenLabsServer(latency_sec=args.latency_ms / 1000).start()
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    Configs.ELEVENLABS_API_BASE_URL = server.base_url
+    Configs.ELEVENLABS_API_KEY = "benchmark"
+    Configs.TTS_CACHE_ENABLED = False
+    Configs.PCM_CACHE_ENABLED = False
+    Configs.VOICE_REGISTRY_PATH = os.path.join(work_dir, "voice_registry.json")
+
+    preprocess = None
+    if Configs.PREPROCESS_ENABLED:
+        preprocess = {"target_frame_rate": Configs.PREPROCESS_SAMPLE_RATE}
+    run_ids = itertools.count()
+
+    print(
+        f"{len(paths)} files, {audio_sec:.1f}s of audio, "
+        f"fake ElevenLabs latency {args.latency_ms} ms"
+    )
+    rows = [
+        bench(
+            "extrapolate_audio",
+            lambda: [
+                extrapolate_audio(path, os.path.join(work_dir, "extrapolated"))
+                for path in paths
+            ],
+            paths,
+            audio_sec,
+            args.repeat,
+        ),
+        bench(
+            "preprocess_encode",
+            lambda: [
+                prepare_clone_sample(
+                    path,
+                    os.path.basename(path),
+                    10,
+                    Configs.EXTRAPOLATE_CROSSFADE_MS,
+                    preprocess=preprocess,
+                )
+                for path in paths
+            ],
+            paths,
+            audio_sec,
+            args.repeat,
+        ),
+    ]
+    for concurrency in args.concurrency:
+        rows.append(
+            bench(
+                f"pipeline_c{concurrency}",
+                lambda: run_pipeline(
+                    paths, os.path.join(work_dir, "output"), concurrency, run_ids
+                ),
+                paths,
+                audio_sec,
+                args.repeat,
+            )
+        )
+    server.stop()
+
+    print("\n| benchmark | " + " | ".join(name for name, _ in METRICS) + " |")
+    print("|---|" + "|".join("---" for _ in METRICS) + "|")
+    for row in rows:
+        values = " | ".join(fmt.format(row[name]) for name, fmt in METRICS)
+        print(f"| {row['name']} | {values} |")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "audio_pool_workers": Configs.AUDIO_POOL_WORKERS,
+            "preprocess_enabled": Configs.PREPROCESS_ENABLED,
+            "latency_ms": args.latency_ms,
+        },
+        "inputs": paths,
+        "audio_sec": audio_sec,
+        "results": rows,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            compare(rows, json.load(f))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
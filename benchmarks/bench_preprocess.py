@@ -0,0 +1,123 @@
+"""
+Microbenchmark of the reference-audio preprocessing stage.
+
+For every sample under the input directory it times decoding, each
+preprocessing step and the loop + mp3 encode that follows, with and without
+preprocessing, and reports how much of each sample is kept.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_preprocess [--input-dir input] [--repeat 5]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+from audio_pcm import decode_audio, loop_to_mp3, preprocess_segment, segment_to_array
+from audio_preprocess import (
+    TARGET_FRAME_RATE,
+    normalize_loudness,
+    remove_silence,
+    resample,
+    to_mono_float,
+)
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".ogg", ".flac")
+
+
+def time_call(fn, repeat):
+    """
+    Returns:
+        tuple: (median seconds over repeat calls, result of the last call)
+    """
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+def bench_file(path, repeat, target_duration_sec):
+    decode_sec, audio = time_call(lambda: decode_audio(path), 1)
+    samples, audio = segment_to_array(audio)
+    rate = audio.frame_rate
+
+    to_mono_sec, signal = time_call(
+        lambda: to_mono_float(samples, audio.sample_width), repeat
+    )
+    trim_sec, trimmed = time_call(lambda: remove_silence(signal, rate), repeat)
+    normalize_sec, normalized = time_call(
+        lambda: normalize_loudness(trimmed, rate), repeat
+    )
+    resample_sec, _ = time_call(
+        lambda: resample(normalized, rate, TARGET_FRAME_RATE), repeat
+    )
+    preprocess_sec, processed = time_call(lambda: preprocess_segment(audio), repeat)
+
+    target_ms = target_duration_sec * 1000
+    raw_encode_sec, _ = time_call(lambda: loop_to_mp3(audio, target_ms), 1)
+    processed_encode_sec, _ = time_call(lambda: loop_to_mp3(processed, target_ms), 1)
+    return {
+        "file": os.path.relpath(path),
+        "duration_sec": len(audio) / 1000,
+        "kept_sec": len(processed) / 1000,
+        "decode_ms": decode_sec * 1000,
+        "mono_ms": to_mono_sec * 1000,
+        "trim_ms": trim_sec * 1000,
+        "normalize_ms": normalize_sec * 1000,
+        "resample_ms": resample_sec * 1000,
+        "preprocess_ms": preprocess_sec * 1000,
+        "loop_encode_raw_ms": raw_encode_sec * 1000,
+        "loop_encode_processed_ms": processed_encode_sec * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input-dir", default="input")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-sec", type=int, default=10)
+    args = parser.parse_args()
+
+    paths = sorted(
+        path
+        for path in glob.glob(os.path.join(args.input_dir, "**", "*"), recursive=True)
+        if path.lower().endswith(AUDIO_EXTENSIONS)
+    )
+    if not paths:
+        print(f"No audio files found under {args.input_dir}")
+        return
+
+    rows = [bench_file(path, args.repeat, args.target_sec) for path in paths]
+    columns = [
+        ("file", "{}"),
+        ("duration_sec", "{:.2f}"),
+        ("kept_sec", "{:.2f}"),
+        ("decode_ms", "{:.1f}"),
+        ("mono_ms", "{:.2f}"),
+        ("trim_ms", "{:.2f}"),
+        ("normalize_ms", "{:.2f}"),
+        ("resample_ms", "{:.2f}"),
+        ("preprocess_ms", "{:.2f}"),
+        ("loop_encode_raw_ms", "{:.1f}"),
+        ("loop_encode_processed_ms", "{:.1f}"),
+    ]
+    print("| " + " | ".join(name for name, _ in columns) + " |")
+    print("|" + "|".join("---" for _ in columns) + "|")
+    for row in rows:
+        print("| " + " | ".join(fmt.format(row[name]) for name, fmt in columns) + " |")
+
+    total = sum(row["duration_sec"] for row in rows)
+    kept = sum(row["kept_sec"] for row in rows)
+    print(
+        f"\n{len(rows)} files, {total:.1f}s of audio, {kept:.1f}s kept "
+        f"({100 * kept / total:.0f}%), median preprocess "
+        f"{statistics.median(row['preprocess_ms'] for row in rows):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
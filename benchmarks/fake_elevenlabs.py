@@ -0,0 +1,115 @@
+"""
+Local stand-in for the ElevenLabs API used by the benchmarks.
+
+Serves the endpoints the clone pipeline calls (voices, voices/add,
+speech-to-text, text-to-speech and its stream variant) with a fixed
+per-request latency, so pipeline timings measure this code rather than
+ElevenLabs. Point the pipeline at it with ELEVENLABS_API_BASE_URL.
+
+Usage:
+    server = FakeElevenLabsServer(latency_sec=0.05).start()
+    os.environ["ELEVENLABS_API_BASE_URL"] = server.base_url
+    ...
+    server.stop()
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Stand-in TTS audio: one second of a 128 kbps mp3 stream worth of bytes
+FAKE_TTS_AUDIO = b"\xff\xfb\x90\x64" + b"\x00" * (16 * 1024 - 4)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _drain_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while size := int(self.rfile.readline().split(b";")[0], 16):
+                self.rfile.read(size + 2)
+            self.rfile.readline()
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+    def _handle(self):
+        self._drain_body()
+        server = self.server
+        server.record(self.command, self.path)
+        time.sleep(server.latency_sec)
+
+        path = self.path.split("?", 1)[0]
+        route = f"{self.command} {path}"
+        for prefix, status in list(server.fail_routes.items()):
+            if route.startswith(prefix):
+                self._respond(status, {"detail": f"Injected failure for {route}"})
+                return
+        if self.command == "GET" and path == "/v1/voices":
+            self._respond(200, {"voices": []})
+        elif self.command == "POST" and path == "/v1/voices/add":
+            self._respond(200, {"voice_id": f"fake-voice-{next(server.voice_ids)}"})
+        elif self.command == "POST" and path == "/v1/speech-to-text":
+            self._respond(200, {"text": "This is a benchmark transcript."})
+        elif self.command == "POST" and path.startswith("/v1/text-to-speech/"):
+            self._respond(200, FAKE_TTS_AUDIO, content_type="audio/mpeg")
+        elif self.command == "DELETE" and path.startswith("/v1/voices/"):
+            self._respond(200, {"status": "ok"})
+        else:
+            self._respond(404, {"detail": f"No fake for {self.command} {path}"})
+
+    do_GET = do_POST = do_DELETE = _handle
+
+
+class FakeElevenLabsServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server on 127.0.0.1 answering like ElevenLabs after
+    latency_sec. request_counts maps "METHOD /path" to the number of calls.
+    Routes starting with a key of fail_routes ("METHOD /path prefix") are
+    answered with its status code instead, to exercise error handling.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency_sec=0.05, port=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_sec = latency_sec
+        self.voice_ids = itertools.count(1)
+        self.request_counts = {}
+        self.fail_routes = {}
+        self._counts_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, method, path):
+        route = f"{method} {path.split('?', 1)[0]}"
+        with self._counts_lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
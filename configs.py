@@ -16,7 +16,44 @@ class Configs:
     BASE_URL = None
     ELEVENLABS_API_KEY = None
     ELEVENLABS_VOICE_ID = None
+    ELEVENLABS_API_BASE_URL = "https://api.elevenlabs.io"
+    ELEVENLABS_TIMEOUT_SEC = 120
+    ELEVENLABS_CONNECT_TIMEOUT_SEC = 10
+    ELEVENLABS_MAX_RETRIES = 3
+    ELEVENLABS_POOL_SIZE = 20
+    ELEVENLABS_MAX_RPS = 10  # 0 disables a limit
+    ELEVENLABS_MAX_CONCURRENCY = 10
+    ELEVENLABS_MAX_CHARS_PER_MIN = 0
     CALL_API_KEY = None
+    WORKSPACE_DIR = "cache"
+    WORKSPACE_TTL_SEC = 3600
+    WORKSPACE_REAP_INTERVAL_SEC = 300
+    JOB_WORKERS = 4
+    JOB_QUEUE_SIZE = 32
+    JOB_TTL_SEC = 3600
+    TTS_CACHE_ENABLED = True
+    TTS_CACHE_DIR = "tts_cache"
+    TTS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+    TTS_PARALLEL_CHUNK_CHARS = 0  # 0 disables sentence-chunked parallel TTS
+    TTS_PARALLEL_MAX_CONCURRENCY = 4
+    TTS_PARALLEL_CROSSFADE_MS = 0
+    TTS_HEDGE_AFTER_SEC = 2.0
+    TTS_STREAM_IDLE_TIMEOUT_SEC = 30  # 0 disables
+    TTS_BATCH_MAX_CONCURRENCY = 8
+    VOICE_REGISTRY_PATH = "voice_registry.json"
+    VOICE_CATALOG_TTL_SEC = 300
+    BATCH_MAX_CONCURRENCY = 4
+    BATCH_MAX_ITEMS = 50
+    EXTRAPOLATE_CROSSFADE_MS = 30
+    CLONE_SAMPLE_MAX_BYTES = 10 * 1024 * 1024
+    AUDIO_POOL_WORKERS = None  # None: one per CPU, 0: run in a thread
+    AUDIO_POOL_MAX_PENDING = 16
+    AUDIO_TASK_TIMEOUT_SEC = 60
+    PCM_CACHE_ENABLED = True
+    PCM_CACHE_DIR = "pcm_cache"
+    PCM_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+    PREPROCESS_ENABLED = True
+    PREPROCESS_SAMPLE_RATE = 44100
 
     _TYPES = {
         "RETELL_API_KEY": str,
@@ -27,7 +64,44 @@ class Configs:
         "BASE_URL": str,
         "ELEVENLABS_API_KEY": str,
         "ELEVENLABS_VOICE_ID": str,
+        "ELEVENLABS_API_BASE_URL": str,
+        "ELEVENLABS_TIMEOUT_SEC": float,
+        "ELEVENLABS_CONNECT_TIMEOUT_SEC": float,
+        "ELEVENLABS_MAX_RETRIES": int,
+        "ELEVENLABS_POOL_SIZE": int,
+        "ELEVENLABS_MAX_RPS": float,
+        "ELEVENLABS_MAX_CONCURRENCY": int,
+        "ELEVENLABS_MAX_CHARS_PER_MIN": int,
         "CALL_API_KEY": str,
+        "WORKSPACE_DIR": str,
+        "WORKSPACE_TTL_SEC": int,
+        "WORKSPACE_REAP_INTERVAL_SEC": int,
+        "JOB_WORKERS": int,
+        "JOB_QUEUE_SIZE": int,
+        "JOB_TTL_SEC": int,
+        "TTS_CACHE_ENABLED": bool,
+        "TTS_CACHE_DIR": str,
+        "TTS_CACHE_MAX_BYTES": int,
+        "TTS_PARALLEL_CHUNK_CHARS": int,
+        "TTS_PARALLEL_MAX_CONCURRENCY": int,
+        "TTS_PARALLEL_CROSSFADE_MS": int,
+        "TTS_HEDGE_AFTER_SEC": float,
+        "TTS_STREAM_IDLE_TIMEOUT_SEC": float,
+        "TTS_BATCH_MAX_CONCURRENCY": int,
+        "VOICE_REGISTRY_PATH": str,
+        "VOICE_CATALOG_TTL_SEC": int,
+        "BATCH_MAX_CONCURRENCY": int,
+        "BATCH_MAX_ITEMS": int,
+        "EXTRAPOLATE_CROSSFADE_MS": int,
+        "CLONE_SAMPLE_MAX_BYTES": int,
+        "AUDIO_POOL_WORKERS": int,
+        "AUDIO_POOL_MAX_PENDING": int,
+        "AUDIO_TASK_TIMEOUT_SEC": int,
+        "PCM_CACHE_ENABLED": bool,
+        "PCM_CACHE_DIR": str,
+        "PCM_CACHE_MAX_BYTES": int,
+        "PREPROCESS_ENABLED": bool,
+        "PREPROCESS_SAMPLE_RATE": int,
         # "MAX_CALLS": int,
         # "THRESHOLD": float,
         # "DEBUG_MODE": bool,
@@ -54,6 +128,9 @@ class Configs:
         load_dotenv()
         for key, typ in cls._TYPES.items():
             val = os.getenv(key)
+            if val is None:
+                # Keep the class-level default for settings not in the env
+                continue
             setattr(cls, key, cls._convert_type(val, typ))
 
     # Utility function to print all config variables for debugging
@@ -1,16 +1,136 @@
 # ...existing code for imports, class, and FastAPI app...
 
 
-from fastapi import FastAPI, File, UploadFile, Form
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
+from starlette.background import BackgroundTask
+from contextlib import asynccontextmanager
+from typing import List
+import asyncio
+import json
 import shutil
 import os
+import zipfile
 from elevenlabs_retell_voice_cloning import (
-    generate_elevenlabs_cloned_voice_from_retellai,
+    elevenlabs_text_to_speech_stream_async,
+    forget_voice_on_404,
+    generate_elevenlabs_cloned_voice_from_retellai_async,
+    prepare_elevenlabs_cloned_voice_async,
+    run_cloning_batch_async,
 )
+from voice_clone_jobs import QueueFullError, VoiceCloneJobQueue
+from audio_formats import get_output_format
+from elevenlabs_client import get_elevenlabs_client
+from audio_pool import AudioPoolBusyError, AudioTaskTimeoutError, get_audio_pool
+from metrics import REGISTRY, render_prometheus
+from rate_governor import governor_stats
+from tts_cache import get_tts_cache
+from configs import Configs
 from utils import Utils
 
-app = FastAPI()
+job_queue = VoiceCloneJobQueue(
+    max_workers=Configs.JOB_WORKERS,
+    max_queue_size=Configs.JOB_QUEUE_SIZE,
+    job_ttl_sec=Configs.JOB_TTL_SEC,
+)
+
+TTS_CACHE_STATS = REGISTRY.gauge(
+    "voice_tts_cache", "TTS cache hits, misses, entries and bytes.", ["stat"]
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge(
+    "voice_job_queue_depth", "Voice clone jobs waiting for a worker."
+)
+AUDIO_POOL_PENDING = REGISTRY.gauge(
+    "voice_audio_pool_pending", "Audio transforms queued or running in the audio pool."
+)
+ELEVENLABS_QUEUE_DEPTH = REGISTRY.gauge(
+    "voice_elevenlabs_queue_depth",
+    "ElevenLabs calls waiting on the per-key rate governor.",
+)
+ELEVENLABS_IN_FLIGHT = REGISTRY.gauge(
+    "voice_elevenlabs_in_flight", "ElevenLabs calls holding a concurrency slot."
+)
+
+
+async def reap_stale_workspaces():
+    """
+    Periodically removes request workspaces orphaned by crashed or aborted requests.
+    Workspaces of jobs the queue still reports are left to its own expiry.
+    """
+    while True:
+        await asyncio.sleep(Configs.WORKSPACE_REAP_INTERVAL_SEC)
+        removed = await asyncio.to_thread(
+            Utils.reap_stale_dirs,
+            Configs.WORKSPACE_DIR,
+            Configs.WORKSPACE_TTL_SEC,
+            job_queue.workspace_dirs(),
+        )
+        if removed:
+            print(f"Reaped {removed} stale workspace(s) from {Configs.WORKSPACE_DIR}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    os.makedirs(Configs.WORKSPACE_DIR, exist_ok=True)
+    reaper = asyncio.create_task(reap_stale_workspaces())
+    await job_queue.start()
+    try:
+        yield
+    finally:
+        reaper.cancel()
+        await job_queue.stop()
+        get_audio_pool().shutdown()
+        await get_elevenlabs_client().aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(AudioPoolBusyError)
+async def audio_pool_busy(request, exc):
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"}
+    )
+
+
+@app.exception_handler(AudioTaskTimeoutError)
+async def audio_task_timeout(request, exc):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+def parse_output_format(output_format):
+    """
+    Returns the audio_formats spec for output_format, or responds 400.
+    """
+    try:
+        return get_output_format(output_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def upload_name(audio):
+    """
+    Returns:
+        str: The uploaded file's name without any client-supplied directories.
+    """
+    return os.path.basename(audio.filename)
+
+
+def save_upload(workspace_dir, audio):
+    """
+    Copies an uploaded file into the workspace.
+    Returns:
+        str: Path to the saved file.
+    """
+    audio_path = os.path.join(workspace_dir, upload_name(audio))
+    with open(audio_path, "wb") as buffer:
+        shutil.copyfileobj(audio.file, buffer)
+    return audio_path
 
 
 @app.post("/generate-cloned-voice")
@@ -20,31 +140,283 @@ async def generate_cloned_voice(
     tts_text: str = Form(...),
     voice_name: str = Form(None),
     description: str = Form(None),
+    stream: bool = Form(False),
+    output_format: str = Form("mp3"),
     audio: UploadFile = File(...),
 ):
-    cache_dir = "cache"
-    os.makedirs(cache_dir, exist_ok=True)
-    Utils.clear_dir(cache_dir)
-    audio_path = os.path.join(cache_dir, audio.filename)
-    with open(audio_path, "wb") as buffer:
-        shutil.copyfileobj(audio.file, buffer)
+    media_type = parse_output_format(output_format)["media_type"]
+    # Each request works in its own directory so concurrent requests never
+    # delete or overwrite each other's uploads and TTS outputs.
+    workspace_dir = Utils.create_workspace(Configs.WORKSPACE_DIR)
+    try:
+        # The reference audio is decoded, extrapolated and uploaded from
+        # memory; only the TTS output is written to the workspace.
+        params = {
+            "retell_id": retell_id,
+            "audio_path": upload_name(audio),
+            "audio_bytes": await audio.read(),
+            "language": language,
+            "tts_text": tts_text,
+            "voice_name": voice_name,
+            "description": description,
+            "output_format": output_format,
+        }
 
-    params = {
-        "retell_id": retell_id,
-        "audio_path": audio_path,
-        "language": language,
-        "tts_text": tts_text,
-        "voice_name": voice_name,
-        "description": description,
-    }
+        if stream:
+            # Relay TTS audio as ElevenLabs produces it instead of waiting
+            # for the full synthesis; the audio is still saved to the workspace.
+            result = await prepare_elevenlabs_cloned_voice_async(
+                params, output_dir=workspace_dir, persist_artifacts=False
+            )
+            tts_path = result["tts_output_path"]
+            with forget_voice_on_404(Configs.ELEVENLABS_API_KEY, result["voice_id"]):
+                audio_chunks = await elevenlabs_text_to_speech_stream_async(
+                    Configs.ELEVENLABS_API_KEY,
+                    result["voice_id"],
+                    result["tts_text"],
+                    tts_path,
+                    model_id=result["tts_model_id"],
+                    output_format=result["output_format"],
+                )
+            return StreamingResponse(
+                audio_chunks,
+                media_type=media_type,
+                headers={
+                    "Content-Disposition": f'attachment; filename="{os.path.basename(tts_path)}"'
+                },
+                background=BackgroundTask(Utils.remove_dir, workspace_dir),
+            )
 
-    result = generate_elevenlabs_cloned_voice_from_retellai(
-        params, output_dir=cache_dir
-    )
+        result = await generate_elevenlabs_cloned_voice_from_retellai_async(
+            params, output_dir=workspace_dir, persist_artifacts=False
+        )
+    except Exception:
+        Utils.remove_dir(workspace_dir)
+        raise
     tts_path = result["tts_output_path"]
 
+    # The workspace is removed once the response body has been sent
+    return FileResponse(
+        tts_path,
+        media_type=media_type,
+        filename=os.path.basename(tts_path),
+        background=BackgroundTask(Utils.remove_dir, workspace_dir),
+    )
+
+
+def write_batch_zip(zip_path, manifest, results):
+    """
+    Writes the batch manifest and every generated TTS file into one zip.
+    """
+    # Compressed audio does not shrink further, store entries as-is
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for entry, item in zip(manifest, results):
+            if item["status"] == "done":
+                archive.write(item["result"]["tts_output_path"], entry["audio_file"])
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+
+@app.post("/generate-cloned-voices/batch")
+async def generate_cloned_voices_batch(
+    items: str = Form(...),
+    audios: List[UploadFile] = File(...),
+    response_format: str = Form("zip"),
+    output_format: str = Form("mp3"),
+):
+    """
+    Runs /generate-cloned-voice for many uploads at once.
+    items is a JSON list of objects with retell_id, audio (the filename of one
+    of the uploaded files) and optional language, tts_text, voice_name and
+    description, plus an optional per-item output_format overriding the
+    output_format field. Up to BATCH_MAX_CONCURRENCY items are processed concurrently.
+    response_format "zip" returns the TTS files plus manifest.json, "json"
+    returns only the manifest (voice ids, texts, timings, errors).
+    """
+    try:
+        items = json.loads(items)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"items is not valid JSON: {e}")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="items must be a non-empty list")
+    if len(items) > Configs.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {Configs.BATCH_MAX_ITEMS} items per batch",
+        )
+    if response_format not in ("zip", "json"):
+        raise HTTPException(
+            status_code=400, detail="response_format must be 'zip' or 'json'"
+        )
+    if not all(isinstance(item, dict) for item in items):
+        raise HTTPException(status_code=400, detail="Every item must be an object")
+    # Items refer to uploads by basename, so those must be unique
+    uploads = {}
+    for audio in audios:
+        name = os.path.basename(audio.filename)
+        if name in uploads:
+            raise HTTPException(
+                status_code=400, detail=f"Duplicate upload filename: {name}"
+            )
+        uploads[name] = audio
+
+    workspace_dir = Utils.create_workspace(Configs.WORKSPACE_DIR)
+    try:
+        params_list = []
+        for index, item in enumerate(items):
+            upload = uploads.get(os.path.basename(str(item.get("audio"))))
+            if upload is None or not item.get("retell_id"):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Item {index} needs a retell_id and an uploaded audio filename",
+                )
+            item_format = item.get("output_format", output_format)
+            parse_output_format(item_format)
+            # Items may share filenames, give each one its own output directory
+            await upload.seek(0)
+            params_list.append(
+                {
+                    "retell_id": item["retell_id"],
+                    "audio_path": f"item_{index}/{upload_name(upload)}",
+                    "audio_bytes": await upload.read(),
+                    "language": item.get("language", "english"),
+                    "tts_text": item.get("tts_text"),
+                    "voice_name": item.get("voice_name"),
+                    "description": item.get("description"),
+                    "output_format": item_format,
+                }
+            )
+
+        results = await run_cloning_batch_async(
+            params_list,
+            output_dir=workspace_dir,
+            max_concurrency=Configs.BATCH_MAX_CONCURRENCY,
+            persist_artifacts=False,
+        )
+
+        manifest = []
+        for index, item in enumerate(results):
+            result = item["result"] or {}
+            entry = {
+                "index": index,
+                "retell_id": item["params"]["retell_id"],
+                "status": item["status"],
+                "error": item["error"],
+                "voice_id": result.get("voice_id"),
+                "clone_voice_name": result.get("clone_voice_name"),
+                "tts_text": result.get("tts_text"),
+                "tts_model_id": item["tts_model_id"],
+                "timings": result.get("timings", {}),
+                "audio_file": None,
+            }
+            if item["status"] == "done":
+                tts_name = os.path.basename(result["tts_output_path"])
+                entry["audio_file"] = f"{index}_{tts_name}"
+            manifest.append(entry)
+
+        if response_format == "json":
+            Utils.remove_dir(workspace_dir)
+            return {"items": manifest}
+
+        zip_path = os.path.join(workspace_dir, "batch.zip")
+        await asyncio.to_thread(write_batch_zip, zip_path, manifest, results)
+    except Exception:
+        Utils.remove_dir(workspace_dir)
+        raise
+
+    return FileResponse(
+        zip_path,
+        media_type="application/zip",
+        filename="cloned_voices.zip",
+        background=BackgroundTask(Utils.remove_dir, workspace_dir),
+    )
+
+
+@app.post("/jobs/generate-cloned-voice", status_code=202)
+async def submit_cloned_voice_job(
+    retell_id: str = Form(...),
+    language: str = Form("english"),
+    tts_text: str = Form(...),
+    voice_name: str = Form(None),
+    description: str = Form(None),
+    output_format: str = Form("mp3"),
+    audio: UploadFile = File(...),
+):
+    """
+    Queues a /generate-cloned-voice run and returns its job id immediately.
+    Responds 503 with Retry-After when the queue is full.
+    """
+    parse_output_format(output_format)
+    workspace_dir = Utils.create_workspace(Configs.WORKSPACE_DIR)
+    try:
+        audio_path = save_upload(workspace_dir, audio)
+        params = {
+            "retell_id": retell_id,
+            "audio_path": audio_path,
+            "language": language,
+            "tts_text": tts_text,
+            "voice_name": voice_name,
+            "description": description,
+            "output_format": output_format,
+        }
+        job = job_queue.submit(params, workspace_dir)
+    except QueueFullError as e:
+        Utils.remove_dir(workspace_dir)
+        return JSONResponse(
+            status_code=503, content={"detail": str(e)}, headers={"Retry-After": "5"}
+        )
+    except Exception:
+        Utils.remove_dir(workspace_dir)
+        raise
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.job_id}",
+        "audio_url": f"/jobs/{job.job_id}/audio",
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_cloned_voice_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/audio")
+async def get_cloned_voice_job_audio(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done":
+        raise HTTPException(
+            status_code=409, detail=f"Job is {job.status}, audio is not available"
+        )
+    tts_path = job.result["tts_output_path"]
     return FileResponse(
-        tts_path, media_type="audio/mpeg", filename=os.path.basename(tts_path)
+        tts_path,
+        media_type=get_output_format(job.result.get("output_format"))["media_type"],
+        filename=os.path.basename(tts_path),
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Per-stage latency histograms, byte and error counters in Prometheus text format.
+    """
+    tts_cache = get_tts_cache()
+    if tts_cache:
+        for stat, value in tts_cache.stats().items():
+            TTS_CACHE_STATS.set(value, stat=stat)
+    JOB_QUEUE_DEPTH.set(job_queue.queue_depth())
+    AUDIO_POOL_PENDING.set(get_audio_pool().pending())
+    governor = governor_stats()
+    ELEVENLABS_QUEUE_DEPTH.set(governor["waiting"])
+    ELEVENLABS_IN_FLIGHT.set(governor["in_flight"])
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
     )
 
 
@@ -0,0 +1,332 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from configs import Configs
+from metrics import HTTP_RETRIES
+from rate_governor import get_rate_governor
+
+# Methods that can be repeated without changing the result of the first call
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+# 429 means the request was rejected unprocessed; 5xx are usually transient
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value):
+    """
+    Returns:
+        float: Seconds to wait from a Retry-After header (delta-seconds or
+        HTTP date), or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _never_sent(error):
+    """
+    True if error happened before the request reached ElevenLabs, so
+    repeating it cannot duplicate any side effect.
+    """
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def _file_positions(files):
+    """
+    Returns:
+        list: (file object, offset) of every uploaded file, to rewind before a retry.
+    """
+    positions = []
+    for value in (files or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek"):
+            positions.append((fileobj, fileobj.tell()))
+    return positions
+
+
+def _release_on_close(response, release, close_name):
+    """
+    Defers release until response.<close_name>() is called, with garbage
+    collection of an abandoned response as a backstop.
+    """
+    once = threading.Lock()
+
+    def release_once():
+        if once.acquire(blocking=False):
+            release()
+
+    close = getattr(response, close_name)
+    if asyncio.iscoroutinefunction(close):
+
+        async def close_and_release():
+            try:
+                await close()
+            finally:
+                release_once()
+
+    else:
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                release_once()
+
+    setattr(response, close_name, close_and_release)
+    weakref.finalize(response, release_once)
+
+
+class ElevenLabsClient:
+    """
+    Shared access to the ElevenLabs API. Sync calls go through one pooled
+    requests.Session, async calls through one httpx.AsyncClient per event
+    loop, so connections (and their TLS sessions) are kept alive and reused.
+    Every attempt first passes the API key's rate governor (see
+    rate_governor.py). Failed calls are retried with exponential backoff and
+    jitter, waiting at least as long as a Retry-After header asks:
+    - 429 responses and connection failures before the request was sent are
+      always retried;
+    - 5xx responses and other transport errors only for idempotent requests
+      (GET/PUT/DELETE, or calls passing idempotent=True).
+    """
+
+    def __init__(
+        self,
+        base_url,
+        timeout_sec=120.0,
+        connect_timeout_sec=10.0,
+        max_retries=3,
+        backoff_base_sec=0.5,
+        backoff_max_sec=30.0,
+        pool_size=20,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout_sec = timeout_sec
+        self.connect_timeout_sec = connect_timeout_sec
+        self.max_retries = max_retries
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._session = None
+        # A pooled httpx connection is bound to the loop that opened it
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def retry_delay(self, attempt, response=None, error=None, idempotent=False):
+        """
+        Returns:
+            float: Seconds to wait before retrying after attempt (0-based)
+            failed with response or error, or None if it must not be retried.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if response is not None:
+            if response.status_code not in RETRY_STATUSES:
+                return None
+            if response.status_code != 429 and not idempotent:
+                return None
+            reason = str(response.status_code)
+        else:
+            if not (idempotent or _never_sent(error)):
+                return None
+            reason = type(error).__name__
+        backoff = random.uniform(
+            0, min(self.backoff_max_sec, self.backoff_base_sec * 2**attempt)
+        )
+        retry_after = None
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            if retry_after > self.backoff_max_sec:
+                # Waiting that long would outlast any caller, fail now instead
+                return None
+            backoff = max(backoff, retry_after)
+        HTTP_RETRIES.inc(reason=reason)
+        return backoff
+
+    def request(self, method, path, api_key, idempotent=None, characters=0, **kwargs):
+        """
+        Sends a request with the pooled requests.Session, retrying as described
+        on the class. kwargs are passed to requests (json, data, files, params,
+        headers, stream...); file objects in files are rewound before each retry.
+        characters counts against the characters-per-minute limit. A streamed
+        response holds its concurrency slot until it is closed.
+        Returns:
+            requests.Response: The final response, error statuses included.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        kwargs["headers"] = {"xi-api-key": api_key, **kwargs.get("headers", {})}
+        kwargs.setdefault("timeout", (self.connect_timeout_sec, self.timeout_sec))
+        positions = _file_positions(kwargs.get("files"))
+        session = self._get_session()
+        governor = get_rate_governor(api_key)
+        attempt = 0
+        while True:
+            for fileobj, offset in positions:
+                fileobj.seek(offset)
+            governor.acquire(characters)
+            keep_slot = False
+            try:
+                try:
+                    response = session.request(method, self.url(path), **kwargs)
+                except requests.RequestException as e:
+                    delay = self.retry_delay(attempt, error=e, idempotent=idempotent)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self.retry_delay(attempt, response, idempotent=idempotent)
+                    if delay is None:
+                        if kwargs.get("stream"):
+                            keep_slot = True
+                            _release_on_close(response, governor.release, "close")
+                        return response
+                    response.close()
+            finally:
+                if not keep_slot:
+                    governor.release()
+            time.sleep(delay)
+            attempt += 1
+
+    async def request_async(
+        self,
+        method,
+        path,
+        api_key,
+        idempotent=None,
+        characters=0,
+        stream=False,
+        **kwargs,
+    ):
+        """
+        Async variant of request using the event loop's pooled httpx.AsyncClient.
+        With stream=True the body is not read; retries then only happen before
+        the response arrives, and the caller must aclose() the response, which
+        also frees its concurrency slot.
+        Returns:
+            httpx.Response: The final response, error statuses included.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        kwargs["headers"] = {"xi-api-key": api_key, **kwargs.get("headers", {})}
+        positions = _file_positions(kwargs.get("files"))
+        client = self._get_async_client()
+        governor = get_rate_governor(api_key)
+        attempt = 0
+        while True:
+            for fileobj, offset in positions:
+                fileobj.seek(offset)
+            await governor.acquire_async(characters)
+            keep_slot = False
+            try:
+                try:
+                    request = client.build_request(method, self.url(path), **kwargs)
+                    response = await client.send(request, stream=stream)
+                except httpx.TransportError as e:
+                    delay = self.retry_delay(attempt, error=e, idempotent=idempotent)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self.retry_delay(attempt, response, idempotent=idempotent)
+                    if delay is None:
+                        if stream:
+                            keep_slot = True
+                            _release_on_close(response, governor.release, "aclose")
+                        return response
+                    await response.aclose()
+            finally:
+                if not keep_slot:
+                    governor.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+    async def aclose(self):
+        """
+        Closes the async client of the running event loop.
+        """
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(
+                        self.timeout_sec, connect=self.connect_timeout_sec
+                    ),
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                    ),
+                )
+                self._async_clients[loop] = client
+            return client
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_elevenlabs_client():
+    """
+    Returns the process-wide ElevenLabs client configured by
+    ELEVENLABS_API_BASE_URL, ELEVENLABS_TIMEOUT_SEC,
+    ELEVENLABS_CONNECT_TIMEOUT_SEC, ELEVENLABS_MAX_RETRIES and
+    ELEVENLABS_POOL_SIZE.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = ElevenLabsClient(
+                Configs.ELEVENLABS_API_BASE_URL,
+                timeout_sec=Configs.ELEVENLABS_TIMEOUT_SEC,
+                connect_timeout_sec=Configs.ELEVENLABS_CONNECT_TIMEOUT_SEC,
+                max_retries=Configs.ELEVENLABS_MAX_RETRIES,
+                pool_size=Configs.ELEVENLABS_POOL_SIZE,
+            )
+        return _default_client
@@ -1,9 +1,17 @@
+import asyncio
+import functools
 import os
-import requests
+import uuid
 from typing import List, Dict
 from googletrans import Translator
+from audio_formats import get_output_format
 from configs import Configs
-from utils import Utils
+from elevenlabs_client import get_elevenlabs_client
+from elevenlabs_retell_voice_cloning import elevenlabs_text_to_speech, is_tts_cached
+from model_latency import get_model_latency_tracker, hedged_call
+from tts_batch import run_tts_batch_async
+from voice_catalog import get_voice_catalog
+from voice_registry import get_voice_registry
 
 
 def translate_text(text: str, dest_lang: str) -> str:
@@ -12,33 +20,15 @@ def translate_text(text: str, dest_lang: str) -> str:
     return result.text
 
 
-def elevenlabs_text_to_speech(
-    api_key, voice_id, text, output_path, model_id="eleven_turbo_v2"
-):
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-    headers = {"xi-api-key": api_key, "Content-Type": "application/json"}
-    payload = {
-        "text": text,
-        "model_id": model_id,
-        "voice_settings": {
-            # "speed": 1.0,  # Controls playback speed (1.0 = normal), default is 1.0
-            "stability": 0.5,  # Controls voice consistency (0.0-1.0), default is 0.5
-            "similarity_boost": 0.75,  # Controls similarity to original voice (0.0-1.0), default is 0.75
-            # Optional settings below (if supported by your ElevenLabs plan/model):
-            # "style": 0.0,             # Controls expressiveness (0.0-1.0)
-            # "use_speaker_boost": True # Boosts speaker presence (True/False)
-        },
-    }
-    response = requests.post(url, headers=headers, json=payload)
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as e:
-        print(f"TTS API error for model {model_id}, voice {voice_id}: {response.text}")
-        raise
-    with open(output_path, "wb") as f:
-        f.write(response.content)
-    print(f"TTS audio: {output_path}")
-    return output_path
+# Voice settings for the multilingual voices (ElevenLabs defaults noted per key)
+MULTILINGUAL_VOICE_SETTINGS = {
+    # "speed": 1.0,  # Controls playback speed (1.0 = normal), default is 1.0
+    "stability": 0.5,  # Controls voice consistency (0.0-1.0), default is 0.5
+    "similarity_boost": 0.75,  # Controls similarity to original voice (0.0-1.0), default is 0.75
+    # Optional settings below (if supported by your ElevenLabs plan/model):
+    # "style": 0.0,             # Controls expressiveness (0.0-1.0)
+    # "use_speaker_boost": True # Boosts speaker presence (True/False)
+}
 
 
 def delete_elevenlabs_voice(api_key, voice_id):
@@ -48,59 +38,208 @@ def delete_elevenlabs_voice(api_key, voice_id):
     If you use a public voice for TTS, ElevenLabs may clone it to 'My Voices' as a custom voice.
     This function will attempt to delete the custom voice if it exists.
     """
-    url = f"https://api.elevenlabs.io/v1/voices/{voice_id}"
-    headers = {"xi-api-key": api_key}
-    response = requests.delete(url, headers=headers)
+    response = get_elevenlabs_client().request(
+        "DELETE", f"/v1/voices/{voice_id}", api_key
+    )
     if response.status_code == 200:
+        get_voice_registry().forget_voice(api_key, voice_id)
+        get_voice_catalog().remove(api_key, voice_id)
         print(f"Deleted ElevenLabs voice: {voice_id}")
     else:
         print(f"Failed to delete voice {voice_id}: {response.text}")
 
 
+def _output_filename(voice, model_id, output_format):
+    extension = get_output_format(output_format)["extension"]
+    return f"tts_{voice['language']}_{voice['gender']}_{voice['voice_id']}_{model_id}{extension}"
+
+
+def _synthesize_voice(
+    api_key, voice, output_dir, output_format, model_id, hedged=False
+):
+    """
+    Synthesizes voice["input_text"] with model_id into output_dir.
+    A hedged attempt writes to a temp file beside its output instead; only
+    the winning attempt is moved into place.
+    Returns:
+        str: Path to the saved audio file.
+    """
+    output_path = os.path.join(
+        output_dir, _output_filename(voice, model_id, output_format)
+    )
+    if hedged:
+        output_path = f"{output_path}.{uuid.uuid4().hex}.hedge"
+    return elevenlabs_text_to_speech(
+        api_key,
+        voice["voice_id"],
+        voice["input_text"],
+        output_path,
+        model_id=model_id,
+        output_format=output_format,
+        voice_settings=MULTILINGUAL_VOICE_SETTINGS,
+    )
+
+
+def _discard_hedged_attempt(model_id, path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 def generate_multilingual_tts_for_voices(
     voice_list: List[Dict[str, str]],
     output_dir: str,
     tts_models=None,
     delete_custom_voices=False,
+    output_format="mp3",
+    latency_aware=False,
+    hedge_after_sec=None,
 ):
     """
     voice_list: List of dicts with keys 'voice_id', 'language', and optionally 'name'.
     text: The input text to translate and synthesize.
     output_dir: Directory to save output audio files.
     delete_custom_voices: If True, attempts to delete the voice after TTS (only works for custom voices).
+    output_format: TTS audio format, see audio_formats.TTS_OUTPUT_FORMATS.
+    latency_aware: If True, synthesizes each voice once with the fastest model
+        by running p50 instead of every model, hedging with the next model when
+        it is slow (see model_latency.hedged_call). Only the winning model's
+        file is produced; a losing attempt's audio is discarded.
+    hedge_after_sec: Hedge deadline until a model has enough latency samples
+        (default: TTS_HEDGE_AFTER_SEC).
     """
     api_key = Configs.ELEVENLABS_API_KEY
     os.makedirs(output_dir, exist_ok=True)
     if tts_models is None:
         tts_models = ["eleven_turbo_v2"]
+    # Fail on an unsupported format before any voice is synthesized
+    get_output_format(output_format)
     for voice in voice_list:
         voice_id = voice["voice_id"]
         language = voice["language"]
         input_text = voice["input_text"]
-        gender = voice["gender"]
         print(
             f"\nVoice: {language} https://elevenlabs.io/app/voice-library?voiceId={voice_id}"
         )
         print(f'Input text: "{input_text}"')
+        # Bound per voice: a losing hedged attempt can outlive this iteration
+        synthesize = functools.partial(
+            _synthesize_voice, api_key, voice, output_dir, output_format
+        )
         success = False
-        for model_id in tts_models:
-            output_path = os.path.join(
-                output_dir, f"tts_{language}_{gender}_{voice_id}_{model_id}.mp3"
+        tracker = get_model_latency_tracker()
+        cached_model = None
+        if latency_aware:
+            # A cache hit says nothing about model latency, serve it unhedged
+            # and keep it out of the statistics
+            cached_model = next(
+                (
+                    model_id
+                    for model_id in tracker.rank(tts_models)
+                    if is_tts_cached(
+                        voice_id,
+                        input_text,
+                        model_id,
+                        output_format,
+                        MULTILINGUAL_VOICE_SETTINGS,
+                    )
+                ),
+                None,
             )
+        if cached_model:
             try:
-                elevenlabs_text_to_speech(
-                    api_key, voice_id, input_text, output_path, model_id=model_id
+                output_path = synthesize(cached_model)
+                print(
+                    f"Voice {language} served from cache for {cached_model}: {output_path}"
                 )
                 success = True
             except Exception as e:
-                print(
-                    f"Error processing voice {language} (ID: {voice_id}, Model: {model_id}): {e}"
+                print(f"Error processing voice {language} (ID: {voice_id}): {e}")
+        elif latency_aware:
+            try:
+                model_id, attempt_path = hedged_call(
+                    functools.partial(synthesize, hedged=True),
+                    tts_models,
+                    tracker,
+                    hedge_after_sec=hedge_after_sec,
+                    discard=_discard_hedged_attempt,
+                    # A loser still synthesizing would fail once the voice is deleted
+                    wait_for_losers=delete_custom_voices,
+                )
+                output_path = os.path.join(
+                    output_dir, _output_filename(voice, model_id, output_format)
                 )
-                continue
+                os.replace(attempt_path, output_path)
+                print(f"Voice {language} synthesized with {model_id}: {output_path}")
+                success = True
+            except Exception as e:
+                print(f"Error processing voice {language} (ID: {voice_id}): {e}")
+        else:
+            for model_id in tts_models:
+                try:
+                    synthesize(model_id)
+                    success = True
+                except Exception as e:
+                    print(
+                        f"Error processing voice {language} (ID: {voice_id}, Model: {model_id}): {e}"
+                    )
+                    continue
         if delete_custom_voices and success:
             delete_elevenlabs_voice(api_key, voice_id)
 
 
+def generate_multilingual_tts_batch(
+    voice_list: List[Dict[str, str]],
+    output_dir: str,
+    tts_models=None,
+    delete_custom_voices=False,
+    output_format="mp3",
+    max_concurrency=None,
+):
+    """
+    Concurrent, resumable counterpart of generate_multilingual_tts_for_voices:
+    every voice x model output is synthesized by tts_batch.run_tts_batch_async,
+    up to max_concurrency at a time (default TTS_BATCH_MAX_CONCURRENCY).
+    Outputs completed by an earlier run are kept and skipped; progress is
+    printed and each output is logged to <output_dir>/results.jsonl.
+    delete_custom_voices: If True, attempts to delete each voice once all of
+    its outputs exist and at least one was synthesized by this run, so a
+    resumed run does not delete voices again (only works for custom voices).
+    Returns:
+        list: One result dict per voice x model, see run_tts_batch_async.
+    """
+    if tts_models is None:
+        tts_models = ["eleven_turbo_v2"]
+    jobs = [
+        {
+            "filename": _output_filename(voice, model_id, output_format),
+            "voice_id": voice["voice_id"],
+            "text": voice["input_text"],
+            "model_id": model_id,
+        }
+        for voice in voice_list
+        for model_id in tts_models
+    ]
+    results = asyncio.run(
+        run_tts_batch_async(
+            jobs,
+            output_dir,
+            output_format=output_format,
+            voice_settings=MULTILINGUAL_VOICE_SETTINGS,
+            max_concurrency=max_concurrency,
+        )
+    )
+    if delete_custom_voices:
+        failed = {r["voice_id"] for r in results if r["status"] == "failed"}
+        done = [r["voice_id"] for r in results if r["status"] == "done"]
+        for voice_id in dict.fromkeys(done):
+            # Keep voices with missing outputs so a rerun can still finish them
+            if voice_id not in failed:
+                delete_elevenlabs_voice(Configs.ELEVENLABS_API_KEY, voice_id)
+    return results
+
+
 if __name__ == "__main__":
 
     # Example usage
@@ -286,8 +425,8 @@ if __name__ == "__main__":
         # },
     ]
 
+    # Existing outputs are kept: the batch resumes from output/manifest.json
     output_dir = "output"
-    Utils.clear_dir(output_dir)
 
     # List of available ElevenLabs TTS models (as of 2024-06)
     tts_models = [
@@ -299,7 +438,7 @@ if __name__ == "__main__":
     # Set delete_custom_voices=True to attempt deleting voices after TTS (only works for custom voices)
     delete_custom_voices = True
 
-    generate_multilingual_tts_for_voices(
+    generate_multilingual_tts_batch(
         voice_list,
         output_dir,
         tts_models=tts_models,
@@ -1,71 +1,173 @@
 import os
+import asyncio
+import io
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pydub import AudioSegment
+import httpx
 import requests
+from audio_formats import get_output_format
+from audio_pcm import loop_to_mp3, prepare_clone_sample
+from audio_pool import get_audio_pool
+from audio_transcode import transcode_to_ulaw_frames
+from pcm_cache import get_pcm_cache
+from audio_probe import probe_audio
 from configs import Configs
+from elevenlabs_client import get_elevenlabs_client
 import json
+from metrics import (
+    SINGLEFLIGHT_SHARED,
+    STAGE_DURATION,
+    STAGE_ERRORS,
+    TTS_CHARACTERS,
+    observe_stage,
+    record_bytes,
+)
+from singleflight import AsyncSingleFlight, SingleFlight
+from tts_cache import TTSCache, get_tts_cache
+from tts_chunking import CONCATENABLE_FORMATS, split_text_chunks, stitch_audio
 from utils import Utils
+from voice_catalog import get_voice_catalog
+from voice_registry import (
+    fingerprint_bytes,
+    fingerprint_file,
+    get_voice_registry,
+)
 
+DEFAULT_VOICE_SETTINGS = {"stability": 0.5, "similarity_boost": 0.5}
+# TTS bodies are copied to disk in chunks of this size, never held whole
+TTS_CHUNK_SIZE = 64 * 1024
 
-def extrapolate_audio(input_path, output_folder, target_duration_sec=10):
+# Coalesce identical in-flight TTS syntheses and clones of the same voice name
+_TTS_FLIGHTS = SingleFlight()
+_TTS_FLIGHTS_ASYNC = AsyncSingleFlight()
+_CLONE_FLIGHTS = AsyncSingleFlight()
+_VOICE_LIST_FLIGHTS = AsyncSingleFlight()
+
+
+def extrapolate_audio(input_path, output_folder, target_duration_sec=10, audio=None):
     """
     Extrapolates (loops) a short audio file to at least target_duration_sec seconds.
     Args:
         input_path (str): Path to the input audio file.
         output_folder (str): Folder to save the output file.
         target_duration_sec (int): Minimum duration for the output audio in seconds.
+        audio (AudioSegment): Optional already-decoded input, skips loading input_path.
     Returns:
         str: Path to the output audio file.
     """
     # Load audio
-    audio = AudioSegment.from_file(input_path)
-    target_duration_ms = target_duration_sec * 1000
-
-    # Loop the audio until reaching the target duration
-    loops = (target_duration_ms // len(audio)) + 1
-    extended_audio = audio * loops
-    extended_audio = extended_audio[:target_duration_ms]
+    if audio is None:
+        pcm_cache = get_pcm_cache()
+        with observe_stage("decode"):
+            if pcm_cache is not None:
+                audio = pcm_cache.decode(input_path)
+            else:
+                audio = AudioSegment.from_file(input_path)
+    buffer = extrapolate_audio_to_buffer(audio, target_duration_sec)
 
     # Prepare output path
     os.makedirs(output_folder, exist_ok=True)
     base, ext = os.path.splitext(os.path.basename(input_path))
     output_filename = f"extrapolated_{base}.mp3"
     output_path = os.path.join(output_folder, output_filename)
-    extended_audio.export(output_path, format="mp3")
+    with open(output_path, "wb") as f:
+        f.write(buffer.getbuffer())
+    record_bytes("extrapolate", "written", buffer.getbuffer().nbytes)
 
     print(f"Extrapolated audio saved to: {output_path}")
     return output_path
 
 
-def create_elevenlabs_voice_clone(api_key, name, audio_path, description=""):
+def extrapolate_audio_to_buffer(audio, target_duration_sec=10):
+    """
+    Loops decoded audio to target_duration_sec seconds and encodes it as mp3 in memory.
+    Args:
+        audio (AudioSegment): Decoded input audio.
+        target_duration_sec (int): Minimum duration for the output audio in seconds.
+    Returns:
+        io.BytesIO: The mp3 data, positioned at the start.
+    """
+    target_duration_ms = target_duration_sec * 1000
+    with observe_stage("extrapolate"):
+        # Loop the PCM samples until reaching the target duration, crossfading
+        # the seams, then encode once
+        return loop_to_mp3(
+            audio, target_duration_ms, crossfade_ms=Configs.EXTRAPOLATE_CROSSFADE_MS
+        )
+
+
+@contextmanager
+def _audio_upload(audio, filename=None):
+    """
+    Prepares an audio argument for a multipart upload without copying it to disk.
+    Args:
+        audio: Path to an audio file, its bytes, or a binary file object.
+        filename (str): Name to upload under, defaults to the file's own name.
+    Yields:
+        tuple: (filename, binary file object, size in bytes)
+    """
+    if isinstance(audio, (str, os.PathLike)):
+        with open(audio, "rb") as f:
+            yield filename or os.path.basename(audio), f, os.path.getsize(audio)
+    elif isinstance(audio, (bytes, bytearray, memoryview)):
+        yield filename or "audio.mp3", io.BytesIO(audio), len(audio)
+    else:
+        start = audio.tell()
+        size = audio.seek(0, os.SEEK_END) - start
+        audio.seek(start)
+        name = filename or os.path.basename(getattr(audio, "name", "audio.mp3"))
+        yield name, audio, size
+
+
+def create_elevenlabs_voice_clone(
+    api_key, name, audio_path, description="", filename=None
+):
     """
     Calls ElevenLabs API to create a voice clone from a reference audio file.
     Args:
         api_key (str): Your ElevenLabs API key.
         name (str): Name for the new voice.
-        audio_path (str): Path to the reference audio file.
+        audio_path (str): Path to the reference audio file, or its bytes / binary file object.
         description (str): Optional description for the voice.
+        filename (str): Upload file name when audio_path is not a path.
     Returns:
         str: The created voice ID.
     """
-    url = "https://api.elevenlabs.io/v1/voices/add"
-    headers = {"xi-api-key": api_key}
-    files = {
-        "files": (os.path.basename(audio_path), open(audio_path, "rb"), "audio/wav"),
-    }
     data = {
         "name": name,
         "description": description,
         "labels": "{}",
     }
-    response = requests.post(url, headers=headers, data=data, files=files)
-    response.raise_for_status()
+    with observe_stage("clone"):
+        with _audio_upload(audio_path, filename) as (upload_name, f, size):
+            files = {"files": (upload_name, f, "audio/wav")}
+            # Not idempotent: only retried when ElevenLabs never saw the request
+            response = get_elevenlabs_client().request(
+                "POST", "/v1/voices/add", api_key, data=data, files=files
+            )
+        response.raise_for_status()
+    record_bytes("clone", "sent", size)
     voice_id = response.json().get("voice_id")
+    get_voice_catalog().add(api_key, voice_id, name)
     print(f"Created ElevenLabs voice with ID: {voice_id}")
     return voice_id
 
 
 def elevenlabs_text_to_speech(
-    api_key, voice_id, text, output_path, model_id="eleven_turbo_v2"
+    api_key,
+    voice_id,
+    text,
+    output_path,
+    model_id="eleven_turbo_v2",
+    output_format="mp3",
+    voice_settings=None,
+    chunk_chars=None,
+    crossfade_ms=None,
 ):
     """
     Calls ElevenLabs API to generate TTS audio from text using a voice reference audio.
@@ -73,84 +175,947 @@ def elevenlabs_text_to_speech(
         api_key (str): Your ElevenLabs API key.
         voice_id (str): The voice ID to use.
         text (str): The text to synthesize.
-        output_path (str): Path to save the output audio file.
+        output_path (str): Path to save the output audio file, or a writable
+            binary file object to stream the audio into (not cached).
         model_id (str): Model to use (default: "eleven_turbo_v2").
+        output_format (str): Audio format, see audio_formats.TTS_OUTPUT_FORMATS.
+        voice_settings (dict): Defaults to DEFAULT_VOICE_SETTINGS.
+        chunk_chars (int): Texts longer than this are split into sentence
+            chunks synthesized in parallel and stitched in order (default:
+            TTS_PARALLEL_CHUNK_CHARS, 0 disables).
+        crossfade_ms (int): Crossfade between stitched chunks (default:
+            TTS_PARALLEL_CROSSFADE_MS).
+    Returns:
+        str: Path to the saved audio file (output_path).
+    """
+    chunks = _tts_chunks(text, chunk_chars)
+    if chunks:
+        return _text_to_speech_chunked(
+            api_key,
+            voice_id,
+            chunks,
+            output_path,
+            model_id,
+            output_format,
+            voice_settings,
+            crossfade_ms,
+        )
+    payload, query, cache_key = _tts_request(
+        voice_id, text, model_id, output_format, voice_settings
+    )
+    tts_cache = get_tts_cache()
+    if tts_cache and tts_cache.fetch(cache_key, output_path):
+        print(f"TTS audio served from cache: {output_path}")
+        return output_path
+
+    def synthesize():
+        received = 0
+        with observe_stage("tts"):
+            # Synthesis has no side effects, so it is retried like a GET
+            response = get_elevenlabs_client().request(
+                "POST",
+                f"/v1/text-to-speech/{voice_id}",
+                api_key,
+                idempotent=True,
+                characters=len(text),
+                stream=True,
+                params=query,
+                json=payload,
+            )
+            with response:
+                try:
+                    response.raise_for_status()
+                except requests.HTTPError:
+                    print(
+                        f"TTS API error for model {model_id}, voice {voice_id}: {response.text}"
+                    )
+                    raise
+                with _open_output(output_path) as f:
+                    for chunk in response.iter_content(TTS_CHUNK_SIZE):
+                        received += len(chunk)
+                        f.write(chunk)
+        record_bytes("tts", "received", received)
+        TTS_CHARACTERS.inc(len(text), model_id=model_id)
+        if tts_cache and _is_path(output_path):
+            tts_cache.store(cache_key, output_path)
+        return output_path
+
+    # Identical requests already in flight share one upstream synthesis
+    produced_path, shared = _TTS_FLIGHTS.do(cache_key, synthesize)
+    if shared:
+        SINGLEFLIGHT_SHARED.inc(operation="tts")
+        if not _copy_shared_output(produced_path, output_path):
+            synthesize()
+    print(f"TTS audio saved to: {output_path}")
+    return output_path
+
+
+def _tts_chunks(text, chunk_chars=None):
+    """
     Returns:
-        str: Path to the saved audio file.
+        list: Sentence chunks of text to synthesize in parallel, or None if
+        chunking is disabled or text fits in a single request.
+    """
+    if chunk_chars is None:
+        chunk_chars = Configs.TTS_PARALLEL_CHUNK_CHARS
+    if not chunk_chars or len(text) <= chunk_chars:
+        return None
+    chunks = split_text_chunks(text, chunk_chars)
+    return chunks if len(chunks) > 1 else None
+
+
+def _chunk_paths(chunk_dir, chunks, output_format):
+    extension = get_output_format(output_format)["extension"]
+    return [
+        os.path.join(chunk_dir, f"{index}{extension}") for index in range(len(chunks))
+    ]
+
+
+def _text_to_speech_chunked(
+    api_key,
+    voice_id,
+    chunks,
+    output_path,
+    model_id,
+    output_format,
+    voice_settings,
+    crossfade_ms=None,
+):
+    """
+    Synthesizes chunks concurrently (at most TTS_PARALLEL_MAX_CONCURRENCY at
+    a time) and stitches them into output_path. Each chunk is an ordinary TTS
+    call, so it is cached and coalesced on its own.
+    """
+    if crossfade_ms is None:
+        crossfade_ms = Configs.TTS_PARALLEL_CROSSFADE_MS
+    with tempfile.TemporaryDirectory(prefix="tts_chunks_") as chunk_dir:
+        paths = _chunk_paths(chunk_dir, chunks, output_format)
+        workers = min(len(chunks), Configs.TTS_PARALLEL_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    elevenlabs_text_to_speech,
+                    api_key,
+                    voice_id,
+                    chunk,
+                    path,
+                    model_id,
+                    output_format,
+                    voice_settings,
+                    chunk_chars=0,
+                )
+                for chunk, path in zip(chunks, paths)
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        stitched_path = os.path.join(chunk_dir, "stitched")
+        with observe_stage("tts_stitch"):
+            stitch_audio(paths, stitched_path, output_format, crossfade_ms)
+            _copy_shared_output(stitched_path, output_path)
+    print(f"TTS audio stitched from {len(chunks)} chunks: {output_path}")
+    return output_path
+
+
+async def _gather_or_cancel(tasks):
+    """
+    Waits for all tasks; if one fails, cancels and waits for the rest before
+    re-raising, so none of them outlives the caller's temp files.
+    """
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _start_chunk_tasks(
+    api_key, voice_id, chunks, paths, model_id, output_format, voice_settings
+):
+    """
+    Returns:
+        list: One task per chunk synthesizing it into the matching path, at
+        most TTS_PARALLEL_MAX_CONCURRENCY running at a time.
+    """
+    semaphore = asyncio.Semaphore(Configs.TTS_PARALLEL_MAX_CONCURRENCY)
+
+    async def synthesize(chunk, path):
+        async with semaphore:
+            return await elevenlabs_text_to_speech_async(
+                api_key,
+                voice_id,
+                chunk,
+                path,
+                model_id,
+                output_format,
+                voice_settings,
+                chunk_chars=0,
+            )
+
+    return [
+        asyncio.ensure_future(synthesize(chunk, path))
+        for chunk, path in zip(chunks, paths)
+    ]
+
+
+async def _text_to_speech_chunked_async(
+    api_key,
+    voice_id,
+    chunks,
+    output_path,
+    model_id,
+    output_format,
+    voice_settings,
+    crossfade_ms=None,
+):
+    """
+    Non-blocking variant of _text_to_speech_chunked; stitching runs in the
+    audio pool.
+    """
+    if crossfade_ms is None:
+        crossfade_ms = Configs.TTS_PARALLEL_CROSSFADE_MS
+    with tempfile.TemporaryDirectory(prefix="tts_chunks_") as chunk_dir:
+        paths = _chunk_paths(chunk_dir, chunks, output_format)
+        await _gather_or_cancel(
+            _start_chunk_tasks(
+                api_key,
+                voice_id,
+                chunks,
+                paths,
+                model_id,
+                output_format,
+                voice_settings,
+            )
+        )
+        stitched_path = os.path.join(chunk_dir, "stitched")
+        with observe_stage("tts_stitch"):
+            await get_audio_pool().run(
+                stitch_audio, paths, stitched_path, output_format, crossfade_ms
+            )
+            await asyncio.to_thread(_copy_shared_output, stitched_path, output_path)
+    print(f"TTS audio stitched from {len(chunks)} chunks: {output_path}")
+    return output_path
+
+
+def _tts_request(voice_id, text, model_id, output_format, voice_settings=None):
+    """
+    Returns:
+        tuple: (json payload, query params, TTS cache key) of a TTS call.
     """
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
-    headers = {"xi-api-key": api_key, "Content-Type": "application/json"}
     payload = {
         "text": text,
         "model_id": model_id,
-        "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
+        "voice_settings": voice_settings or DEFAULT_VOICE_SETTINGS,
     }
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
-    with open(output_path, "wb") as f:
-        f.write(response.content)
-    print(f"TTS audio saved to: {output_path}")
-    return output_path
+    # Let ElevenLabs encode the requested format directly, no local transcoding
+    query = {"output_format": get_output_format(output_format)["elevenlabs"]}
+    cache_key = TTSCache.make_key(
+        voice_id, model_id, text, payload["voice_settings"], query["output_format"]
+    )
+    return payload, query, cache_key
+
+
+def is_tts_cached(
+    voice_id,
+    text,
+    model_id="eleven_turbo_v2",
+    output_format="mp3",
+    voice_settings=None,
+    chunk_chars=None,
+):
+    """
+    Returns:
+        bool: True if elevenlabs_text_to_speech with these arguments would be
+        served entirely from the TTS cache (every chunk of a chunked text).
+    """
+    tts_cache = get_tts_cache()
+    if not tts_cache:
+        return False
+    texts = _tts_chunks(text, chunk_chars) or [text]
+    return all(
+        tts_cache.contains(
+            _tts_request(voice_id, chunk, model_id, output_format, voice_settings)[2]
+        )
+        for chunk in texts
+    )
+
+
+def _is_path(output):
+    return isinstance(output, (str, os.PathLike))
+
 
+@contextmanager
+def _open_output(output):
+    """
+    Yields a binary file to write audio for output, a path or a writable file
+    object. A path is written through a temp file beside it that is renamed
+    into place once the block succeeds, so readers never see partial audio.
+    """
+    if not _is_path(output):
+        yield output
+        return
+    tmp_path = f"{output}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _copy_shared_output(produced_path, output_path):
+    """
+    Copies audio produced by a coalesced call to this caller's output.
+    Returns:
+        bool: False if the producing caller wrote to a file object or already
+        removed its file.
+    """
+    if produced_path is output_path or produced_path == output_path:
+        return True
+    if not _is_path(produced_path):
+        return False
+    try:
+        with open(produced_path, "rb") as src, _open_output(output_path) as dst:
+            shutil.copyfileobj(src, dst, TTS_CHUNK_SIZE)
+    except FileNotFoundError:
+        return False
+    return True
 
-def elevenlabs_speech_to_text(api_key, audio_path, model_id="scribe_v1"):
+
+def elevenlabs_speech_to_text(api_key, audio_path, model_id="scribe_v1", filename=None):
     """
     Transcribes audio to text using ElevenLabs Speech-to-Text API.
     Args:
         api_key (str): Your ElevenLabs API key.
-        audio_path (str): Path to the audio file.
+        audio_path (str): Path to the audio file, or its bytes / binary file object.
     model_id (str): Model to use (default: scribe_v1).
+        filename (str): Upload file name when audio_path is not a path.
     Returns:
         str: Transcribed text.
     """
-    url = f"https://api.elevenlabs.io/v1/speech-to-text"
-    headers = {"xi-api-key": api_key}
     data = {"model_id": model_id}
     # Use correct parameter name 'file' and context manager
-    with open(audio_path, "rb") as f:
-        files = {"file": (os.path.basename(audio_path), f, "audio/wav")}
-        response = requests.post(url, headers=headers, data=data, files=files)
+    with observe_stage("stt"):
+        with _audio_upload(audio_path, filename) as (upload_name, f, size):
+            files = {"file": (upload_name, f, "audio/wav")}
+            response = get_elevenlabs_client().request(
+                "POST",
+                "/v1/speech-to-text",
+                api_key,
+                idempotent=True,
+                data=data,
+                files=files,
+            )
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            print(f"STT API error: {response.text}")
+            raise
+    record_bytes("stt", "sent", size)
+    text = response.json().get("text", "")
+    print(f"Transcribed text: {text}")
+    return text
+
+
+def list_elevenlabs_voices(api_key):
+    """
+    Returns:
+        list: Voice dicts from the ElevenLabs /v1/voices listing.
+    """
+    with observe_stage("voice_list"):
+        response = get_elevenlabs_client().request("GET", "/v1/voices", api_key)
+        response.raise_for_status()
+    record_bytes("voice_list", "received", len(response.content))
+    return response.json().get("voices", [])
+
+
+def get_elevenlabs_voice_id_by_name(api_key, name):
+    """
+    Looks up a voice by case-insensitive name in the cached voice catalog,
+    listing voices from ElevenLabs only when the catalog has expired.
+    """
+    with observe_stage("voice_lookup"):
+        catalog = get_voice_catalog()
+        if catalog.is_stale(api_key):
+            fetched_at = time.monotonic()
+            catalog.load(api_key, list_elevenlabs_voices(api_key), fetched_at)
+        return catalog.find_voice_id(api_key, name)
+
+
+async def create_elevenlabs_voice_clone_async(
+    api_key, name, audio_path, description="", filename=None
+):
+    """
+    Non-blocking variant of create_elevenlabs_voice_clone.
+    Returns:
+        str: The created voice ID.
+    """
+    data = {
+        "name": name,
+        "description": description,
+        "labels": "{}",
+    }
+    with observe_stage("clone"):
+        with _audio_upload(audio_path, filename) as (upload_name, f, size):
+            files = {"files": (upload_name, f, "audio/wav")}
+            response = await get_elevenlabs_client().request_async(
+                "POST", "/v1/voices/add", api_key, data=data, files=files
+            )
+        response.raise_for_status()
+    record_bytes("clone", "sent", size)
+    voice_id = response.json().get("voice_id")
+    get_voice_catalog().add(api_key, voice_id, name)
+    print(f"Created ElevenLabs voice with ID: {voice_id}")
+    return voice_id
+
+
+async def elevenlabs_text_to_speech_async(
+    api_key,
+    voice_id,
+    text,
+    output_path,
+    model_id="eleven_turbo_v2",
+    output_format="mp3",
+    voice_settings=None,
+    chunk_chars=None,
+    crossfade_ms=None,
+):
+    """
+    Non-blocking variant of elevenlabs_text_to_speech.
+    Returns:
+        str: Path to the saved audio file (output_path).
+    """
+    chunks = _tts_chunks(text, chunk_chars)
+    if chunks:
+        return await _text_to_speech_chunked_async(
+            api_key,
+            voice_id,
+            chunks,
+            output_path,
+            model_id,
+            output_format,
+            voice_settings,
+            crossfade_ms,
+        )
+    payload, query, cache_key = _tts_request(
+        voice_id, text, model_id, output_format, voice_settings
+    )
+    tts_cache = get_tts_cache()
+    if tts_cache and tts_cache.fetch(cache_key, output_path):
+        print(f"TTS audio served from cache: {output_path}")
+        return output_path
+
+    async def synthesize():
+        received = 0
+        with observe_stage("tts"):
+            response = await get_elevenlabs_client().request_async(
+                "POST",
+                f"/v1/text-to-speech/{voice_id}",
+                api_key,
+                idempotent=True,
+                characters=len(text),
+                stream=True,
+                params=query,
+                json=payload,
+            )
+            try:
+                if response.is_error:
+                    await response.aread()
+                    print(
+                        f"TTS API error for model {model_id}, voice {voice_id}: {response.text}"
+                    )
+                    response.raise_for_status()
+                with _open_output(output_path) as f:
+                    async for chunk in response.aiter_bytes(TTS_CHUNK_SIZE):
+                        received += len(chunk)
+                        f.write(chunk)
+            finally:
+                await response.aclose()
+        record_bytes("tts", "received", received)
+        TTS_CHARACTERS.inc(len(text), model_id=model_id)
+        if tts_cache and _is_path(output_path):
+            tts_cache.store(cache_key, output_path)
+        return output_path
+
+    # Identical requests already in flight share one upstream synthesis
+    produced_path, shared = await _TTS_FLIGHTS_ASYNC.do(cache_key, synthesize)
+    if shared:
+        SINGLEFLIGHT_SHARED.inc(operation="tts")
+        if not _copy_shared_output(produced_path, output_path):
+            await synthesize()
+    print(f"TTS audio saved to: {output_path}")
+    return output_path
+
+
+async def elevenlabs_text_to_speech_stream_async(
+    api_key,
+    voice_id,
+    text,
+    output_path,
+    model_id="eleven_turbo_v2",
+    output_format="mp3",
+    voice_settings=None,
+    chunk_chars=None,
+):
+    """
+    Starts a request against the ElevenLabs streaming TTS endpoint.
+    Errors are raised before any audio is returned, so callers can still
+    respond with a proper error status.
+    Long texts (see chunk_chars on elevenlabs_text_to_speech) in a
+    concatenable format are synthesized as parallel sentence chunks instead,
+    and each chunk is streamed, without crossfade, as soon as it and all
+    earlier chunks are ready.
+    If the caller stops reading for TTS_STREAM_IDLE_TIMEOUT_SEC, the upstream
+    response is closed so it stops holding an ElevenLabs concurrency slot.
+    Returns:
+        AsyncIterator[bytes]: Audio chunks as they arrive. The chunks are also
+        written to output_path, which appears once the stream has completed.
+    """
+    chunks = _tts_chunks(text, chunk_chars)
+    if chunks and output_format in CONCATENABLE_FORMATS:
+        return await _text_to_speech_chunked_stream_async(
+            api_key,
+            voice_id,
+            chunks,
+            output_path,
+            model_id,
+            output_format,
+            voice_settings,
+        )
+    payload, query, cache_key = _tts_request(
+        voice_id, text, model_id, output_format, voice_settings
+    )
+    tts_cache = get_tts_cache()
+    if tts_cache and tts_cache.fetch(cache_key, output_path):
+        print(f"TTS audio served from cache: {output_path}")
+        return _iter_file_chunks(output_path)
+    start = time.perf_counter()
     try:
+        # Retried only until the response starts, never mid-stream
+        response = await get_elevenlabs_client().request_async(
+            "POST",
+            f"/v1/text-to-speech/{voice_id}/stream",
+            api_key,
+            idempotent=True,
+            characters=len(text),
+            stream=True,
+            params=query,
+            json=payload,
+        )
+    except BaseException:
+        STAGE_ERRORS.inc(stage="tts_stream")
+        raise
+    if response.is_error:
+        STAGE_ERRORS.inc(stage="tts_stream")
+        await response.aread()
+        await response.aclose()
+        print(f"TTS stream API error: {response.text}")
         response.raise_for_status()
-    except requests.HTTPError as e:
-        print(f"STT API error: {response.text}")
+    TTS_CHARACTERS.inc(len(text), model_id=model_id)
+
+    async def relay():
+        received = 0
+        loop = asyncio.get_running_loop()
+        idle_sec = Configs.TTS_STREAM_IDLE_TIMEOUT_SEC
+        idle_timer = None
+        closing = []
+
+        def close_idle():
+            print(f"TTS stream not read for {idle_sec}s, closing upstream")
+            STAGE_ERRORS.inc(stage="tts_stream")
+            closing.append(loop.create_task(response.aclose()))
+
+        try:
+            with observe_stage("tts_stream"):
+                with _open_output(output_path) as f:
+                    async for chunk in response.aiter_bytes():
+                        if not received:
+                            STAGE_DURATION.observe(
+                                time.perf_counter() - start,
+                                stage="tts_stream_first_byte",
+                            )
+                        received += len(chunk)
+                        await asyncio.to_thread(f.write, chunk)
+                        # A stalled consumer must not hold the upstream slot
+                        if idle_sec:
+                            idle_timer = loop.call_later(idle_sec, close_idle)
+                        yield chunk
+                        if idle_timer is not None:
+                            idle_timer.cancel()
+                        if closing:
+                            raise TimeoutError(
+                                f"TTS stream was not read for {idle_sec}s"
+                            )
+            if tts_cache:
+                await asyncio.to_thread(tts_cache.store, cache_key, output_path)
+            print(f"TTS audio saved to: {output_path}")
+        finally:
+            if idle_timer is not None:
+                idle_timer.cancel()
+            record_bytes("tts_stream", "received", received)
+            await response.aclose()
+
+    return relay()
+
+
+async def _text_to_speech_chunked_stream_async(
+    api_key, voice_id, chunks, output_path, model_id, output_format, voice_settings
+):
+    """
+    Streaming variant of _text_to_speech_chunked_async: relays the chunks in
+    order while later ones are still being synthesized.
+    """
+    chunk_dir = tempfile.mkdtemp(prefix="tts_chunks_")
+    paths = _chunk_paths(chunk_dir, chunks, output_format)
+    tasks = _start_chunk_tasks(
+        api_key, voice_id, chunks, paths, model_id, output_format, voice_settings
+    )
+
+    async def cleanup():
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    start = time.perf_counter()
+    try:
+        await tasks[0]
+    except BaseException:
+        STAGE_ERRORS.inc(stage="tts_stream")
+        await cleanup()
         raise
+    STAGE_DURATION.observe(time.perf_counter() - start, stage="tts_stream_first_byte")
+
+    async def relay():
+        try:
+            with observe_stage("tts_stream"):
+                with _open_output(output_path) as f:
+                    for task, path in zip(tasks, paths):
+                        await task
+                        async for chunk in _iter_file_chunks(path):
+                            await asyncio.to_thread(f.write, chunk)
+                            yield chunk
+            print(f"TTS audio stitched from {len(chunks)} chunks: {output_path}")
+        finally:
+            await cleanup()
+
+    return relay()
+
+
+async def _iter_file_chunks(path, chunk_size=64 * 1024):
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+    finally:
+        f.close()
+
+
+async def elevenlabs_text_to_speech_ulaw_frames_async(
+    api_key,
+    voice_id,
+    text,
+    output_path,
+    model_id="eleven_turbo_v2",
+    output_format="mp3",
+    frame_ms=20,
+):
+    """
+    Streams TTS audio as 8 kHz mu-law frames for a call leg, transcoding
+    output_format chunks while they arrive. output_path still receives the
+    audio in output_format.
+    Returns:
+        AsyncIterator[bytes]: mu-law frames of frame_ms each.
+    """
+    chunks = await elevenlabs_text_to_speech_stream_async(
+        api_key, voice_id, text, output_path, model_id, output_format
+    )
+    return transcode_to_ulaw_frames(chunks, output_format, frame_ms)
+
+
+async def elevenlabs_speech_to_text_async(
+    api_key, audio_path, model_id="scribe_v1", filename=None
+):
+    """
+    Non-blocking variant of elevenlabs_speech_to_text.
+    Returns:
+        str: Transcribed text.
+    """
+    data = {"model_id": model_id}
+    with observe_stage("stt"):
+        with _audio_upload(audio_path, filename) as (upload_name, f, size):
+            files = {"file": (upload_name, f, "audio/wav")}
+            response = await get_elevenlabs_client().request_async(
+                "POST",
+                "/v1/speech-to-text",
+                api_key,
+                idempotent=True,
+                data=data,
+                files=files,
+            )
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError:
+            print(f"STT API error: {response.text}")
+            raise
+    record_bytes("stt", "sent", size)
     text = response.json().get("text", "")
     print(f"Transcribed text: {text}")
     return text
 
 
-def get_elevenlabs_voice_id_by_name(api_key, name):
-    url = "https://api.elevenlabs.io/v1/voices"
-    headers = {"xi-api-key": api_key}
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    voices = response.json().get("voices", [])
-    for v in voices:
-        if v.get("name", "").lower() == name.lower():
-            return v.get("voice_id")
-    return None
+async def list_elevenlabs_voices_async(api_key):
+    with observe_stage("voice_list"):
+        response = await get_elevenlabs_client().request_async(
+            "GET", "/v1/voices", api_key
+        )
+        response.raise_for_status()
+    record_bytes("voice_list", "received", len(response.content))
+    return response.json().get("voices", [])
+
+
+async def get_elevenlabs_voice_id_by_name_async(api_key, name):
+    with observe_stage("voice_lookup"):
+        catalog = get_voice_catalog()
+        if catalog.is_stale(api_key):
+
+            async def fetch():
+                return time.monotonic(), await list_elevenlabs_voices_async(api_key)
+
+            # Concurrent lookups on an expired catalog share one listing call
+            (fetched_at, voices), _ = await _VOICE_LIST_FLIGHTS.do(api_key, fetch)
+            catalog.load(api_key, voices, fetched_at)
+        return catalog.find_voice_id(api_key, name)
+
+
+# Containers ElevenLabs accepts as clone samples without re-encoding
+CLONE_READY_CODECS = ("mp3", "pcm")
+
+
+def _is_clone_ready(audio_source, target_duration_sec):
+    """
+    Probes the reference audio's headers to tell whether it can be uploaded
+    as the clone sample as-is: a supported codec, at least target_duration_sec
+    long and within CLONE_SAMPLE_MAX_BYTES.
+    """
+    if isinstance(audio_source, (bytes, bytearray, memoryview)):
+        size = len(audio_source)
+    else:
+        size = os.path.getsize(audio_source)
+    if size > Configs.CLONE_SAMPLE_MAX_BYTES:
+        return False
+    with observe_stage("probe"):
+        info = probe_audio(audio_source)
+    return (
+        info is not None
+        and info["codec"] in CLONE_READY_CODECS
+        and info["duration_sec"] >= target_duration_sec
+    )
+
+
+async def _match_or_extrapolate_async(
+    api_key, audio_source, filename, extrapolated_path, target_duration_sec
+):
+    """
+    Decodes the reference audio once in the audio pool, checks its PCM
+    fingerprint against the voice registry and only preprocesses and
+    extrapolates it when no registered clone matches.
+    Reference audio that is already long enough is neither decoded nor
+    re-encoded; audio_source itself is returned as the clone sample.
+    Args:
+        api_key (str): Account whose registered clones are matched.
+        audio_source: Path to the reference audio, or its bytes.
+        filename (str): Name of the reference audio, used as a format hint.
+        extrapolated_path (str): Where to save the clone sample; None keeps it in memory.
+    Returns:
+        tuple: (pcm_fingerprint, registry_entry or None, clone sample or None)
+        where the clone sample is audio_source, extrapolated_path or the mp3
+        bytes. pcm_fingerprint is None when the audio was not decoded.
+    """
+    if await asyncio.to_thread(_is_clone_ready, audio_source, target_duration_sec):
+        return None, None, audio_source
+    registry = get_voice_registry()
+    preprocess = None
+    if Configs.PREPROCESS_ENABLED:
+        preprocess = {"target_frame_rate": Configs.PREPROCESS_SAMPLE_RATE}
+    with observe_stage("audio_pool"):
+        sample = await get_audio_pool().run(
+            prepare_clone_sample,
+            audio_source,
+            filename,
+            target_duration_sec,
+            Configs.EXTRAPOLATE_CROSSFADE_MS,
+            registry.pcm_fingerprints(api_key),
+            get_pcm_cache(),
+            preprocess,
+        )
+    # The worker process has its own metrics registry, record its timings here
+    for stage, seconds in sample["stage_seconds"].items():
+        STAGE_DURATION.observe(seconds, stage=stage)
+    pcm_fingerprint = sample["pcm_fingerprint"]
+    entry = registry.lookup(api_key, pcm_fingerprint)
+    if entry:
+        return pcm_fingerprint, entry, None
+    clone_sample = sample["clone_sample"]
+    if extrapolated_path is None:
+        return pcm_fingerprint, None, clone_sample
+    await asyncio.to_thread(_write_bytes, extrapolated_path, clone_sample)
+    record_bytes("extrapolate", "written", len(clone_sample))
+    print(f"Extrapolated audio saved to: {extrapolated_path}")
+    return pcm_fingerprint, None, extrapolated_path
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def _timed_stage(timings, stage, awaitable):
+    """
+    Awaits awaitable and records its wall time in seconds under timings[stage].
+    """
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 4)
+
+
+@contextmanager
+def forget_voice_on_404(api_key, voice_id):
+    """
+    Forgets voice_id in the voice registry and catalog when the wrapped
+    ElevenLabs call reports it missing (404), e.g. because it was deleted
+    outside this service, so the next request clones it again.
+    """
+    try:
+        yield
+    except (httpx.HTTPStatusError, requests.HTTPError) as e:
+        if e.response is not None and e.response.status_code == 404:
+            print(f"Voice {voice_id} no longer exists, forgetting it")
+            get_voice_registry().forget_voice(api_key, voice_id)
+            get_voice_catalog().remove(api_key, voice_id)
+        raise
 
 
 def generate_elevenlabs_cloned_voice_from_retellai(
-    params, output_dir, tts_model_id="eleven_turbo_v2"
+    params, output_dir, tts_model_id="eleven_turbo_v2", persist_artifacts=True
 ):
     """
     Given params dict with keys: audio_path, voice_name, description, text
-    - Extrapolates audio to 10s
+    - Extrapolates audio to 10s (unless it is already long enough)
     - Checks/creates voice clone
     - Generates TTS
     Returns dict with paths and voice_id
+    Blocking wrapper around generate_elevenlabs_cloned_voice_from_retellai_async.
+    """
+    return asyncio.run(
+        generate_elevenlabs_cloned_voice_from_retellai_async(
+            params,
+            output_dir,
+            tts_model_id=tts_model_id,
+            persist_artifacts=persist_artifacts,
+        )
+    )
+
+
+async def generate_elevenlabs_cloned_voice_from_retellai_async(
+    params, output_dir, tts_model_id="eleven_turbo_v2", persist_artifacts=True
+):
+    """
+    Async pipeline behind generate_elevenlabs_cloned_voice_from_retellai.
+    Transcription of the original audio runs concurrently with extrapolation,
+    voice lookup and cloning; only TTS waits for both branches.
+    Returns dict with paths and voice_id
+    """
+    result = await prepare_elevenlabs_cloned_voice_async(
+        params,
+        output_dir,
+        tts_model_id=tts_model_id,
+        persist_artifacts=persist_artifacts,
+    )
+
+    # 6. Generate TTS using the (new or existing) voice
+    await _synthesize_prepared_async(result)
+    return result
+
+
+async def _synthesize_prepared_async(result):
+    """
+    Runs the TTS stage for a result of prepare_elevenlabs_cloned_voice_async,
+    writing to its tts_output_path with its tts_model_id.
+    """
+    tts_output_path = result["tts_output_path"]
+    tts_model_id = result["tts_model_id"]
+    print(f"Using TTS model: {tts_model_id}")
+    with forget_voice_on_404(Configs.ELEVENLABS_API_KEY, result["voice_id"]):
+        await _timed_stage(
+            result["timings"],
+            "tts",
+            elevenlabs_text_to_speech_async(
+                Configs.ELEVENLABS_API_KEY,
+                result["voice_id"],
+                result["tts_text"],
+                tts_output_path,
+                model_id=tts_model_id,
+                output_format=result["output_format"],
+            ),
+        )
+    print(f"TTS audio saved to: {tts_output_path}")
+
+
+def _for_tts_model(prepared, tts_model_id):
+    """
+    Copies a prepared result for another TTS model: tts_output_path gets that
+    model's name and timings are copied so each model records its own TTS time.
+    """
+    folder, filename = os.path.split(prepared["tts_output_path"])
+    extension = os.path.splitext(filename)[1]
+    stem = filename[: -len(f"_{prepared['tts_model_id']}{extension}")]
+    return dict(
+        prepared,
+        tts_model_id=tts_model_id,
+        tts_output_path=os.path.join(folder, f"{stem}_{tts_model_id}{extension}"),
+        timings=dict(prepared["timings"]),
+    )
+
+
+async def prepare_elevenlabs_cloned_voice_async(
+    params, output_dir, tts_model_id="eleven_turbo_v2", persist_artifacts=True
+):
+    """
+    Runs every pipeline stage up to (but not including) TTS: extrapolation,
+    voice lookup/cloning and transcription.
+    params may carry the reference audio in memory as "audio_bytes"; audio_path
+    then only names it, relative to output_dir. With persist_artifacts=False
+    the extrapolated clone sample stays in memory and is uploaded from there.
+    params["output_format"] (default "mp3") picks the TTS audio format.
+    Returns the same dict as the full pipeline; tts_output_path is where the
+    TTS audio should be written. timings holds per-stage wall times in seconds.
     """
     api_key = Configs.ELEVENLABS_API_KEY
+    timings = {}
 
     # Extract all params at the start
     retell_id = params.get("retell_id")
     audio_path = params.get("audio_path")
+    audio_bytes = params.get("audio_bytes")
+    audio_source = audio_bytes if audio_bytes is not None else audio_path
+    audio_filename = os.path.basename(audio_path)
     language = params.get("language", "english").lower()
     clone_voice_name = params.get("voice_name")
     clone_voice_description = params.get("description")
     tts_text = params.get("tts_text")
+    output_format = params.get("output_format") or "mp3"
+    # Reject unsupported formats before doing any work
+    tts_extension = get_output_format(output_format)["extension"]
 
     # Extract name after dash
     if "-" in retell_id:
@@ -163,41 +1128,132 @@ def generate_elevenlabs_cloned_voice_from_retellai(
     if not clone_voice_description:
         clone_voice_description = f"Retellai Cloned {extracted_name} voice."
 
-    # 1. Extrapolate audio
     # Get subpath after 'input/' for output folder structure
     input_prefix = "input/"
     if audio_path.startswith(input_prefix):
         subpath = audio_path[len(input_prefix) :]
+    elif audio_bytes is not None:
+        # In-memory audio is named by a path relative to output_dir
+        subpath = audio_path
     else:
         subpath = os.path.basename(audio_path)
     subfolder = os.path.dirname(subpath)
     subfolder_out = os.path.join(output_dir, subfolder)
     os.makedirs(subfolder_out, exist_ok=True)
     base_no_ext = os.path.splitext(os.path.basename(subpath))[0]
-    # Extrapolate audio
     extrapolated_filename = f"extrapolated_{base_no_ext}.mp3"
-    extrapolated_path = os.path.join(subfolder_out, extrapolated_filename)
-    extended_audio_path = extrapolate_audio(
-        audio_path, subfolder_out, target_duration_sec=10
-    )
-    if extended_audio_path != extrapolated_path:
-        os.rename(extended_audio_path, extrapolated_path)
+    extrapolated_path = None
+    if persist_artifacts:
+        extrapolated_path = os.path.join(subfolder_out, extrapolated_filename)
 
-    # 2. Check for existing voice by name
-    voice_id = get_elevenlabs_voice_id_by_name(api_key, clone_voice_name)
-    if voice_id:
-        print(f"Voice '{clone_voice_name}' already exists with ID: {voice_id}")
-    else:
-        # 3. Create new voice clone
-        voice_id = create_elevenlabs_voice_clone(
-            api_key,
-            clone_voice_name,
-            extrapolated_path,
-            clone_voice_description,
+    # 1. Transcribe the original audio in the background
+    stt_task = asyncio.create_task(
+        _timed_stage(
+            timings,
+            "stt",
+            elevenlabs_speech_to_text_async(
+                api_key, audio_source, filename=audio_filename
+            ),
         )
+    )
+    try:
+        # 2. Reuse a clone previously made from the same reference audio
+        registry = get_voice_registry()
+        if audio_bytes is not None:
+            fingerprint_call = asyncio.to_thread(fingerprint_bytes, audio_bytes)
+        else:
+            fingerprint_call = asyncio.to_thread(fingerprint_file, audio_path)
+        file_fingerprint = await _timed_stage(timings, "fingerprint", fingerprint_call)
+        registry_entry = registry.lookup(api_key, file_fingerprint)
+        pcm_fingerprint = None
+        clone_sample = None
+        voice_id = None
+        if registry_entry is None:
+            # 3. Extrapolate audio (unless its decoded PCM is already registered)
+            #    and check for an existing voice by name
+            (pcm_fingerprint, registry_entry, clone_sample), voice_id = (
+                await asyncio.gather(
+                    _timed_stage(
+                        timings,
+                        "extrapolate",
+                        _match_or_extrapolate_async(
+                            api_key, audio_source, audio_filename, extrapolated_path, 10
+                        ),
+                    ),
+                    _timed_stage(
+                        timings,
+                        "voice_lookup",
+                        get_elevenlabs_voice_id_by_name_async(
+                            api_key, clone_voice_name
+                        ),
+                    ),
+                )
+            )
+
+        clone_filename = extrapolated_filename
+        if clone_sample is audio_source:
+            # Already long enough, the upload itself is the clone sample
+            clone_filename = audio_filename
+            extrapolated_path = None
+
+        if registry_entry:
+            voice_id = registry_entry["voice_id"]
+            clone_voice_name = registry_entry.get("voice_name") or clone_voice_name
+            extrapolated_path = None
+            if pcm_fingerprint:
+                # Matched on decoded audio, remember this exact file too
+                registry.register(
+                    api_key, voice_id, clone_voice_name, [file_fingerprint]
+                )
+            print(
+                f"Reference audio matches voice '{clone_voice_name}' with ID: {voice_id}"
+            )
+        elif voice_id:
+            print(f"Voice '{clone_voice_name}' already exists with ID: {voice_id}")
+        else:
+            # 4. Create new voice clone, coalesced with concurrent requests
+            #    cloning under the same name
+            async def clone_once():
+                # A request that finished cloning while this one was looking
+                # up the name has already added the voice to the catalog
+                existing_id = get_voice_catalog().find_voice_id(
+                    api_key, clone_voice_name
+                )
+                if existing_id:
+                    return existing_id
+                new_voice_id = await create_elevenlabs_voice_clone_async(
+                    api_key,
+                    clone_voice_name,
+                    clone_sample,
+                    clone_voice_description,
+                    filename=clone_filename,
+                )
+                registry.register(
+                    api_key,
+                    new_voice_id,
+                    clone_voice_name,
+                    [file_fingerprint, pcm_fingerprint],
+                )
+                return new_voice_id
+
+            voice_id, shared = await _timed_stage(
+                timings,
+                "clone",
+                _CLONE_FLIGHTS.do((api_key, clone_voice_name.lower()), clone_once),
+            )
+            if shared:
+                # Coalesced by voice name only, this request's audio may
+                # differ from the leader's, so its fingerprint is not registered
+                SINGLEFLIGHT_SHARED.inc(operation="clone")
+
+        # 5. Join the transcription branch
+        stt_text = await stt_task
+    except BaseException:
+        stt_task.cancel()
+        # Wait for the cancellation so the upload is not left running
+        await asyncio.gather(stt_task, return_exceptions=True)
+        raise
 
-    # 4. Transcribe audio to text
-    stt_text = elevenlabs_speech_to_text(api_key, audio_path)
     if not tts_text:
         if language == "english":
             tts_suffix = " My voice is generated using the ElevenLabs model, based on the Retell ai voice. Feel free to ask me anything you need help with."
@@ -205,14 +1261,8 @@ def generate_elevenlabs_cloned_voice_from_retellai(
             tts_suffix = " Mi voz se genera utilizando el modelo de ElevenLabs, basado en la voz de Retell AI. No dudes en preguntarme cualquier cosa en la que necesites ayuda."
         tts_text = stt_text.strip() + tts_suffix
 
-    # 5. Generate TTS using the (new or existing) voice
-    tts_output_filename = f"tts_{base_no_ext}_{tts_model_id}.mp3"
+    tts_output_filename = f"tts_{base_no_ext}_{tts_model_id}{tts_extension}"
     tts_output_path = os.path.join(subfolder_out, tts_output_filename)
-    print(f"Using TTS model: {tts_model_id}")
-    elevenlabs_text_to_speech(
-        api_key, voice_id, tts_text, tts_output_path, model_id=tts_model_id
-    )
-    print(f"TTS audio saved to: {tts_output_path}")
     return {
         "extrapolated_audio_path": extrapolated_path,
         "voice_id": voice_id,
@@ -222,9 +1272,74 @@ def generate_elevenlabs_cloned_voice_from_retellai(
         "clone_voice_name": clone_voice_name,
         "clone_voice_description": clone_voice_description,
         "tts_model_id": tts_model_id,
+        "output_format": output_format,
+        "timings": timings,
     }
 
 
+async def run_cloning_batch_async(
+    params_list,
+    output_dir,
+    tts_models=None,
+    max_concurrency=4,
+    persist_artifacts=True,
+):
+    """
+    Runs the clone pipeline for many inputs, up to max_concurrency at a time.
+    Each input is transcribed, extrapolated and cloned once; only TTS runs per
+    model, concurrently. Different inputs run concurrently.
+    Returns:
+        list: One dict per (params, tts_model_id) in input order, with keys
+        params, tts_model_id, status ("done"/"failed"), result and error.
+    """
+    if tts_models is None:
+        tts_models = ["eleven_turbo_v2"]
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_model(params, prepared, tts_model_id):
+        item = {"params": params, "tts_model_id": tts_model_id}
+        try:
+            if isinstance(prepared, Exception):
+                raise prepared
+            item["result"] = _for_tts_model(prepared, tts_model_id)
+            await _synthesize_prepared_async(item["result"])
+            item["status"] = "done"
+            item["error"] = None
+        except Exception as e:
+            print(
+                f"Error processing {params.get('retell_id')} with {tts_model_id}: {e}"
+            )
+            item["result"] = None
+            item["status"] = "failed"
+            item["error"] = str(e)
+        return item
+
+    async def run_item(params):
+        async with semaphore:
+            print(
+                f"\n--- Running {params.get('retell_id')} with TTS models: {', '.join(tts_models)} ---"
+            )
+            try:
+                prepared = await prepare_elevenlabs_cloned_voice_async(
+                    params,
+                    output_dir,
+                    tts_model_id=tts_models[0],
+                    persist_artifacts=persist_artifacts,
+                )
+            except Exception as e:
+                # Reported on every model of this item
+                prepared = e
+            return await asyncio.gather(
+                *(
+                    run_model(params, prepared, tts_model_id)
+                    for tts_model_id in tts_models
+                )
+            )
+
+    batches = await asyncio.gather(*(run_item(params) for params in params_list))
+    return [item for batch in batches for item in batch]
+
+
 # Example usage:
 if __name__ == "__main__":
     # Example input: only retell_id and audio_path
@@ -316,11 +1431,14 @@ if __name__ == "__main__":
     output_dir = "output"
     Utils.clear_dir(output_dir)
 
-    for input_json in input_json_list:
-        params = json.loads(input_json)
-        for tts_model_id in tts_models:
-            print(f"\n--- Running with TTS model: {tts_model_id} ---")
-            result = generate_elevenlabs_cloned_voice_from_retellai(
-                params, output_dir, tts_model_id=tts_model_id
-            )
-            print(result)
+    params_list = [json.loads(input_json) for input_json in input_json_list]
+    results = asyncio.run(
+        run_cloning_batch_async(
+            params_list,
+            output_dir,
+            tts_models=tts_models,
+            max_concurrency=Configs.BATCH_MAX_CONCURRENCY,
+        )
+    )
+    for item in results:
+        print(item)
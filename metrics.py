@@ -0,0 +1,216 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+        escaped.append(f'{name}="{value.replace(chr(34), chr(92) + chr(34))}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    TYPE = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        labels = _format_labels(self.label_names, key)
+        return [f"{self.name}{labels} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def _render_sample(self, key, state):
+        lines = []
+        for bound, count in zip(self.buckets, state["buckets"]):
+            labels = _format_labels(
+                self.label_names, key, ("le", _format_value(float(bound)))
+            )
+            lines.append(f"{self.name}_bucket{labels} {count}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry rendered in Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "voice_stage_duration_seconds",
+    "Wall time of voice pipeline stages.",
+    ["stage"],
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "voice_stage_errors_total",
+    "Voice pipeline stage calls that raised.",
+    ["stage"],
+)
+STAGE_BYTES = REGISTRY.counter(
+    "voice_stage_bytes_total",
+    "Audio/payload bytes sent to or received from each stage.",
+    ["stage", "direction"],
+)
+TTS_CHARACTERS = REGISTRY.counter(
+    "voice_tts_characters_total",
+    "Characters submitted for synthesis, by model.",
+    ["model_id"],
+)
+SINGLEFLIGHT_SHARED = REGISTRY.counter(
+    "voice_singleflight_shared_total",
+    "Calls served by an identical call already in flight instead of upstream.",
+    ["operation"],
+)
+HTTP_RETRIES = REGISTRY.counter(
+    "voice_elevenlabs_retries_total",
+    "ElevenLabs requests retried, by status code or error type.",
+    ["reason"],
+)
+ELEVENLABS_WAIT = REGISTRY.histogram(
+    "voice_elevenlabs_wait_seconds",
+    "Time ElevenLabs calls waited for the rate governor.",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+TTS_MODEL_LATENCY = REGISTRY.histogram(
+    "voice_tts_model_latency_seconds",
+    "Wall time of successful TTS calls in the model loop, by model.",
+    ["model_id"],
+)
+TTS_HEDGES = REGISTRY.counter(
+    "voice_tts_hedges_total",
+    "Hedged TTS requests sent to a fallback model, and which attempt won.",
+    ["outcome"],
+)
+
+
+@contextmanager
+def observe_stage(stage):
+    """
+    Times the enclosed block under stage and counts it as an error if it raises.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
+
+
+def record_bytes(stage, direction, num_bytes):
+    """
+    Adds num_bytes to the sent/received byte counter of stage.
+    """
+    STAGE_BYTES.inc(num_bytes, stage=stage, direction=direction)
+
+
+def render_prometheus():
+    return REGISTRY.render()
@@ -0,0 +1,247 @@
+import collections
+import functools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from configs import Configs
+from metrics import TTS_HEDGES, TTS_MODEL_LATENCY
+
+# Percentiles are computed over this many recent calls per model
+LATENCY_WINDOW = 200
+# Below this many samples a model's p95 is not trusted as a hedge deadline
+MIN_SAMPLES = 5
+# A failed call counts as at least this slow when ranking models
+FAILURE_PENALTY_SEC = 30.0
+
+
+class ModelLatencyTracker:
+    """
+    Running p50/p95 latency of recent calls, per model. Failed calls are
+    recorded as at least failure_penalty_sec so an unreliable model ranks
+    behind a reliable one, but only successful calls set hedge deadlines.
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        window=LATENCY_WINDOW,
+        min_samples=MIN_SAMPLES,
+        failure_penalty_sec=FAILURE_PENALTY_SEC,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_penalty_sec = failure_penalty_sec
+        self._lock = threading.Lock()
+        # {model_id: deque of (seconds, failed)}
+        self._samples = {}
+
+    def _append(self, model_id, seconds, failed):
+        with self._lock:
+            samples = self._samples.get(model_id)
+            if samples is None:
+                samples = collections.deque(maxlen=self.window)
+                self._samples[model_id] = samples
+            samples.append((seconds, failed))
+
+    def record(self, model_id, seconds):
+        self._append(model_id, seconds, False)
+        TTS_MODEL_LATENCY.observe(seconds, model_id=model_id)
+
+    def record_failure(self, model_id, seconds):
+        self._append(model_id, max(seconds, self.failure_penalty_sec), True)
+
+    def _latencies(self, model_id, successful_only=False):
+        with self._lock:
+            return sorted(
+                seconds
+                for seconds, failed in self._samples.get(model_id, ())
+                if not (failed and successful_only)
+            )
+
+    def percentile(self, model_id, q, successful_only=False):
+        """
+        Returns:
+            float: The q-th percentile (0-100, nearest rank) of model_id's
+            recent latencies, failure penalties included unless
+            successful_only, or None without samples.
+        """
+        samples = self._latencies(model_id, successful_only)
+        if not samples:
+            return None
+        rank = max(1, -(-len(samples) * q // 100))
+        return samples[int(rank) - 1]
+
+    def stats(self):
+        """
+        Returns:
+            dict: {model_id: {"count", "failures", "p50", "p95"}} of every
+            tracked model.
+        """
+        with self._lock:
+            counts = {
+                model_id: (len(s), sum(failed for _, failed in s))
+                for model_id, s in self._samples.items()
+            }
+        return {
+            model_id: {
+                "count": count,
+                "failures": failures,
+                "p50": self.percentile(model_id, 50),
+                "p95": self.percentile(model_id, 95),
+            }
+            for model_id, (count, failures) in counts.items()
+        }
+
+    def rank(self, model_ids):
+        """
+        Returns:
+            list: model_ids fastest first by p50. Models without samples keep
+            their given order after the measured ones.
+        """
+        p50s = {model_id: self.percentile(model_id, 50) for model_id in model_ids}
+        measured = sorted(
+            (m for m in model_ids if p50s[m] is not None), key=lambda m: p50s[m]
+        )
+        return measured + [m for m in model_ids if p50s[m] is None]
+
+    def hedge_delay(self, model_id, default):
+        """
+        Returns:
+            float: How long to wait for model_id before hedging: the p95 of
+            its successful calls once there are min_samples of them, else
+            default.
+        """
+        samples = self._latencies(model_id, successful_only=True)
+        if len(samples) < self.min_samples:
+            return default
+        return self.percentile(model_id, 95, successful_only=True)
+
+
+def hedged_call(
+    fn, model_ids, tracker, hedge_after_sec=None, discard=None, wait_for_losers=False
+):
+    """
+    Runs fn(model_id) with the fastest of model_ids first. If it has not
+    finished by its hedge deadline (see ModelLatencyTracker.hedge_delay), the
+    next model is started alongside it and whichever succeeds first wins; the
+    loser keeps running in the background, feeds the statistics and has its
+    result passed to discard. A failed attempt starts the next model right
+    away; if attempts are still in flight, hedging continues with the next
+    model once their deadline passes.
+    Args:
+        fn (callable): Does the work for one model and returns its result.
+        model_ids (list): Candidate models.
+        tracker (ModelLatencyTracker): Statistics to rank by and record into.
+        hedge_after_sec (float): Hedge deadline for models without enough
+            samples (default: TTS_HEDGE_AFTER_SEC).
+        discard (callable): Called as discard(model_id, result) for every
+            successful attempt that lost, possibly after this returns.
+        wait_for_losers (bool): Return only once losing attempts have
+            finished (those not started yet are cancelled), e.g. before
+            deleting something they still use.
+    Returns:
+        tuple: (model_id, result) of the first successful attempt.
+    Raises:
+        Exception: The last error if every model failed.
+    """
+    if hedge_after_sec is None:
+        hedge_after_sec = Configs.TTS_HEDGE_AFTER_SEC
+    queue = tracker.rank(model_ids)
+    if not queue:
+        raise ValueError("hedged_call needs at least one model")
+
+    def attempt(model_id):
+        start = time.perf_counter()
+        try:
+            result = fn(model_id)
+        except Exception:
+            tracker.record_failure(model_id, time.perf_counter() - start)
+            raise
+        tracker.record(model_id, time.perf_counter() - start)
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=len(queue))
+    running = {}
+    primary = None
+    deadline = None
+    hedged = False
+    last_error = None
+
+    def start_next():
+        model_id = queue.pop(0)
+        running[executor.submit(attempt, model_id)] = model_id
+        return model_id
+
+    try:
+        while True:
+            if not running:
+                if not queue:
+                    raise last_error
+                # Nothing left in flight, the next model becomes the primary
+                primary = start_next()
+                deadline = time.monotonic() + tracker.hedge_delay(
+                    primary, hedge_after_sec
+                )
+                hedged = False
+            timeout = None
+            if not hedged and queue:
+                timeout = max(0.0, deadline - time.monotonic())
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"Model {primary} is slow, hedging with {queue[0]}")
+                TTS_HEDGES.inc(outcome="sent")
+                start_next()
+                hedged = True
+                continue
+            for future in done:
+                model_id = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Model {model_id} failed: {e}")
+                    last_error = e
+                    if running and model_id == primary:
+                        # The hedge takes over as primary, with its own deadline
+                        primary = next(iter(running.values()))
+                        deadline = time.monotonic() + tracker.hedge_delay(
+                            primary, hedge_after_sec
+                        )
+                    if running and queue:
+                        # Keep hedging the attempts still in flight
+                        hedged = False
+                    continue
+                if hedged:
+                    outcome = "primary_won" if model_id == primary else "hedge_won"
+                    TTS_HEDGES.inc(outcome=outcome)
+                if discard is not None:
+                    # Everything still in running lost, including attempts
+                    # that finished at the same time as the winner
+                    for loser, loser_model in running.items():
+                        loser.add_done_callback(
+                            functools.partial(_discard_result, discard, loser_model)
+                        )
+                return model_id, result
+    finally:
+        # Unless asked to, do not wait for losers, they finish in the background
+        executor.shutdown(wait=wait_for_losers, cancel_futures=wait_for_losers)
+
+
+def _discard_result(discard, model_id, future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    discard(model_id, future.result())
+
+
+_default_tracker = None
+_default_tracker_lock = threading.Lock()
+
+
+def get_model_latency_tracker():
+    """
+    Returns the process-wide model latency tracker.
+    """
+    global _default_tracker
+    with _default_tracker_lock:
+        if _default_tracker is None:
+            _default_tracker = ModelLatencyTracker()
+        return _default_tracker
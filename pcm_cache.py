@@ -0,0 +1,148 @@
+import hashlib
+import os
+import struct
+import threading
+import uuid
+import numpy as np
+from pydub import AudioSegment
+from audio_pcm import decode_audio, segment_to_array
+
+# magic, frame_rate, channels, sample_width; padded to 16 bytes so the samples
+# that follow stay aligned
+_HEADER = struct.Struct("<4sIHH4x")
+_MAGIC = b"PCM1"
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+class PCMCache:
+    """
+    Disk cache of decoded audio, keyed by the sha256 of the source file.
+    Entries are raw PCM files with a small header, so repeated runs over the
+    same inputs skip mp3 decoding: a hit is one sequential read.
+    Holds no in-memory index: entries are written atomically and eviction
+    (least recently read first) scans the directory, so worker processes can
+    share one cache directory.
+    """
+
+    FILE_SUFFIX = ".pcm"
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(audio_source, chunk_size=1024 * 1024):
+        """
+        Returns:
+            str: sha256 hex digest of the file at audio_source, or of its bytes.
+        """
+        if isinstance(audio_source, (bytes, bytearray, memoryview)):
+            return hashlib.sha256(audio_source).hexdigest()
+        digest = hashlib.sha256()
+        with open(audio_source, "rb") as f:
+            while chunk := f.read(chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _read_header(self, f):
+        """
+        Returns:
+            tuple: (frame_rate, channels, sample_width) from the entry header
+            at the start of f, or None if it is truncated or invalid.
+        """
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return None
+        magic, frame_rate, channels, sample_width = _HEADER.unpack(header)
+        if magic != _MAGIC or sample_width not in _SAMPLE_DTYPES:
+            return None
+        return frame_rate, channels, sample_width
+
+    def store(self, key, samples, frame_rate):
+        """
+        Writes samples of shape (frames, channels) under key.
+        """
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC, frame_rate, samples.shape[1], samples.dtype.itemsize
+                )
+            )
+            f.write(np.ascontiguousarray(samples).tobytes())
+        os.replace(tmp_path, entry_path)
+        self._evict()
+
+    def decode(self, audio_source, filename=None):
+        """
+        Decodes audio_source (path or bytes), reusing cached PCM when available.
+        Returns:
+            AudioSegment: The decoded audio.
+        """
+        key = self.make_key(audio_source)
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as f:
+                header = self._read_header(f)
+                data = f.read() if header else None
+            os.utime(entry_path)
+        except FileNotFoundError:
+            header = None
+        if header is not None:
+            frame_rate, channels, sample_width = header
+            return AudioSegment(
+                data=data,
+                sample_width=sample_width,
+                frame_rate=frame_rate,
+                channels=channels,
+            )
+        audio = decode_audio(audio_source, filename)
+        samples, audio = segment_to_array(audio)
+        if len(samples):
+            self.store(key, samples, audio.frame_rate)
+        return audio
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + self.FILE_SUFFIX)
+
+    def _evict(self):
+        entries = []
+        total_bytes = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.FILE_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+                total_bytes += stat.st_size
+        for _, path, size in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_pcm_cache():
+    """
+    Returns the process-wide decoded-audio cache, or None if PCM_CACHE_ENABLED is off.
+    """
+    # Imported here so audio worker processes can unpickle a PCMCache
+    # without loading (and printing) the service configuration
+    from configs import Configs
+
+    global _default_cache
+    if not Configs.PCM_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PCMCache(
+                Configs.PCM_CACHE_DIR, Configs.PCM_CACHE_MAX_BYTES
+            )
+        return _default_cache
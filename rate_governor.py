@@ -0,0 +1,226 @@
+import asyncio
+import collections
+import threading
+import time
+from configs import Configs
+from metrics import ELEVENLABS_WAIT
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at rate tokens per second up to capacity.
+    Callers reserve tokens up front and then sleep for the returned delay, so
+    threads and asyncio tasks draw from the same bucket.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        """
+        Takes amount tokens (at most capacity), going into debt if the bucket
+        holds fewer.
+        Returns:
+            float: Seconds to wait before the reserved tokens are available.
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class ConcurrencyLimit:
+    """
+    First-come first-served limit on concurrent holders, shared by threads
+    (acquire) and asyncio tasks (acquire_async). A released slot is handed
+    directly to the oldest waiter.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = collections.deque()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": self._active, "waiting": len(self._waiters)}
+
+    def acquire(self):
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            granted = threading.Event()
+            self._waiters.append(granted.set)
+        granted.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            granted = loop.create_future()
+
+            def wake():
+                try:
+                    loop.call_soon_threadsafe(_set_done, granted)
+                except RuntimeError:
+                    # The waiter's event loop is gone, pass the slot on
+                    self.release()
+
+            self._waiters.append(wake)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+                    raise
+            # The slot was handed over as we were cancelled, give it back
+            self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self._active -= 1
+                return
+            # The slot moves to the waiter, _active stays the same
+            wake = self._waiters.popleft()
+        wake()
+
+
+def _set_done(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class RateGovernor:
+    """
+    Paces calls to one API key: at most max_concurrency in flight, at most
+    requests_per_sec started per second and chars_per_min characters
+    submitted per minute (each limit is off when None or 0). Bursts wait
+    here instead of being rejected upstream with 429s.
+    Usage: governor.acquire(characters) ... governor.release(), or
+    await governor.acquire_async(characters) from asyncio code.
+    """
+
+    def __init__(self, requests_per_sec=None, max_concurrency=None, chars_per_min=None):
+        self._requests = TokenBucket(requests_per_sec) if requests_per_sec else None
+        self._chars = (
+            TokenBucket(chars_per_min / 60, capacity=chars_per_min)
+            if chars_per_min
+            else None
+        )
+        self._slots = ConcurrencyLimit(max_concurrency) if max_concurrency else None
+        self._lock = threading.Lock()
+        self._pacing = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: {"waiting": calls queued for a slot or rate tokens,
+            "in_flight": calls holding a slot}
+        """
+        slots = self._slots.stats() if self._slots else {"in_flight": 0, "waiting": 0}
+        with self._lock:
+            slots["waiting"] += self._pacing
+        return slots
+
+    def acquire(self, characters=0):
+        start = time.monotonic()
+        if self._slots:
+            self._slots.acquire()
+        try:
+            delay = self._reserve(characters)
+            if delay:
+                self._track_pacing(1)
+                try:
+                    time.sleep(delay)
+                finally:
+                    self._track_pacing(-1)
+        except BaseException:
+            self.release()
+            raise
+        ELEVENLABS_WAIT.observe(time.monotonic() - start)
+
+    async def acquire_async(self, characters=0):
+        start = time.monotonic()
+        if self._slots:
+            await self._slots.acquire_async()
+        try:
+            delay = self._reserve(characters)
+            if delay:
+                self._track_pacing(1)
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    self._track_pacing(-1)
+        except BaseException:
+            self.release()
+            raise
+        ELEVENLABS_WAIT.observe(time.monotonic() - start)
+
+    def release(self):
+        if self._slots:
+            self._slots.release()
+
+    def _reserve(self, characters):
+        delay = 0.0
+        if self._requests:
+            delay = self._requests.reserve(1)
+        if self._chars and characters:
+            delay = max(delay, self._chars.reserve(characters))
+        return delay
+
+    def _track_pacing(self, delta):
+        with self._lock:
+            self._pacing += delta
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_rate_governor(api_key):
+    """
+    Returns the process-wide governor of api_key, limited by
+    ELEVENLABS_MAX_RPS, ELEVENLABS_MAX_CONCURRENCY and
+    ELEVENLABS_MAX_CHARS_PER_MIN.
+    """
+    with _governors_lock:
+        governor = _governors.get(api_key)
+        if governor is None:
+            governor = RateGovernor(
+                requests_per_sec=Configs.ELEVENLABS_MAX_RPS,
+                max_concurrency=Configs.ELEVENLABS_MAX_CONCURRENCY,
+                chars_per_min=Configs.ELEVENLABS_MAX_CHARS_PER_MIN,
+            )
+            _governors[api_key] = governor
+        return governor
+
+
+def governor_stats():
+    """
+    Returns:
+        dict: waiting/in_flight summed over the governors of all API keys.
+    """
+    with _governors_lock:
+        governors = list(_governors.values())
+    totals = {"waiting": 0, "in_flight": 0}
+    for governor in governors:
+        for name, value in governor.stats().items():
+            totals[name] += value
+    return totals
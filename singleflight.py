@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key across threads: the first
+    caller runs fn, later callers block until it finishes and share its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Returns:
+            tuple: (result, shared) where shared is True if another caller ran fn.
+        Raises:
+            Whatever fn raised, in the leader and every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+
+        try:
+            call["result"] = fn()
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+        return call["result"], False
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight. The shared work runs in its own task,
+    so cancelling one waiting caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, coro_fn):
+        """
+        Args:
+            coro_fn: Zero-argument callable returning the coroutine to run.
+        Returns:
+            tuple: (result, shared) where shared is True if another caller ran it.
+        """
+        loop = asyncio.get_running_loop()
+        # Event loops cannot share tasks, keep flights per loop
+        flight_key = (id(loop), key)
+        task = self._tasks.get(flight_key)
+        shared = task is not None
+        if task is None:
+            task = loop.create_task(coro_fn())
+            self._tasks[flight_key] = task
+            task.add_done_callback(lambda t: self._finish(flight_key, t))
+        return await asyncio.shield(task), shared
+
+    def _finish(self, flight_key, task):
+        if self._tasks.get(flight_key) is task:
+            del self._tasks[flight_key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
@@ -2,7 +2,84 @@ import unittest
 from utils import Utils
 from configs import Configs
 import coverage
+import os
 import sys
+import time
+
+
+class FakeElevenLabsTestCase(unittest.TestCase):
+    """
+    Points the pipeline at benchmarks.fake_elevenlabs with a temporary
+    workspace, registry and caches, and fresh process-wide singletons.
+    """
+
+    CONFIG_OVERRIDES = {
+        "ELEVENLABS_API_KEY": "test",
+        "TTS_CACHE_ENABLED": False,
+        "PCM_CACHE_ENABLED": False,
+        "AUDIO_POOL_WORKERS": 0,
+        "ELEVENLABS_MAX_RETRIES": 0,
+    }
+
+    def setUp(self):
+        import tempfile
+        from benchmarks.fake_elevenlabs import FakeElevenLabsServer
+
+        self.server = FakeElevenLabsServer(latency_sec=0.01).start()
+        self.addCleanup(self.server.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_dir = tmp.name
+        overrides = {
+            **self.CONFIG_OVERRIDES,
+            "ELEVENLABS_API_BASE_URL": self.server.base_url,
+            "WORKSPACE_DIR": os.path.join(self.tmp_dir, "workspace"),
+            "VOICE_REGISTRY_PATH": os.path.join(self.tmp_dir, "voice_registry.json"),
+        }
+        for name, value in overrides.items():
+            self.addCleanup(setattr, Configs, name, getattr(Configs, name))
+            setattr(Configs, name, value)
+        self._reset_singletons()
+        self.addCleanup(self._reset_singletons)
+        self.sample_audio = self._tone_wav(seconds=3)
+
+    @staticmethod
+    def _tone_wav(seconds, frame_rate=16000):
+        # A WAV decodes without ffprobe, unlike the bundled mp3 samples
+        import array
+        import io
+        import math
+        import wave
+
+        samples = array.array(
+            "h",
+            (
+                int(8000 * math.sin(2 * math.pi * 220 * i / frame_rate))
+                for i in range(seconds * frame_rate)
+            ),
+        )
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(frame_rate)
+            wav.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+    @staticmethod
+    def _reset_singletons():
+        import audio_pool
+        import elevenlabs_client
+        import rate_governor
+        import voice_catalog
+        import voice_registry
+
+        elevenlabs_client._default_client = None
+        audio_pool._default_pool = None
+        voice_catalog._default_catalog = None
+        voice_registry._default_registry = None
+        with rate_governor._governors_lock:
+            rate_governor._governors.clear()
 
 
 class TestUtils(unittest.TestCase):
@@ -28,6 +105,37 @@ class TestUtils(unittest.TestCase):
         output = buf.getvalue()
         self.assertIn(Configs.RETELL_API_KEY, output)
 
+    def test_create_workspace_is_isolated(self):
+        """Each workspace should be a distinct new directory (pass criteria: separate dirs)"""
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as base_dir:
+            first = Utils.create_workspace(base_dir)
+            second = Utils.create_workspace(base_dir)
+            self.assertNotEqual(first, second)
+            self.assertTrue(os.path.isdir(first) and os.path.isdir(second))
+            Utils.remove_dir(first)
+            self.assertFalse(os.path.exists(first))
+            self.assertTrue(os.path.isdir(second))
+
+    def test_reap_stale_dirs(self):
+        """Only directories older than max age should be reaped (pass criteria: fresh dir kept)"""
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as base_dir:
+            stale = Utils.create_workspace(base_dir)
+            fresh = Utils.create_workspace(base_dir)
+            in_use = Utils.create_workspace(base_dir)
+            old_time = time.time() - 120
+            for path in (stale, in_use):
+                os.utime(path, (old_time, old_time))
+            self.assertEqual(
+                Utils.reap_stale_dirs(base_dir, max_age_sec=60, keep=[in_use]), 1
+            )
+            self.assertFalse(os.path.exists(stale))
+            self.assertTrue(os.path.isdir(fresh))
+            self.assertTrue(os.path.isdir(in_use))
+
 
 class TestConfigs(unittest.TestCase):
     def test_retell_api_key_exists(self):
@@ -47,6 +155,1122 @@ class TestConfigs(unittest.TestCase):
         self.assertTrue(callable(getattr(Configs, "load_configs", None)))
 
 
+class TestVoiceCloneJobQueue(FakeElevenLabsTestCase):
+    def job_params(self, workspace_dir, **params):
+        audio_path = os.path.join(workspace_dir, "sample.wav")
+        with open(audio_path, "wb") as f:
+            f.write(self.sample_audio)
+        return {
+            "retell_id": "test-job",
+            "audio_path": audio_path,
+            "tts_text": "Hello.",
+            **params,
+        }
+
+    async def wait_finished(self, job, timeout=10):
+        import asyncio
+
+        async def poll():
+            while job.finished_at is None:
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(poll(), timeout)
+
+    def test_submit_rejects_when_full(self):
+        """Submitting past max_queue_size should raise (pass criteria: QueueFullError)"""
+        import asyncio
+        from voice_clone_jobs import QueueFullError, VoiceCloneJobQueue
+
+        async def scenario():
+            queue = VoiceCloneJobQueue(max_workers=0, max_queue_size=1)
+            await queue.start()
+            job = queue.submit({}, "unused")
+            self.assertEqual(queue.get(job.job_id).status, "queued")
+            with self.assertRaises(QueueFullError):
+                queue.submit({}, "unused")
+            await queue.stop()
+
+        asyncio.run(scenario())
+
+    def test_worker_runs_and_fails_jobs(self):
+        """Workers move jobs from queued to done or failed (pass criteria: statuses, to_dict)"""
+        import asyncio
+        from voice_clone_jobs import VoiceCloneJobQueue
+
+        async def scenario():
+            queue = VoiceCloneJobQueue(max_workers=1, max_queue_size=4)
+            await queue.start()
+            try:
+                workspace_dir = Utils.create_workspace(self.tmp_dir)
+                job = queue.submit(self.job_params(workspace_dir), workspace_dir)
+                bad_dir = Utils.create_workspace(self.tmp_dir)
+                bad = queue.submit(
+                    self.job_params(bad_dir, output_format="wav"), bad_dir
+                )
+                # One worker, so the second job waits for the first
+                self.assertEqual(bad.status, "queued")
+                await self.wait_finished(job)
+                await self.wait_finished(bad)
+                # Finished jobs keep their workspace until they expire
+                self.assertEqual(queue.workspace_dirs(), [workspace_dir, bad_dir])
+            finally:
+                await queue.stop()
+            return job, bad
+
+        job, bad = asyncio.run(scenario())
+        info = job.to_dict()
+        self.assertEqual(info["status"], "done")
+        self.assertEqual(info["voice_id"], "fake-voice-1")
+        self.assertGreaterEqual(info["total_sec"], info["queue_wait_sec"])
+        self.assertTrue(os.path.isfile(job.result["tts_output_path"]))
+        self.assertEqual(bad.status, "failed")
+        self.assertIn("Unsupported output_format", bad.error)
+        self.assertGreaterEqual(bad.started_at, job.finished_at)
+
+    def test_finished_jobs_expire(self):
+        """Finished jobs past job_ttl_sec are forgotten with their workspace (pass criteria: get, workspace)"""
+        import asyncio
+        from voice_clone_jobs import VoiceCloneJobQueue
+
+        async def scenario():
+            queue = VoiceCloneJobQueue(max_workers=1, job_ttl_sec=0.05)
+            await queue.start()
+            try:
+                workspace_dir = Utils.create_workspace(self.tmp_dir)
+                params = self.job_params(workspace_dir, output_format="wav")
+                job = queue.submit(params, workspace_dir)
+                await self.wait_finished(job)
+                self.assertIs(queue.get(job.job_id), job)
+                await asyncio.sleep(0.1)
+                self.assertIsNone(queue.get(job.job_id))
+                self.assertFalse(os.path.exists(workspace_dir))
+                self.assertEqual(queue.workspace_dirs(), [])
+            finally:
+                await queue.stop()
+
+        asyncio.run(scenario())
+
+    def test_job_endpoints(self):
+        """Job status goes from pending to done and audio is served only then (pass criteria: status codes, body)"""
+        from fastapi.testclient import TestClient
+        from benchmarks.fake_elevenlabs import FAKE_TTS_AUDIO
+        from elevenlabs_api import app
+
+        self.server.latency_sec = 0.2
+        with TestClient(app) as client:
+            response = client.post(
+                "/jobs/generate-cloned-voice",
+                data={"retell_id": "test-job", "tts_text": "Hello."},
+                files={"audio": ("sample.wav", self.sample_audio, "audio/wav")},
+            )
+            self.assertEqual(response.status_code, 202)
+            job = response.json()
+            status = client.get(job["status_url"]).json()["status"]
+            self.assertIn(status, ("queued", "running"))
+            self.assertEqual(client.get(job["audio_url"]).status_code, 409)
+            deadline = time.monotonic() + 10
+            while status in ("queued", "running") and time.monotonic() < deadline:
+                time.sleep(0.05)
+                info = client.get(job["status_url"]).json()
+                status = info["status"]
+            self.assertEqual(status, "done", info)
+            self.assertEqual(info["voice_id"], "fake-voice-1")
+            audio = client.get(job["audio_url"])
+            self.assertEqual(audio.status_code, 200)
+            self.assertEqual(audio.content, FAKE_TTS_AUDIO)
+            self.assertEqual(client.get("/jobs/missing").status_code, 404)
+            self.assertEqual(client.get("/jobs/missing/audio").status_code, 404)
+
+
+class TestTTSCache(unittest.TestCase):
+    def _write(self, path, size):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+
+    def test_key_depends_on_all_inputs(self):
+        """Cache key should change with any synthesis input (pass criteria: distinct keys)"""
+        from tts_cache import TTSCache
+
+        base = TTSCache.make_key("v1", "m1", "hello", {"stability": 0.5})
+        self.assertEqual(
+            base, TTSCache.make_key("v1", "m1", "hello", {"stability": 0.5})
+        )
+        self.assertNotEqual(
+            base, TTSCache.make_key("v2", "m1", "hello", {"stability": 0.5})
+        )
+        self.assertNotEqual(
+            base, TTSCache.make_key("v1", "m2", "hello", {"stability": 0.5})
+        )
+        self.assertNotEqual(
+            base, TTSCache.make_key("v1", "m1", "hi", {"stability": 0.5})
+        )
+        self.assertNotEqual(
+            base, TTSCache.make_key("v1", "m1", "hello", {"stability": 0.6})
+        )
+        self.assertNotEqual(
+            TTSCache.make_key("v1", "m1", "hello", None, "mp3_44100_128"),
+            TTSCache.make_key("v1", "m1", "hello", None, "ulaw_8000"),
+        )
+
+    def test_hits_misses_and_lru_eviction(self):
+        """Least recently used entries should be evicted first (pass criteria: counters and eviction)"""
+        import tempfile
+        from tts_cache import TTSCache
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TTSCache(os.path.join(tmp, "cache"), max_bytes=25)
+            src = os.path.join(tmp, "src.mp3")
+            out = os.path.join(tmp, "out.mp3")
+            self._write(src, 10)
+            self.assertFalse(cache.fetch("a", out))
+            cache.store("a", src)
+            cache.store("b", src)
+            self.assertTrue(cache.fetch("a", out))
+            self.assertEqual(os.path.getsize(out), 10)
+            cache.store("c", src)  # over budget, "b" is least recently used
+            self.assertFalse(cache.fetch("b", out))
+            self.assertTrue(cache.fetch("a", out))
+            self.assertTrue(cache.contains("c"))
+            self.assertFalse(cache.contains("b"))
+            stats = cache.stats()
+            self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+            self.assertEqual(stats["entries"], 2)
+
+    def test_fetch_into_file_object(self):
+        """A hit can be streamed into a writable sink (pass criteria: bytes, no temp files)"""
+        import io
+        import tempfile
+        from tts_cache import TTSCache
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TTSCache(os.path.join(tmp, "cache"), max_bytes=1000)
+            src = os.path.join(tmp, "src.mp3")
+            self._write(src, 10)
+            cache.store("a", src)
+            sink = io.BytesIO()
+            self.assertTrue(cache.fetch("a", sink))
+            self.assertEqual(sink.getvalue(), b"x" * 10)
+            self.assertTrue(cache.fetch("a", os.path.join(tmp, "out.mp3")))
+            self.assertEqual(sorted(os.listdir(tmp)), ["cache", "out.mp3", "src.mp3"])
+
+
+class TestVoiceRegistry(unittest.TestCase):
+    def test_register_lookup_forget_persists(self):
+        """Registered fingerprints should survive reloads until forgotten (pass criteria: lookups)"""
+        import tempfile
+        from voice_registry import VoiceRegistry
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "registry.json")
+            VoiceRegistry(path).register(
+                "key", "v1", "Andrew", ["sha256:aa", "pcm:bb", None]
+            )
+            registry = VoiceRegistry(path)
+            self.assertEqual(
+                registry.lookup("key", "sha256:zz", "pcm:bb")["voice_id"], "v1"
+            )
+            self.assertEqual(
+                registry.lookup("key", "sha256:aa")["voice_name"], "Andrew"
+            )
+            self.assertEqual(registry.pcm_fingerprints("key"), {"pcm:bb"})
+            # Voices of one API key are invisible to another
+            self.assertIsNone(registry.lookup("other", "sha256:aa"))
+            self.assertEqual(registry.pcm_fingerprints("other"), frozenset())
+            registry.forget_voice("other", "v1")
+            self.assertIsNotNone(VoiceRegistry(path).lookup("key", "sha256:aa"))
+            registry.forget_voice("key", "v1")
+            self.assertIsNone(VoiceRegistry(path).lookup("key", "sha256:aa", "pcm:bb"))
+            with open(path, encoding="utf-8") as f:
+                self.assertNotIn('"key"', f.read())
+
+    def test_in_memory_fingerprint_matches_file(self):
+        """Uploads fingerprinted in memory should match the same file on disk (pass criteria: equal fingerprints)"""
+        import tempfile
+        from voice_registry import fingerprint_bytes, fingerprint_file
+
+        data = os.urandom(3000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sample.mp3")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(fingerprint_bytes(data), fingerprint_file(path, 1024))
+
+
+class TestForgetVoiceOn404(FakeElevenLabsTestCase):
+    def test_missing_voice_is_forgotten(self):
+        """A 404 for a voice drops it from the registry and catalog, other errors do not (pass criteria: lookups)"""
+        import httpx
+        from elevenlabs_retell_voice_cloning import forget_voice_on_404
+        from voice_catalog import get_voice_catalog
+        from voice_registry import get_voice_registry
+
+        registry = get_voice_registry()
+        registry.register("test", "v1", "Andrew", ["sha256:aa"])
+        catalog = get_voice_catalog()
+        catalog.load("test", [{"voice_id": "v1", "name": "Andrew"}])
+        request = httpx.Request("POST", "http://fake/v1/text-to-speech/v1")
+
+        def fail(status_code):
+            with forget_voice_on_404("test", "v1"):
+                response = httpx.Response(status_code, request=request)
+                response.raise_for_status()
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            fail(500)
+        self.assertIsNotNone(registry.lookup("test", "sha256:aa"))
+        with self.assertRaises(httpx.HTTPStatusError):
+            fail(404)
+        self.assertIsNone(registry.lookup("test", "sha256:aa"))
+        self.assertIsNone(catalog.find_voice_id("test", "Andrew"))
+
+
+class TestVoiceCatalog(unittest.TestCase):
+    def test_indexes_and_in_place_updates(self):
+        """Catalog should index by name and id and track adds/removes (pass criteria: lookups)"""
+        from voice_catalog import VoiceCatalog
+
+        catalog = VoiceCatalog(ttl_sec=60)
+        self.assertTrue(catalog.is_stale("key"))
+        catalog.load("key", [{"voice_id": "v1", "name": "Andrew"}])
+        self.assertFalse(catalog.is_stale("key"))
+        self.assertEqual(catalog.find_voice_id("key", "ANDREW"), "v1")
+        self.assertIsNone(catalog.find_voice_id("other-key", "Andrew"))
+        catalog.add("key", "v2", "Chloe")
+        self.assertEqual(catalog.find_voice_id("key", "chloe"), "v2")
+        self.assertEqual(catalog.get_voice("key", "v2")["name"], "Chloe")
+        catalog.remove("key", "v1")
+        self.assertIsNone(catalog.find_voice_id("key", "andrew"))
+
+    def test_changes_during_a_listing_survive_the_load(self):
+        """Adds and removes made after a listing was requested are kept (pass criteria: lookups)"""
+        from voice_catalog import VoiceCatalog
+
+        catalog = VoiceCatalog(ttl_sec=60)
+        catalog.load("key", [{"voice_id": "v1", "name": "Andrew"}])
+        catalog.add("key", "v0", "Old")
+        fetched_at = time.monotonic()
+        # Created and deleted while the listing request was in flight
+        catalog.add("key", "v2", "Chloe")
+        catalog.remove("key", "v1")
+        catalog.load(
+            "key",
+            [{"voice_id": "v0", "name": "Old"}, {"voice_id": "v1", "name": "Andrew"}],
+            fetched_at,
+        )
+        self.assertEqual(catalog.find_voice_id("key", "chloe"), "v2")
+        self.assertIsNone(catalog.find_voice_id("key", "andrew"))
+        self.assertEqual(catalog.find_voice_id("key", "old"), "v0")
+        # A listing requested before the current one does not replace it
+        catalog.load("key", [], fetched_at - 1)
+        self.assertEqual(catalog.find_voice_id("key", "chloe"), "v2")
+
+        # Voices added before the first load are found and kept by it
+        catalog.add("new-key", "v3", "Marissa")
+        self.assertTrue(catalog.is_stale("new-key"))
+        self.assertEqual(catalog.find_voice_id("new-key", "marissa"), "v3")
+        catalog.load("new-key", [])
+        self.assertEqual(catalog.find_voice_id("new-key", "marissa"), "v3")
+
+
+class TestMetrics(unittest.TestCase):
+    def test_prometheus_rendering(self):
+        """Histograms and counters should render in Prometheus text format (pass criteria: sample lines)"""
+        from metrics import MetricsRegistry
+
+        registry = MetricsRegistry()
+        latency = registry.histogram("stage_seconds", "Latency.", ["stage"], [0.1, 1])
+        errors = registry.counter("stage_errors_total", "Errors.", ["stage"])
+        latency.observe(0.05, stage="tts")
+        latency.observe(0.5, stage="tts")
+        errors.inc(stage='cl"one')
+        output = registry.render()
+        self.assertIn("# TYPE stage_seconds histogram", output)
+        self.assertIn('stage_seconds_bucket{stage="tts",le="0.1"} 1', output)
+        self.assertIn('stage_seconds_bucket{stage="tts",le="+Inf"} 2', output)
+        self.assertIn('stage_seconds_count{stage="tts"} 2', output)
+        self.assertIn('stage_errors_total{stage="cl\\"one"} 1', output)
+        with self.assertRaises(ValueError):
+            errors.inc(model="x")
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_threads_share_one_call(self):
+        """Concurrent threads with one key should run fn once (pass criteria: one call)"""
+        import threading
+        from singleflight import SingleFlight
+
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "audio"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+        leader.start()
+        started.wait()
+        followers = [
+            threading.Thread(target=lambda: results.append(flight.do("k", work)))
+            for _ in range(3)
+        ]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            sorted(shared for _, shared in results), [False, True, True, True]
+        )
+
+    def test_async_shares_result_and_errors(self):
+        """Concurrent tasks with one key should share result or error (pass criteria: one call)"""
+        import asyncio
+        from singleflight import AsyncSingleFlight
+
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "voice-id"
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream failed")
+
+        async def scenario():
+            results = await asyncio.gather(
+                *(flight.do("clone", work) for _ in range(4))
+            )
+            self.assertEqual([r for r, _ in results], ["voice-id"] * 4)
+            errors = await asyncio.gather(
+                *(flight.do("bad", failing) for _ in range(2)), return_exceptions=True
+            )
+            self.assertTrue(all(isinstance(e, RuntimeError) for e in errors))
+
+        asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+
+
+class TestAudioPCM(unittest.TestCase):
+    def test_loop_to_length_tiles_and_crossfades(self):
+        """Looping should tile exactly and blend only the seams (pass criteria: sample values)"""
+        import numpy as np
+        from audio_pcm import loop_to_length
+
+        samples = np.arange(10, dtype=np.int16)[:, None]
+        plain = loop_to_length(samples, 25)
+        self.assertEqual(plain.ravel().tolist(), (list(range(10)) * 3)[:25])
+        faded = loop_to_length(samples, 25, crossfade_frames=2).ravel().tolist()
+        # Period 8: each seam fades from the tail (8, 9) into the head (0, 1)
+        self.assertEqual(faded[:10], [0, 1, 2, 3, 4, 5, 6, 7, 8, 5])
+        self.assertEqual(faded[16:18], [8, 5])
+        self.assertEqual(loop_to_length(samples, 4).ravel().tolist(), [0, 1, 2, 3])
+
+    def test_loop_segment_keeps_format(self):
+        """Looped AudioSegments should keep rate/width/channels (pass criteria: exact length)"""
+        from pydub import AudioSegment
+        from audio_pcm import loop_segment
+
+        audio = AudioSegment.silent(duration=300, frame_rate=16000).set_channels(2)
+        looped = loop_segment(audio, 1000, crossfade_ms=20)
+        self.assertEqual(len(looped), 1000)
+        self.assertEqual(looped.frame_count(), 16000)
+        self.assertEqual(
+            (looped.channels, looped.sample_width, looped.frame_rate), (2, 2, 16000)
+        )
+
+
+class TestAudioPreprocess(unittest.TestCase):
+    def test_trims_silence_normalizes_and_resamples(self):
+        """Silence should be cut and loudness/rate normalized (pass criteria: length, level, rate)"""
+        import numpy as np
+        from audio_preprocess import preprocess_reference_audio
+
+        rate = 16000
+        tone = (0.05 * np.sin(2 * np.pi * 220 * np.arange(rate) / rate) * 32767).astype(
+            np.int16
+        )
+        silence = np.zeros(2 * rate, dtype=np.int16)
+        samples = np.concatenate([silence, tone, silence, tone, silence])[:, None]
+        processed = preprocess_reference_audio(
+            samples,
+            rate,
+            2,
+            target_frame_rate=8000,
+            max_pause_ms=500,
+            keep_pause_ms=250,
+        )
+        # 2 s of tone + ~250 ms pause + 2 x 100 ms edge padding, at 8 kHz
+        self.assertEqual(processed.shape[1], 1)
+        self.assertAlmostEqual(len(processed) / 8000, 2.45, delta=0.02)
+        first_tone = processed[800 : 800 + 8000, 0] / 32767.0
+        rms = np.sqrt(np.mean(first_tone**2))
+        self.assertAlmostEqual(20 * np.log10(rms), -20.0, delta=1.0)
+
+
+class TestAudioProbe(unittest.TestCase):
+    def test_probe_wav_and_mp3_headers(self):
+        """Header probing should report duration without decoding (pass criteria: probed values)"""
+        import io
+        import wave
+        from audio_probe import probe_audio
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(b"\x00" * 4 * 16000 * 3)
+        info = probe_audio(buffer.getvalue())
+        self.assertEqual(
+            (info["codec"], info["sample_rate"], info["channels"]), ("pcm", 16000, 2)
+        )
+        self.assertAlmostEqual(info["duration_sec"], 3.0)
+
+        # 100 MPEG-1 Layer III frames, 128 kbps, 44.1 kHz, 417 bytes each
+        frame = b"\xff\xfb\x90\x64" + b"\x00" * 413
+        info = probe_audio(
+            b"ID3\x03\x00\x00\x00\x00\x00\x05" + b"\x00" * 5 + frame * 100
+        )
+        self.assertEqual((info["codec"], info["sample_rate"]), ("mp3", 44100))
+        self.assertAlmostEqual(info["duration_sec"], 100 * 417 * 8 / 128000)
+        self.assertIsNone(probe_audio(b"not audio" * 10))
+
+
+class TestPCMCache(unittest.TestCase):
+    def test_decode_reuses_cached_pcm(self):
+        """Second decode of the same bytes should come from the cache (pass criteria: same PCM, eviction)"""
+        import io
+        import tempfile
+        import wave
+        from audio_pcm import segment_to_array
+        from pcm_cache import PCMCache
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(8000)
+            wav.writeframes(os.urandom(4 * 800))
+        data = buffer.getvalue()
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PCMCache(tmp, max_bytes=5000)
+            decoded = cache.decode(data, "sample.wav")
+            entry = os.path.join(tmp, PCMCache.make_key(data) + PCMCache.FILE_SUFFIX)
+            # 16-byte header followed by the raw samples
+            self.assertEqual(os.path.getsize(entry), 16 + 800 * 4)
+            cached = cache.decode(data, "sample.wav")
+            self.assertEqual(cached.raw_data, decoded.raw_data)
+            self.assertEqual((cached.channels, cached.frame_rate), (2, 8000))
+            samples, _ = segment_to_array(decoded)
+            cache.store("other", samples, 8000)  # over budget, evicts the oldest
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+
+class TestAudioProcessPool(unittest.TestCase):
+    def test_runs_in_worker_process(self):
+        """Picklable tasks should run in a separate process (pass criteria: result)"""
+        import asyncio
+        from audio_pool import AudioProcessPool
+
+        pool = AudioProcessPool(max_workers=1, max_pending=2, task_timeout_sec=60)
+        try:
+            self.assertEqual(asyncio.run(pool.run(sorted, [3, 1, 2])), [1, 2, 3])
+        finally:
+            pool.shutdown()
+        self.assertEqual(pool.pending(), 0)
+
+    def test_rejects_when_busy_and_times_out(self):
+        """Tasks beyond max_pending fail fast, slow tasks time out (pass criteria: errors)"""
+        import asyncio
+        from audio_pool import (
+            AudioPoolBusyError,
+            AudioProcessPool,
+            AudioTaskTimeoutError,
+        )
+
+        pool = AudioProcessPool(max_workers=0, max_pending=1, task_timeout_sec=0.05)
+
+        async def scenario():
+            slow = asyncio.create_task(pool.run(time.sleep, 0.3))
+            await asyncio.sleep(0.01)
+            with self.assertRaises(AudioPoolBusyError):
+                await pool.run(time.sleep, 0)
+            with self.assertRaises(AudioTaskTimeoutError):
+                await slow
+
+        asyncio.run(scenario())
+
+    def test_timeout_excludes_queue_wait(self):
+        """A task waiting for a busy worker is not timed until it starts (pass criteria: no timeout)"""
+        import asyncio
+        from audio_pool import AudioProcessPool
+
+        pool = AudioProcessPool(max_workers=1, max_pending=2, task_timeout_sec=0.8)
+
+        async def scenario():
+            # Start the worker process first, spawning it is not the point
+            await pool.run(sorted, [])
+            return await asyncio.gather(
+                pool.run(time.sleep, 0.5), pool.run(time.sleep, 0.5)
+            )
+
+        try:
+            self.assertEqual(asyncio.run(scenario()), [None, None])
+        finally:
+            pool.shutdown()
+        self.assertEqual(pool.pending(), 0)
+
+
+class TestAudioFormats(unittest.TestCase):
+    def test_output_format_lookup(self):
+        """Known formats map to ElevenLabs names, unknown ones fail (pass criteria: spec, ValueError)"""
+        from audio_formats import get_output_format
+
+        self.assertEqual(get_output_format(None)["elevenlabs"], "mp3_44100_128")
+        ulaw = get_output_format("ulaw_8000")
+        self.assertEqual(ulaw["elevenlabs"], "ulaw_8000")
+        self.assertEqual(ulaw["extension"], ".ulaw")
+        self.assertEqual(
+            get_output_format("pcm_16000")["media_type"],
+            "audio/L16; rate=16000; channels=1",
+        )
+        with self.assertRaises(ValueError):
+            get_output_format("wav")
+
+
+class TestAudioTranscode(unittest.TestCase):
+    def _frames(self, chunks, input_format):
+        import asyncio
+        from audio_transcode import transcode_to_ulaw_frames
+
+        async def source():
+            for chunk in chunks:
+                yield chunk
+
+        async def collect():
+            return [f async for f in transcode_to_ulaw_frames(source(), input_format)]
+
+        return asyncio.run(collect())
+
+    def test_ulaw_input_is_reframed(self):
+        """mu-law chunks should be regrouped into padded 20 ms frames (pass criteria: sizes)"""
+        frames = self._frames([b"\x00" * 100, b"\x00" * 150], "ulaw_8000")
+        self.assertEqual([len(f) for f in frames], [160, 160])
+        self.assertEqual(frames[1][-70:], b"\xff" * 70)
+
+    def test_pcm_is_transcoded_to_ulaw(self):
+        """One second of 16 kHz PCM should become fifty 20 ms frames (pass criteria: frames)"""
+        pcm = b"\x00\x00" * 16000
+        frames = self._frames([pcm[:10000], pcm[10000:]], "pcm_16000")
+        self.assertEqual(len(frames), 50)
+        self.assertTrue(all(len(f) == 160 for f in frames))
+
+    def test_noisy_decoder_does_not_stall(self):
+        """Megabytes of ffmpeg decode errors must not block the transcoder (pass criteria: completes)"""
+        import asyncio
+        import os
+
+        # mp3 frame headers followed by garbage: ffmpeg logs an error per frame
+        damaged = b"".join(b"\xff\xfb\x90\x64" + os.urandom(413) for _ in range(20000))
+        chunks = [damaged[i : i + 65536] for i in range(0, len(damaged), 65536)]
+
+        async def collect():
+            from audio_transcode import transcode_to_ulaw_frames
+
+            async def source():
+                for chunk in chunks:
+                    yield chunk
+
+            return [f async for f in transcode_to_ulaw_frames(source(), "mp3")]
+
+        asyncio.run(asyncio.wait_for(collect(), 60))
+
+
+class TestElevenLabsClient(unittest.TestCase):
+    def test_retry_rules(self):
+        """429 is always retried, 5xx only when idempotent (pass criteria: delays)"""
+        import httpx
+        from elevenlabs_client import ElevenLabsClient
+
+        client = ElevenLabsClient("http://localhost", max_retries=2)
+        limited = httpx.Response(429, headers={"Retry-After": "3"})
+        self.assertGreaterEqual(client.retry_delay(0, limited), 3)
+        failed = httpx.Response(503)
+        self.assertIsNone(client.retry_delay(0, failed))
+        self.assertIsNotNone(client.retry_delay(0, failed, idempotent=True))
+        self.assertIsNone(client.retry_delay(2, failed, idempotent=True))
+        self.assertIsNone(client.retry_delay(0, httpx.Response(400), idempotent=True))
+        too_long = httpx.Response(429, headers={"Retry-After": "3600"})
+        self.assertIsNone(client.retry_delay(0, too_long))
+
+    def test_unsent_requests_are_retried(self):
+        """Connection failures are retried even for POST, read timeouts are not (pass criteria: delays)"""
+        import httpx
+        from elevenlabs_client import ElevenLabsClient, parse_retry_after
+
+        client = ElevenLabsClient("http://localhost")
+        self.assertIsNotNone(client.retry_delay(0, error=httpx.ConnectError("down")))
+        self.assertIsNone(client.retry_delay(0, error=httpx.ReadTimeout("slow")))
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertIsNone(parse_retry_after("soon"))
+
+
+class TestRateGovernor(unittest.TestCase):
+    def test_token_bucket_paces_bursts(self):
+        """Tokens beyond the burst are paid back at the refill rate (pass criteria: delays)"""
+        from rate_governor import TokenBucket
+
+        bucket = TokenBucket(rate=10, capacity=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.02)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, delta=0.02)
+
+    def test_concurrency_shared_by_threads_and_tasks(self):
+        """A slot released by a thread wakes a waiting asyncio task (pass criteria: stats, order)"""
+        import asyncio
+        import threading
+        from rate_governor import RateGovernor
+
+        governor = RateGovernor(max_concurrency=1)
+        governor.acquire()
+        self.assertEqual(governor.stats(), {"in_flight": 1, "waiting": 0})
+
+        async def waiter():
+            task = asyncio.ensure_future(governor.acquire_async())
+            await asyncio.sleep(0.05)
+            self.assertFalse(task.done())
+            self.assertEqual(governor.stats()["waiting"], 1)
+            threading.Timer(0.05, governor.release).start()
+            await asyncio.wait_for(task, 2)
+
+        asyncio.run(waiter())
+        self.assertEqual(governor.stats(), {"in_flight": 1, "waiting": 0})
+        governor.release()
+        self.assertEqual(governor.stats(), {"in_flight": 0, "waiting": 0})
+
+
+class TestTTSChunking(unittest.TestCase):
+    def test_split_text_chunks(self):
+        """Whole sentences are packed up to max_chars, long ones cut at spaces (pass criteria: chunks)"""
+        from tts_chunking import split_sentences, split_text_chunks
+
+        text = "Hi there. How are you? Fine, thanks! 好的。再见"
+        self.assertEqual("".join(split_sentences(text)), text)
+        self.assertEqual(
+            split_text_chunks(text, 25),
+            ["Hi there. How are you?", "Fine, thanks! 好的。再见"],
+        )
+        self.assertEqual(
+            split_text_chunks("one two three four", 9), ["one two", "three", "four"]
+        )
+
+    def test_stitch_pcm_with_crossfade(self):
+        """Raw parts are appended in order, a crossfade overlaps the seams (pass criteria: sizes)"""
+        import tempfile
+        from tts_chunking import stitch_audio
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for index in range(3):
+                paths.append(os.path.join(tmp_dir, f"{index}.pcm"))
+                with open(paths[-1], "wb") as f:
+                    f.write(bytes([index]) * 3200)  # 100 ms at 16 kHz
+            output_path = os.path.join(tmp_dir, "out.pcm")
+            stitch_audio(paths, output_path, "pcm_16000")
+            with open(output_path, "rb") as f:
+                self.assertEqual(
+                    f.read(), b"\x00" * 3200 + b"\x01" * 3200 + b"\x02" * 3200
+                )
+            stitch_audio(paths, output_path, "pcm_16000", crossfade_ms=20)
+            self.assertEqual(os.path.getsize(output_path), 3 * 3200 - 2 * 640)
+
+
+class TestModelLatency(unittest.TestCase):
+    def test_percentiles_and_ranking(self):
+        """Models are ranked by p50, unmeasured ones last (pass criteria: stats, order)"""
+        from model_latency import ModelLatencyTracker
+
+        tracker = ModelLatencyTracker(min_samples=3)
+        for seconds in (0.1, 0.2, 0.3, 0.4, 2.0):
+            tracker.record("slow", seconds + 1)
+            tracker.record("fast", seconds)
+        self.assertEqual(tracker.percentile("fast", 50), 0.3)
+        self.assertEqual(tracker.stats()["fast"]["p95"], 2.0)
+        self.assertEqual(tracker.rank(["new", "slow", "fast"]), ["fast", "slow", "new"])
+        self.assertEqual(tracker.hedge_delay("fast", 9), 2.0)
+        self.assertEqual(tracker.hedge_delay("new", 9), 9)
+
+    def test_hedged_call(self):
+        """A slow primary is hedged and the first success wins, failures fall through (pass criteria: winners)"""
+        from model_latency import ModelLatencyTracker, hedged_call
+
+        delays = {"a": 1.0, "b": 0.01}
+
+        def synthesize(model_id):
+            time.sleep(delays[model_id])
+            return model_id.upper()
+
+        tracker = ModelLatencyTracker()
+        start = time.monotonic()
+        result = hedged_call(synthesize, ["a", "b"], tracker, hedge_after_sec=0.05)
+        self.assertEqual(result, ("b", "B"))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        # The losing attempt's result is discarded, after waiting for it
+        discarded = []
+        result = hedged_call(
+            synthesize,
+            ["a", "b"],
+            ModelLatencyTracker(),
+            hedge_after_sec=0.05,
+            discard=lambda model_id, result: discarded.append((model_id, result)),
+            wait_for_losers=True,
+        )
+        self.assertEqual(result, ("b", "B"))
+        self.assertEqual(discarded, [("a", "A")])
+
+        def broken(model_id):
+            if model_id == "a":
+                raise RuntimeError("down")
+            return model_id
+
+        tracker = ModelLatencyTracker()
+        self.assertEqual(hedged_call(broken, ["a", "b"], tracker, 5), ("b", "b"))
+        self.assertEqual(tracker.stats()["b"]["count"], 1)
+        with self.assertRaises(RuntimeError):
+            hedged_call(broken, ["a"], tracker, 5)
+        # Failures rank a model last but do not stretch its hedge deadline
+        self.assertEqual(tracker.stats()["a"]["failures"], 2)
+        self.assertEqual(tracker.rank(["a", "b"]), ["b", "a"])
+        self.assertEqual(tracker.hedge_delay("a", 9), 9)
+
+        # A failed hedge is replaced by the next model instead of waiting
+        # for the slow primary
+        delays = {"a": 1.0, "b": 0.1, "c": 0.01}
+
+        def flaky(model_id):
+            time.sleep(delays[model_id])
+            if model_id == "b":
+                raise RuntimeError("down")
+            return model_id
+
+        start = time.monotonic()
+        result = hedged_call(
+            flaky, ["a", "b", "c"], ModelLatencyTracker(), hedge_after_sec=0.05
+        )
+        self.assertEqual(result, ("c", "c"))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class TestTTSBatchManifest(unittest.TestCase):
+    def test_only_intact_outputs_are_complete(self):
+        """Recorded outputs survive reloads until their file or inputs change (pass criteria: is_complete)"""
+        import tempfile
+        from tts_batch import TTSBatchManifest
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            output_path = os.path.join(tmp, "a.mp3")
+            with open(output_path, "wb") as f:
+                f.write(b"audio")
+            inputs = TTSBatchManifest.inputs_key("v1", "m1", "Hi", "mp3", {"a": 1})
+            manifest = TTSBatchManifest(path)
+            self.assertFalse(manifest.is_complete("a.mp3", output_path, inputs))
+            manifest.record("a.mp3", output_path, inputs, voice_id="v1")
+            reloaded = TTSBatchManifest(path)
+            self.assertTrue(reloaded.is_complete("a.mp3", output_path, inputs))
+            for changed in (
+                TTSBatchManifest.inputs_key("v1", "m1", "Hello", "mp3", {"a": 1}),
+                TTSBatchManifest.inputs_key("v1", "m1", "Hi", "mp3", {"a": 2}),
+            ):
+                self.assertFalse(reloaded.is_complete("a.mp3", output_path, changed))
+            with open(output_path, "wb") as f:
+                f.write(b"AUDIO")  # same size, different content
+            reloaded = TTSBatchManifest(path)
+            self.assertFalse(reloaded.is_complete("a.mp3", output_path, inputs))
+            os.remove(output_path)
+            self.assertFalse(reloaded.is_complete("a.mp3", output_path, inputs))
+
+
+class TestClonePipeline(FakeElevenLabsTestCase):
+    def params(self, retell_id="test-andrew", audio_bytes=None):
+        return {
+            "retell_id": retell_id,
+            "audio_path": f"{retell_id}/sample.wav",
+            "audio_bytes": audio_bytes or self.sample_audio,
+        }
+
+    def assertNoStageTasks(self):
+        import asyncio
+
+        # Shared voice listings may outlive a caller by design, stages may not
+        stages = [
+            task
+            for task in asyncio.all_tasks()
+            if task.get_coro().__name__ == "_timed_stage"
+        ]
+        self.assertEqual(stages, [])
+
+    def run_pipeline(self, params):
+        import asyncio
+        from elevenlabs_retell_voice_cloning import (
+            generate_elevenlabs_cloned_voice_from_retellai_async,
+        )
+
+        async def scenario():
+            try:
+                return await generate_elevenlabs_cloned_voice_from_retellai_async(
+                    params, self.tmp_dir, persist_artifacts=False
+                )
+            finally:
+                await asyncio.sleep(0.05)
+                self.assertNoStageTasks()
+
+        return asyncio.run(scenario())
+
+    def test_transcription_overlaps_cloning(self):
+        """STT runs alongside voice lookup and cloning, TTS follows both (pass criteria: timings, output)"""
+        self.server.latency_sec = 0.2
+        start = time.monotonic()
+        result = self.run_pipeline(self.params())
+        elapsed = time.monotonic() - start
+        timings = result["timings"]
+        sequential = timings["stt"] + timings["voice_lookup"] + timings["clone"]
+        self.assertLess(elapsed - timings["tts"], sequential - 0.15)
+        self.assertEqual(result["transcribed_text"], "This is a benchmark transcript.")
+        self.assertTrue(result["tts_text"].startswith(result["transcribed_text"]))
+        self.assertEqual(os.path.getsize(result["tts_output_path"]), 16 * 1024)
+        for route in ("POST /v1/speech-to-text", "POST /v1/voices/add"):
+            self.assertEqual(self.server.request_counts[route], 1)
+
+    def test_branch_failures_propagate(self):
+        """A failed STT or clone fails the pipeline without leaving tasks behind (pass criteria: HTTPStatusError)"""
+        import httpx
+
+        routes = ("POST /v1/speech-to-text", "POST /v1/voices/add")
+        for seconds, route in enumerate(routes, start=3):
+            with self.subTest(route=route):
+                self.server.fail_routes = {route: 500}
+                # Fresh audio each time, a clone made by a failed run is reused
+                params = self.params(f"test-{seconds}", self._tone_wav(seconds))
+                with self.assertRaises(httpx.HTTPStatusError) as failure:
+                    self.run_pipeline(params)
+                self.assertEqual(failure.exception.response.status_code, 500)
+        self.assertNotIn("POST /v1/text-to-speech", str(self.server.request_counts))
+
+    def test_cancellation_propagates(self):
+        """Cancelling the pipeline cancels its transcription branch too (pass criteria: CancelledError)"""
+        import asyncio
+        from elevenlabs_retell_voice_cloning import (
+            generate_elevenlabs_cloned_voice_from_retellai_async,
+        )
+
+        self.server.latency_sec = 0.5
+
+        async def scenario():
+            task = asyncio.ensure_future(
+                generate_elevenlabs_cloned_voice_from_retellai_async(
+                    self.params(), self.tmp_dir, persist_artifacts=False
+                )
+            )
+            # Cancel while the transcription request is in flight
+            while "POST /v1/speech-to-text" not in self.server.request_counts:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # The branch has already finished when the pipeline re-raises
+            self.assertNoStageTasks()
+
+        asyncio.run(scenario())
+
+
+class TestTTSStream(FakeElevenLabsTestCase):
+    def test_stream_relays_and_saves_audio(self):
+        """Streamed chunks reach the caller and the output file, upstream errors raise before any audio (pass criteria: bytes, HTTPStatusError)"""
+        import asyncio
+        import httpx
+        from benchmarks.fake_elevenlabs import FAKE_TTS_AUDIO
+        from elevenlabs_retell_voice_cloning import (
+            elevenlabs_text_to_speech_stream_async,
+        )
+
+        output_path = os.path.join(self.tmp_dir, "stream.mp3")
+
+        async def stream():
+            chunks = await elevenlabs_text_to_speech_stream_async(
+                "test", "v1", "Hello there.", output_path
+            )
+            return [chunk async for chunk in chunks]
+
+        chunks = asyncio.run(stream())
+        self.assertTrue(chunks)
+        self.assertEqual(b"".join(chunks), FAKE_TTS_AUDIO)
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), FAKE_TTS_AUDIO)
+        self.assertEqual(
+            self.server.request_counts["POST /v1/text-to-speech/v1/stream"], 1
+        )
+
+        os.remove(output_path)
+        self.server.fail_routes = {"POST /v1/text-to-speech/": 500}
+        with self.assertRaises(httpx.HTTPStatusError):
+            asyncio.run(stream())
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_idle_consumer_frees_the_upstream_slot(self):
+        """A stream nobody reads is closed after the idle timeout (pass criteria: governor stats, no output)"""
+        import asyncio
+        from elevenlabs_retell_voice_cloning import (
+            elevenlabs_text_to_speech_stream_async,
+        )
+        from rate_governor import get_rate_governor
+
+        self.addCleanup(
+            setattr,
+            Configs,
+            "TTS_STREAM_IDLE_TIMEOUT_SEC",
+            Configs.TTS_STREAM_IDLE_TIMEOUT_SEC,
+        )
+        Configs.TTS_STREAM_IDLE_TIMEOUT_SEC = 0.1
+        output_path = os.path.join(self.tmp_dir, "stream.mp3")
+
+        async def scenario():
+            chunks = await elevenlabs_text_to_speech_stream_async(
+                "test", "v1", "Hello there.", output_path
+            )
+            await chunks.__anext__()
+            governor = get_rate_governor("test")
+            self.assertEqual(governor.stats()["in_flight"], 1)
+            await asyncio.sleep(0.3)
+            self.assertEqual(governor.stats()["in_flight"], 0)
+            with self.assertRaises(TimeoutError):
+                async for _ in chunks:
+                    pass
+
+        asyncio.run(scenario())
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_generate_cloned_voice_streams(self):
+        """stream=True relays the TTS audio, an upstream error is not a 200 (pass criteria: status, body, workspace)"""
+        from fastapi.testclient import TestClient
+        from benchmarks.fake_elevenlabs import FAKE_TTS_AUDIO
+        from elevenlabs_api import app
+
+        def post(client):
+            return client.post(
+                "/generate-cloned-voice",
+                data={"retell_id": "test-1", "tts_text": "Hello.", "stream": "true"},
+                files={"audio": ("sample.wav", self.sample_audio, "audio/wav")},
+            )
+
+        with TestClient(app, raise_server_exceptions=False) as client:
+            response = post(client)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers["content-type"], "audio/mpeg")
+            self.assertEqual(response.content, FAKE_TTS_AUDIO)
+            self.server.fail_routes = {"POST /v1/text-to-speech/": 500}
+            self.assertEqual(post(client).status_code, 500)
+        # Both requests cleaned up their workspace
+        self.assertEqual(os.listdir(Configs.WORKSPACE_DIR), [])
+
+
+class TestCloningBatch(FakeElevenLabsTestCase):
+    def test_batch_runs_items_concurrently(self):
+        """Each item is cloned once and synthesized per model, failures stay per item (pass criteria: statuses, requests)"""
+        import asyncio
+        from elevenlabs_retell_voice_cloning import run_cloning_batch_async
+
+        audio_bytes = self.sample_audio
+        params_list = [
+            {
+                "retell_id": f"test-{index}",
+                "audio_path": f"item_{index}/sample.wav",
+                "audio_bytes": audio_bytes,
+                "tts_text": "Hello there.",
+            }
+            for index in range(2)
+        ]
+        params_list.append(
+            {**params_list[0], "retell_id": "test-bad", "output_format": "wav"}
+        )
+        results = asyncio.run(
+            run_cloning_batch_async(
+                params_list,
+                self.tmp_dir,
+                tts_models=["model_a", "model_b"],
+                max_concurrency=2,
+                persist_artifacts=False,
+            )
+        )
+        self.assertEqual(
+            [(item["status"], item["tts_model_id"]) for item in results],
+            [("done", "model_a"), ("done", "model_b")] * 2
+            + [("failed", "model_a"), ("failed", "model_b")],
+        )
+        for item in results[:4]:
+            self.assertEqual(item["result"]["tts_model_id"], item["tts_model_id"])
+            self.assertTrue(
+                item["result"]["tts_output_path"].endswith(
+                    f"_{item['tts_model_id']}.mp3"
+                )
+            )
+            with open(item["result"]["tts_output_path"], "rb") as f:
+                self.assertEqual(len(f.read()), 16 * 1024)
+        # Cloning and STT run once per item, the failed item makes no request
+        for route in ("POST /v1/voices/add", "POST /v1/speech-to-text"):
+            self.assertEqual(self.server.request_counts[route], 2)
+        tts_requests = sum(
+            count
+            for route, count in self.server.request_counts.items()
+            if route.startswith("POST /v1/text-to-speech/")
+        )
+        self.assertEqual(tts_requests, 4)
+
+    def test_batch_endpoint_validates_items(self):
+        """Malformed items and ambiguous uploads are rejected, valid batches return a manifest (pass criteria: status codes)"""
+        import json
+        from fastapi.testclient import TestClient
+        from elevenlabs_api import app
+
+        audio_bytes = self.sample_audio
+        item = {"retell_id": "test-1", "audio": "sample.wav", "tts_text": "Hi."}
+
+        def post(items, filenames=("sample.wav",)):
+            return client.post(
+                "/generate-cloned-voices/batch",
+                data={"items": json.dumps(items), "response_format": "json"},
+                files=[
+                    ("audios", (name, audio_bytes, "audio/wav")) for name in filenames
+                ],
+            )
+
+        with TestClient(app) as client:
+            self.assertEqual(post(["sample.wav"]).status_code, 400)
+            self.assertEqual(
+                post([item], ("sample.wav", "x/sample.wav")).status_code, 400
+            )
+            self.assertEqual(post([{**item, "audio": "missing.mp3"}]).status_code, 400)
+            response = post([item, {**item, "retell_id": "test-2"}])
+        self.assertEqual(response.status_code, 200)
+        manifest = response.json()["items"]
+        self.assertEqual([entry["status"] for entry in manifest], ["done", "done"])
+        self.assertEqual(
+            [entry["retell_id"] for entry in manifest], ["test-1", "test-2"]
+        )
+
+
 def run_tests_with_coverage():
     cov = coverage.Coverage(source=["."])
     cov.start()
@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from configs import Configs
+from elevenlabs_retell_voice_cloning import elevenlabs_text_to_speech_async
+from voice_registry import fingerprint_file
+
+
+class TTSBatchManifest:
+    """
+    Persistent record of the outputs a TTS batch has completed, so a rerun
+    skips them. Stored as a JSON file:
+    {"outputs": {filename: {"bytes", "sha256", "inputs", "voice_id", "model_id", "completed_at"}}}
+    where inputs is the inputs_key of the synthesis that produced the file.
+    """
+
+    @staticmethod
+    def inputs_key(voice_id, model_id, text, output_format, voice_settings=None):
+        """
+        Returns:
+            str: sha256 hex digest identifying what a TTS output was made from.
+        """
+        payload = json.dumps(
+            [voice_id, model_id, text, output_format, voice_settings],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._outputs = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._outputs = json.load(f).get("outputs", {})
+
+    def is_complete(self, filename, output_path, inputs):
+        """
+        Returns:
+            bool: True if filename was completed from the same inputs (see
+            inputs_key) and output_path still holds exactly the recorded audio.
+        """
+        with self._lock:
+            entry = self._outputs.get(filename)
+        if not entry or entry.get("inputs") != inputs:
+            return False
+        if not os.path.isfile(output_path):
+            return False
+        if os.path.getsize(output_path) != entry["bytes"]:
+            return False
+        return fingerprint_file(output_path) == entry["sha256"]
+
+    def record(self, filename, output_path, inputs, **info):
+        """
+        Marks filename as completed from inputs with the size and hash of
+        output_path.
+        Returns:
+            dict: The stored entry.
+        """
+        entry = {
+            "bytes": os.path.getsize(output_path),
+            "sha256": fingerprint_file(output_path),
+            "inputs": inputs,
+            **info,
+            "completed_at": time.time(),
+        }
+        with self._lock:
+            self._outputs[filename] = entry
+            self._save()
+        return entry
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"outputs": self._outputs}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+async def run_tts_batch_async(
+    jobs,
+    output_dir,
+    output_format="mp3",
+    voice_settings=None,
+    max_concurrency=None,
+    manifest_path=None,
+    log_path=None,
+    api_key=None,
+):
+    """
+    Synthesizes many TTS jobs, up to max_concurrency at a time, and can be
+    resumed: outputs recorded in the manifest whose files are intact and
+    were made from the same voice, model, text, format and voice settings
+    are skipped, so an interrupted run picks up where it stopped. Every job
+    appends one JSON line (status, latency, bytes, error) to the result log.
+    Args:
+        jobs (list): Dicts with keys filename, voice_id, text and model_id.
+        output_dir (str): Directory of the audio files.
+        output_format (str): TTS audio format, see audio_formats.TTS_OUTPUT_FORMATS.
+        voice_settings (dict): Passed to every TTS call.
+        max_concurrency (int): Default TTS_BATCH_MAX_CONCURRENCY.
+        manifest_path (str): Default <output_dir>/manifest.json.
+        log_path (str): Default <output_dir>/results.jsonl.
+        api_key (str): Default ELEVENLABS_API_KEY.
+    Returns:
+        list: One result dict per job in input order, with keys filename,
+        voice_id, model_id, status ("done"/"skipped"/"failed"), latency_sec,
+        bytes, characters and error.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if max_concurrency is None:
+        max_concurrency = Configs.TTS_BATCH_MAX_CONCURRENCY
+    if manifest_path is None:
+        manifest_path = os.path.join(output_dir, "manifest.json")
+    if log_path is None:
+        log_path = os.path.join(output_dir, "results.jsonl")
+    if api_key is None:
+        api_key = Configs.ELEVENLABS_API_KEY
+    manifest = TTSBatchManifest(manifest_path)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    total = len(jobs)
+    counts = {"done": 0, "skipped": 0, "failed": 0}
+    batch_start = time.perf_counter()
+
+    def report(result):
+        counts[result["status"]] += 1
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.write(json.dumps({**result, "timestamp": time.time()}) + "\n")
+        finished = sum(counts.values())
+        detail = (
+            result["error"] or f"{result['latency_sec']:.2f}s, {result['bytes']} bytes"
+        )
+        print(
+            f"[{finished}/{total}] {result['status']} {result['filename']} ({detail})"
+        )
+
+    async def run_job(job):
+        output_path = os.path.join(output_dir, job["filename"])
+        inputs = TTSBatchManifest.inputs_key(
+            job["voice_id"], job["model_id"], job["text"], output_format, voice_settings
+        )
+        result = {
+            "filename": job["filename"],
+            "voice_id": job["voice_id"],
+            "model_id": job["model_id"],
+            "status": "skipped",
+            "latency_sec": 0.0,
+            "bytes": 0,
+            "characters": len(job["text"]),
+            "error": None,
+        }
+        if await asyncio.to_thread(
+            manifest.is_complete, job["filename"], output_path, inputs
+        ):
+            result["bytes"] = os.path.getsize(output_path)
+            report(result)
+            return result
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await elevenlabs_text_to_speech_async(
+                    api_key,
+                    job["voice_id"],
+                    job["text"],
+                    output_path,
+                    model_id=job["model_id"],
+                    output_format=output_format,
+                    voice_settings=voice_settings,
+                )
+                entry = await asyncio.to_thread(
+                    manifest.record,
+                    job["filename"],
+                    output_path,
+                    inputs,
+                    voice_id=job["voice_id"],
+                    model_id=job["model_id"],
+                )
+                result["status"] = "done"
+                result["bytes"] = entry["bytes"]
+            except Exception as e:
+                result["status"] = "failed"
+                result["error"] = str(e)
+            result["latency_sec"] = time.perf_counter() - start
+        report(result)
+        return result
+
+    results = await asyncio.gather(*(run_job(job) for job in jobs))
+    print(
+        f"TTS batch finished in {time.perf_counter() - batch_start:.1f}s: "
+        f"{counts['done']} synthesized, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed"
+    )
+    return results
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from configs import Configs
+
+
+class TTSCache:
+    """
+    Disk-backed, content-addressed cache of synthesized TTS audio.
+    Entries are keyed by a hash of the synthesis inputs and evicted in
+    least-recently-used order once the cache grows past max_bytes.
+    """
+
+    FILE_SUFFIX = ".audio"
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(voice_id, model_id, text, voice_settings=None, output_format=None):
+        """
+        Returns:
+            str: sha256 hex digest identifying the synthesis request.
+        """
+        key_data = json.dumps(
+            {
+                "voice_id": voice_id,
+                "model_id": model_id,
+                "text": text,
+                "voice_settings": voice_settings or {},
+                "output_format": output_format,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def contains(self, key):
+        """
+        Returns:
+            bool: True if key is cached. Does not count as a hit or miss.
+        """
+        with self._lock:
+            return key in self._entries
+
+    def fetch(self, key, output_path):
+        """
+        Places the cached audio for key at output_path (atomically), or writes
+        it into output_path if that is a writable binary file object.
+        Returns:
+            bool: True on a cache hit, False on a miss.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+        entry_path = self._entry_path(key)
+        try:
+            os.utime(entry_path)
+            if hasattr(output_path, "write"):
+                with open(entry_path, "rb") as f:
+                    shutil.copyfileobj(f, output_path)
+            else:
+                tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+                shutil.copyfile(entry_path, tmp_path)
+                os.replace(tmp_path, output_path)
+        except FileNotFoundError:
+            # Removed behind our back, treat as a miss
+            with self._lock:
+                self._forget(key)
+                self.hits -= 1
+                self.misses += 1
+            return False
+        return True
+
+    def store(self, key, source_path):
+        """
+        Adds the audio file at source_path to the cache under key.
+        """
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, entry_path)
+        size = os.path.getsize(entry_path)
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + self.FILE_SUFFIX)
+
+    def _load_index(self):
+        # Rebuild LRU order from modification times, which fetch() refreshes
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.FILE_SUFFIX):
+                stat = entry.stat()
+                key = entry.name[: -len(self.FILE_SUFFIX)]
+                entries.append((stat.st_mtime, key, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_tts_cache():
+    """
+    Returns the process-wide TTS cache, or None if TTS_CACHE_ENABLED is off.
+    """
+    global _default_cache
+    if not Configs.TTS_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TTSCache(
+                Configs.TTS_CACHE_DIR, Configs.TTS_CACHE_MAX_BYTES
+            )
+        return _default_cache
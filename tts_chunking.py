@@ -0,0 +1,119 @@
+import audioop
+import re
+import shutil
+from pydub import AudioSegment
+
+# A sentence ends at terminal punctuation (plus closing quotes/brackets)
+# followed by whitespace; CJK full stops need no whitespace after them.
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*\s+|[。！？]+\s*")
+
+# Formats whose byte streams stay valid when appended back to back: MPEG
+# audio is a sequence of self-contained frames, pcm/ulaw are headerless.
+# Ogg/Opus pages carry stream serials and granule positions, so it is
+# always decoded and re-encoded.
+CONCATENABLE_FORMATS = ("mp3", "ulaw_8000", "pcm_16000")
+
+
+def split_sentences(text):
+    """
+    Returns:
+        list: The sentences of text, each keeping its trailing whitespace, so
+        "".join(result) == text.
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentences.append(text[start : match.end()])
+        start = match.end()
+    if start < len(text):
+        sentences.append(text[start:])
+    return sentences
+
+
+def _wrap(sentence, max_chars):
+    # Sentences longer than max_chars are cut at the last space that fits
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars) + 1 or max_chars
+        yield sentence[:cut]
+        sentence = sentence[cut:]
+    if sentence:
+        yield sentence
+
+
+def split_text_chunks(text, max_chars):
+    """
+    Packs whole sentences of text into chunks of at most max_chars, so each
+    chunk can be synthesized on its own with natural prosody.
+    Args:
+        text (str): Text to split.
+        max_chars (int): Maximum characters per chunk.
+    Returns:
+        list: Non-empty, stripped chunks in text order.
+    """
+    chunks = []
+    current = ""
+    for sentence in split_sentences(text):
+        for piece in _wrap(sentence, max_chars):
+            if current and len(current) + len(piece) > max_chars:
+                chunks.append(current.strip())
+                current = ""
+            current += piece
+    chunks.append(current.strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+def _decode(path, output_format):
+    if output_format == "pcm_16000":
+        with open(path, "rb") as f:
+            data = f.read()
+        return AudioSegment(data=data, sample_width=2, frame_rate=16000, channels=1)
+    if output_format == "ulaw_8000":
+        with open(path, "rb") as f:
+            data = audioop.ulaw2lin(f.read(), 2)
+        return AudioSegment(data=data, sample_width=2, frame_rate=8000, channels=1)
+    # Passing the codec skips the ffprobe round trip pydub does otherwise
+    if output_format == "opus":
+        return AudioSegment.from_file(path, format="ogg", codec="libopus")
+    return AudioSegment.from_file(path, format="mp3", codec="mp3")
+
+
+def _encode(audio, f, output_format):
+    if output_format == "pcm_16000":
+        f.write(audio.raw_data)
+    elif output_format == "ulaw_8000":
+        f.write(audioop.lin2ulaw(audio.raw_data, audio.sample_width))
+    elif output_format == "opus":
+        audio.export(f, format="ogg", codec="libopus", bitrate="64k")
+    else:
+        audio.export(f, format="mp3", bitrate="128k")
+
+
+def stitch_audio(paths, output_path, output_format="mp3", crossfade_ms=0):
+    """
+    Joins the audio files at paths, all in output_format, into output_path in
+    order. Concatenable formats are appended byte for byte unless a
+    crossfade is requested; otherwise the parts are decoded, crossfaded by
+    crossfade_ms and encoded again. Runs in the audio pool, so it only takes
+    picklable arguments.
+    Args:
+        paths (list): Audio files to join, in playback order.
+        output_path (str): Path of the joined audio.
+        output_format (str): Format of the parts and the result.
+        crossfade_ms (int): Overlap between consecutive parts.
+    Returns:
+        str: output_path.
+    """
+    with open(output_path, "wb") as f:
+        if output_format in CONCATENABLE_FORMATS and not crossfade_ms:
+            for path in paths:
+                with open(path, "rb") as part:
+                    shutil.copyfileobj(part, f, 64 * 1024)
+            return output_path
+        audio = _decode(paths[0], output_format)
+        for path in paths[1:]:
+            part = _decode(path, output_format)
+            # A crossfade cannot be longer than either side of the seam
+            overlap = min(crossfade_ms, len(audio), len(part))
+            audio = audio.append(part, crossfade=overlap)
+        _encode(audio, f, output_format)
+    return output_path
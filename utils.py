@@ -1,6 +1,8 @@
 from configs import Configs
 import os
 import shutil
+import time
+import uuid
 
 
 class Utils:
@@ -32,4 +34,57 @@ class Utils:
             except Exception as e:
                 print(f"Failed to delete {file_path}. Reason: {e}")
 
+    @staticmethod
+    def create_workspace(base_dir, workspace_id=None):
+        """
+        Creates an isolated working directory under base_dir.
+        Args:
+            base_dir (str): Parent directory for all workspaces.
+            workspace_id (str): Optional id, a random hex id is used if omitted.
+        Returns:
+            str: Path to the new workspace directory.
+        """
+        workspace_id = workspace_id or uuid.uuid4().hex
+        workspace_path = os.path.join(base_dir, workspace_id)
+        os.makedirs(workspace_path, exist_ok=False)
+        return workspace_path
+
+    @staticmethod
+    def remove_dir(directory_path):
+        """
+        Deletes a directory and everything in it, ignoring missing paths.
+        """
+        shutil.rmtree(directory_path, ignore_errors=True)
+
+    @staticmethod
+    def reap_stale_dirs(base_dir, max_age_sec, keep=()):
+        """
+        Deletes subdirectories of base_dir not modified for max_age_sec seconds.
+        Args:
+            keep (iterable): Directories that are never deleted, e.g. still in use.
+        Returns:
+            int: Number of directories removed.
+        """
+        if not os.path.isdir(base_dir):
+            return 0
+
+        removed = 0
+        cutoff = time.time() - max_age_sec
+        keep = {os.path.abspath(path) for path in keep}
+        for entry in os.scandir(base_dir):
+            if os.path.abspath(entry.path) in keep:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False) and (
+                    entry.stat(follow_symlinks=False).st_mtime < cutoff
+                ):
+                    shutil.rmtree(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                # Already removed by the request that owned it
+                continue
+            except Exception as e:
+                print(f"Failed to reap {entry.path}. Reason: {e}")
+        return removed
+
     # Add more helper methods as needed
@@ -0,0 +1,151 @@
+import threading
+import time
+from configs import Configs
+
+
+class VoiceCatalog:
+    """
+    In-memory index of the ElevenLabs voices available to each API key.
+    Keeps a case-insensitive name index and a voice_id index, refreshed from
+    the /v1/voices listing once the entries are older than ttl_sec.
+    Voices added or removed while a listing is in flight are applied again
+    on top of it, so a refresh never undoes them.
+    Usage:
+        if catalog.is_stale(api_key):
+            fetched_at = time.monotonic()
+            catalog.load(api_key, voices, fetched_at)
+        voice_id = catalog.find_voice_id(api_key, name)
+    """
+
+    def __init__(self, ttl_sec=300):
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._catalogs = {}
+
+    def is_stale(self, api_key):
+        with self._lock:
+            catalog = self._catalogs.get(api_key)
+            return (
+                catalog is None
+                or catalog["loaded_at"] is None
+                or time.monotonic() - catalog["loaded_at"] > self.ttl_sec
+            )
+
+    def _catalog(self, api_key):
+        catalog = self._catalogs.get(api_key)
+        if catalog is None:
+            # Not loaded yet, stays stale until the first listing arrives
+            catalog = {
+                "loaded_at": None,
+                "fetched_at": None,
+                "by_id": {},
+                "by_name": {},
+                "changes": [],
+            }
+            self._catalogs[api_key] = catalog
+        return catalog
+
+    def load(self, api_key, voices, fetched_at=None):
+        """
+        Replaces the index for api_key with a fresh /v1/voices listing, then
+        reapplies the adds and removes made since the listing was requested.
+        Args:
+            voices (list): Voice dicts with at least "voice_id" and "name".
+            fetched_at (float): time.monotonic() when the listing was
+                requested (default: reapply every change since the last load).
+        """
+        fresh = {"by_id": {}, "by_name": {}}
+        for voice in voices:
+            if voice.get("voice_id"):
+                _index_voice(fresh, voice)
+        with self._lock:
+            catalog = self._catalog(api_key)
+            if (
+                fetched_at is not None
+                and catalog["fetched_at"] is not None
+                and fetched_at < catalog["fetched_at"]
+            ):
+                # A newer listing has already been loaded
+                return
+            for changed_at, voice_id, voice in catalog["changes"]:
+                if fetched_at is not None and changed_at < fetched_at:
+                    continue
+                if voice is None:
+                    _unindex_voice(fresh, voice_id)
+                else:
+                    _index_voice(fresh, voice)
+            catalog.update(
+                loaded_at=time.monotonic(),
+                fetched_at=fetched_at,
+                by_id=fresh["by_id"],
+                by_name=fresh["by_name"],
+                changes=[],
+            )
+
+    def find_voice_id(self, api_key, name):
+        with self._lock:
+            catalog = self._catalogs.get(api_key)
+            if catalog is None:
+                return None
+            return catalog["by_name"].get(name.lower())
+
+    def get_voice(self, api_key, voice_id):
+        with self._lock:
+            catalog = self._catalogs.get(api_key)
+            if catalog is None:
+                return None
+            return catalog["by_id"].get(voice_id)
+
+    def add(self, api_key, voice_id, name):
+        """
+        Records a newly created voice without waiting for the next refresh.
+        """
+        voice = {"voice_id": voice_id, "name": name}
+        with self._lock:
+            catalog = self._catalog(api_key)
+            _index_voice(catalog, voice)
+            catalog["changes"].append((time.monotonic(), voice_id, voice))
+
+    def remove(self, api_key, voice_id):
+        """
+        Drops a deleted voice from both indexes.
+        """
+        with self._lock:
+            catalog = self._catalog(api_key)
+            _unindex_voice(catalog, voice_id)
+            catalog["changes"].append((time.monotonic(), voice_id, None))
+
+
+def _index_voice(catalog, voice):
+    catalog["by_id"][voice["voice_id"]] = voice
+    # First match wins, same as scanning the listing in order
+    catalog["by_name"].setdefault(voice.get("name", "").lower(), voice["voice_id"])
+
+
+def _unindex_voice(catalog, voice_id):
+    voice = catalog["by_id"].pop(voice_id, None)
+    if voice is None:
+        return
+    name = voice.get("name", "").lower()
+    if catalog["by_name"].get(name) == voice_id:
+        del catalog["by_name"][name]
+        # Fall back to another voice with the same name, if any
+        for other_id, other in catalog["by_id"].items():
+            if other.get("name", "").lower() == name:
+                catalog["by_name"][name] = other_id
+                break
+
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_voice_catalog():
+    """
+    Returns the process-wide voice catalog.
+    """
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = VoiceCatalog(ttl_sec=Configs.VOICE_CATALOG_TTL_SEC)
+        return _default_catalog
@@ -0,0 +1,142 @@
+import asyncio
+import time
+import uuid
+from elevenlabs_retell_voice_cloning import (
+    generate_elevenlabs_cloned_voice_from_retellai_async,
+)
+from utils import Utils
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the job queue is at capacity.
+    """
+
+
+class VoiceCloneJob:
+    """
+    State of a single queued voice cloning job.
+    """
+
+    def __init__(self, params, workspace_dir, tts_model_id):
+        self.job_id = uuid.uuid4().hex
+        self.params = params
+        self.workspace_dir = workspace_dir
+        self.tts_model_id = tts_model_id
+        self.status = "queued"
+        self.error = None
+        self.result = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        queue_wait = None
+        if self.started_at is not None:
+            queue_wait = round(self.started_at - self.queued_at, 4)
+        total = None
+        if self.finished_at is not None:
+            total = round(self.finished_at - self.queued_at, 4)
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_wait_sec": queue_wait,
+            "total_sec": total,
+            "timings": (self.result or {}).get("timings", {}),
+            "voice_id": (self.result or {}).get("voice_id"),
+            "tts_text": (self.result or {}).get("tts_text"),
+        }
+
+
+class VoiceCloneJobQueue:
+    """
+    Bounded queue of voice cloning jobs served by a fixed pool of asyncio workers.
+    Usage: await queue.start(); job = queue.submit(...); queue.get(job.job_id)
+    """
+
+    def __init__(self, max_workers=4, max_queue_size=32, job_ttl_sec=3600):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.job_ttl_sec = job_ttl_sec
+        self._queue = None
+        self._workers = []
+        self._jobs = {}
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, params, workspace_dir, tts_model_id="eleven_turbo_v2"):
+        """
+        Enqueues a job without waiting.
+        Returns:
+            VoiceCloneJob: The queued job.
+        Raises:
+            QueueFullError: If max_queue_size jobs are already waiting.
+        """
+        self._prune_expired()
+        job = VoiceCloneJob(params, workspace_dir, tts_model_id)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(
+                f"Job queue is full ({self.max_queue_size} jobs waiting)"
+            )
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id):
+        self._prune_expired()
+        return self._jobs.get(job_id)
+
+    def workspace_dirs(self):
+        """
+        Returns:
+            list: Workspaces of the jobs still tracked (queued, running or
+            finished and not yet expired), which must outlive them.
+        """
+        self._prune_expired()
+        return [job.workspace_dir for job in self._jobs.values()]
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await generate_elevenlabs_cloned_voice_from_retellai_async(
+                    job.params, job.workspace_dir, tts_model_id=job.tts_model_id
+                )
+                job.status = "done"
+            except Exception as e:
+                print(f"Voice clone job {job.job_id} failed: {e}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _prune_expired(self):
+        cutoff = time.time() - self.job_ttl_sec
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            Utils.remove_dir(self._jobs.pop(job_id).workspace_dir)
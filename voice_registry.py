@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from configs import Configs
+
+
+def fingerprint_file(path, chunk_size=1024 * 1024):
+    """
+    Hashes the raw bytes of an audio file.
+    Returns:
+        str: Fingerprint of the form "sha256:<hex>".
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def fingerprint_bytes(data):
+    """
+    In-memory counterpart of fingerprint_file.
+    Returns:
+        str: Fingerprint of the form "sha256:<hex>".
+    """
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def _account_id(api_key):
+    # Voices belong to the account of the key that created them; the key
+    # itself is never written to disk
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class VoiceRegistry:
+    """
+    Persistent map of reference-audio fingerprints to ElevenLabs voice ids,
+    per API key. Stored as a JSON file:
+    {"accounts": {account: {"fingerprints": {fp: voice_id}, "voices": {voice_id: {...}}}}}
+    where account is a hash of the API key.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._accounts = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._accounts = json.load(f).get("accounts", {})
+
+    def _account(self, api_key):
+        return self._accounts.setdefault(
+            _account_id(api_key), {"fingerprints": {}, "voices": {}}
+        )
+
+    def lookup(self, api_key, *fingerprints):
+        """
+        Returns:
+            dict: {"voice_id", "voice_name", ...} for the first fingerprint
+            known under api_key, or None.
+        """
+        with self._lock:
+            account = self._accounts.get(_account_id(api_key))
+            if account is None:
+                return None
+            for fingerprint in fingerprints:
+                voice_id = account["fingerprints"].get(fingerprint)
+                if voice_id:
+                    return {"voice_id": voice_id, **account["voices"].get(voice_id, {})}
+        return None
+
+    def pcm_fingerprints(self, api_key):
+        """
+        Returns:
+            frozenset: Every decoded-audio ("pcm:") fingerprint registered
+            under api_key.
+        """
+        with self._lock:
+            account = self._accounts.get(_account_id(api_key), {})
+            return frozenset(
+                fp for fp in account.get("fingerprints", ()) if fp.startswith("pcm:")
+            )
+
+    def register(self, api_key, voice_id, voice_name, fingerprints):
+        with self._lock:
+            account = self._account(api_key)
+            for fingerprint in fingerprints:
+                if fingerprint:
+                    account["fingerprints"][fingerprint] = voice_id
+            account["voices"].setdefault(
+                voice_id, {"voice_name": voice_name, "created_at": time.time()}
+            )
+            self._save()
+
+    def forget_voice(self, api_key, voice_id):
+        """
+        Drops every fingerprint pointing at voice_id under api_key, e.g. after
+        the voice was deleted.
+        """
+        with self._lock:
+            account = self._accounts.get(_account_id(api_key))
+            if account is None:
+                return
+            fingerprints = account["fingerprints"]
+            if voice_id not in account["voices"] and voice_id not in set(
+                fingerprints.values()
+            ):
+                return
+            account["fingerprints"] = {
+                fp: vid for fp, vid in fingerprints.items() if vid != voice_id
+            }
+            account["voices"].pop(voice_id, None)
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"accounts": self._accounts}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_voice_registry():
+    """
+    Returns the process-wide voice registry stored at VOICE_REGISTRY_PATH.
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = VoiceRegistry(Configs.VOICE_REGISTRY_PATH)
+        return _default_registry